@@ -0,0 +1,196 @@
+import json
+import warnings
+
+import numpy as np
+
+DAY = 24 * 60 * 60
+LATENESS_BINS = np.array([-np.inf, 0, DAY, 3 * DAY, np.inf])
+LATENESS_LABELS = ('On time', 'Up to 1 day late', '1 to 3 days late',
+                   'Over 3 days late')
+
+
+class ClassMatrix:
+    """
+    Dense student x assignment arrays of the submissions of a class, so
+    statistics over the whole class are computed with vectorized operations
+    instead of one dictionary lookup per submission.
+    """
+
+    def __init__(self, usernames: list, assignments: list, time: np.ndarray,
+                 submission_count: np.ndarray, present: np.ndarray):
+        """
+        Create the object
+        :param usernames: username of each row
+        :param assignments: name of each column
+        :param time: Unix time of the last submission of each cell
+        :param submission_count: submission count of each cell
+        :param present: True for each cell that has a student repository
+        """
+
+        self.usernames = usernames
+        self.assignments = assignments
+        self.time = time
+        self.submission_count = submission_count
+        self.present = present
+        self.submitted = present & (submission_count > 0)
+
+    @classmethod
+    def from_json_info(cls, json_info, class_name: str):
+        """
+        Build the arrays of a class.
+
+        :param json_info: JsonInfo of the info
+        :param class_name: name of a class
+        :return: the ClassMatrix of the class
+        """
+
+        json_info.load_class(class_name)
+        usernames = json_info.student_list(class_name)
+        assignments = json_info.assignment_list(class_name)
+        shape = (len(usernames), len(assignments))
+        time = np.zeros(shape, dtype=np.int64)
+        submission_count = np.zeros(shape, dtype=np.int32)
+        present = np.zeros(shape, dtype=bool)
+
+        for column, assignment in enumerate(assignments):
+            student_repos = set(json_info.students_repos_list(class_name,
+                                                              assignment))
+            for row, username in enumerate(usernames):
+                if username not in student_repos:
+                    continue
+                present[row, column] = True
+                time[row, column] = json_info.time(class_name, assignment,
+                                                   username)
+                submission_count[row, column] = json_info.submission_count(
+                    class_name, assignment, username)
+
+        return cls(usernames, assignments, time, submission_count, present)
+
+    def submitted_counts(self) -> np.ndarray:
+        """
+        Get the number of students who submitted each assignment.
+
+        :return: array of counts, one per assignment
+        """
+
+        return self.submitted.sum(axis=0)
+
+    def submission_rates(self) -> np.ndarray:
+        """
+        Get the fraction of students with a repository who submitted each
+        assignment.
+
+        :return: array of rates, NaN for assignments without repositories
+        """
+
+        present_counts = self.present.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(present_counts > 0,
+                            self.submitted_counts() / present_counts, np.nan)
+
+    def resubmission_counts(self) -> np.ndarray:
+        """
+        Get the number of submissions beyond each student's first, summed
+        per assignment.
+
+        :return: array of counts, one per assignment
+        """
+
+        return np.where(self.present,
+                        np.maximum(self.submission_count - 1, 0),
+                        0).sum(axis=0)
+
+    def students_without_submissions(self) -> list:
+        """
+        Get the students who submitted no assignment at all.
+
+        :return: list of usernames
+        """
+
+        rows = np.flatnonzero(~self.submitted.any(axis=1))
+        return [self.usernames[row] for row in rows]
+
+    def deadline_array(self, deadlines: dict) -> np.ndarray:
+        """
+        Get the deadline of each assignment as an array.
+
+        :param deadlines: dictionary mapping assignment names to Unix times
+        :return: array of deadlines, NaN for assignments without one
+        """
+
+        return np.array([deadlines.get(assignment, np.nan)
+                         for assignment in self.assignments], dtype=float)
+
+    def lateness(self, deadlines: dict) -> np.ndarray:
+        """
+        Get how long after its assignment's deadline each last submission
+        was made.
+
+        :param deadlines: dictionary mapping assignment names to Unix times
+        :return: array of seconds, negative for submissions before the
+        deadline, NaN for cells without a submission or deadline
+        """
+
+        return np.where(self.submitted,
+                        self.time - self.deadline_array(deadlines)[None, :],
+                        np.nan)
+
+    def median_lateness(self, deadlines: dict) -> np.ndarray:
+        """
+        Get the median lateness of the submissions of each assignment.
+
+        :param deadlines: dictionary mapping assignment names to Unix times
+        :return: array of seconds, NaN for assignments without submissions
+        or deadline
+        """
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanmedian(self.lateness(deadlines), axis=0)
+
+    def lateness_histogram(self, deadlines: dict) -> np.ndarray:
+        """
+        Count the submissions of each assignment in each LATENESS_BINS
+        interval.
+
+        :param deadlines: dictionary mapping assignment names to Unix times
+        :return: assignment x interval array of counts
+        """
+
+        lateness = self.lateness(deadlines)
+        known = ~np.isnan(lateness)
+        bins = np.digitize(np.where(known, lateness, 0), LATENESS_BINS[1:-1])
+        return np.stack([(known & (bins == interval)).sum(axis=0)
+                         for interval in range(len(LATENESS_LABELS))],
+                        axis=1)
+
+
+def load_deadlines(path: str) -> dict:
+    """
+    Read the assignment deadlines of the classes from a JSON file of the
+    form {"class": {"assignment": unix_time}}.
+
+    :param path: path of the deadlines file
+    :return: dictionary of deadlines, empty if the file does not exist or
+    cannot be used, with a warning in the latter case
+    """
+
+    try:
+        with open(path, 'r') as deadlines_file:
+            deadlines = json.load(deadlines_file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        warnings.warn('cannot read deadlines from {0}: {1}'.format(path, e))
+        return {}
+
+    if not isinstance(deadlines, dict) or not all(
+            isinstance(class_deadlines, dict) and all(
+                isinstance(deadline, (int, float)) and
+                not isinstance(deadline, bool)
+                for deadline in class_deadlines.values())
+            for class_deadlines in deadlines.values()):
+        warnings.warn('cannot read deadlines from {}: expected '
+                      '{{"class": {{"assignment": unix_time}}}}'.format(path))
+        return {}
+    return deadlines
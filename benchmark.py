@@ -0,0 +1,434 @@
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import sys
+import tracemalloc
+from time import perf_counter
+
+from info import CompactJsonInfo, IndexedJsonInfo, InfoSnapshotCache, \
+    LazyJsonInfo
+
+FIRST_NAMES = ('Hayley', 'Phillip', 'Ana', 'Omar', 'Mei', 'Lars', 'Priya',
+               'Diego', 'Zoe', 'Kwame', 'Ines', 'Tomas')
+LAST_NAMES = ('Gallo', 'Wells', 'Okafor', 'Nguyen', 'Schmidt', 'Rossi',
+              'Haddad', 'Kowalski', 'Tanaka', 'Silva', 'Moreau', 'Berg')
+TERM_START = 1483228800
+WEEK = 7 * 24 * 60 * 60
+
+
+def fake_hash(rng: random.Random) -> str:
+    """
+    Make a random 40 digit hexadecimal commit hash.
+
+    :param rng: random number generator
+    :return: the hash
+    """
+
+    return '{:040x}'.format(rng.getrandbits(160))
+
+
+def generate_class(rng: random.Random, class_name: str, faculty: str,
+                   student_count: int, assignment_count: int) -> dict:
+    """
+    Generate the info of a class with the schema of info.json.
+
+    :param rng: random number generator
+    :param class_name: name of the class
+    :param faculty: username of the faculty teaching the class
+    :param student_count: number of students
+    :param assignment_count: number of assignments
+    :return: dictionary with the students and assignments of the class
+    """
+
+    students = {}
+    for number in range(student_count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        username = '{0}{1}{2}'.format(first[0], last, number).lower()
+        students[username] = {
+            'last': last,
+            'last_first_username': '{0}_{1}_{2}'.format(last, first,
+                                                        username).lower(),
+            'home_dir': '/home/{}'.format(username),
+            'username': username,
+            'first': first,
+            'email_address': '{}@example.edu'.format(username),
+        }
+
+    assignments = {}
+    for number in range(assignment_count):
+        assignment = 'hw{0:02d}-assignment'.format(number + 1)
+        published_time = TERM_START + number * WEEK
+        students_repos = {}
+        for username, student in students.items():
+            submission_count = rng.choice((0, 0, 1, 1, 2, 3, 5))
+            time = published_time
+            if submission_count:
+                time += rng.randrange(2 * WEEK)
+            students_repos[username] = {
+                'last': student['last'],
+                'hash': fake_hash(rng),
+                'submission_count': submission_count,
+                'first': student['first'],
+                'path': '/home/{0}/{1}/{2}/{3}.git'.format(
+                    username, faculty, class_name, assignment),
+                'time': time,
+            }
+        assignments[assignment] = {
+            'reports_repo': {
+                'path': '/home/{0}/classes/{1}/{2}/reports.git'.format(
+                    faculty, class_name, assignment),
+                'hash': fake_hash(rng),
+            },
+            'name': assignment,
+            'published': number < assignment_count - 1,
+            'students_repos': students_repos,
+        }
+
+    return {'students': students, 'assignments': assignments}
+
+
+def generate_info(class_count: int, student_count: int,
+                  assignment_count: int, seed: int = 0) -> dict:
+    """
+    Generate a synthetic info dictionary with the schema of info.json.
+
+    :param class_count: number of classes
+    :param student_count: number of students in each class
+    :param assignment_count: number of assignments in each class
+    :param seed: seed of the random number generator
+    :return: the info dictionary
+    """
+
+    rng = random.Random(seed)
+    return {'CS{0:03d}s17'.format(number):
+            generate_class(rng, 'CS{0:03d}s17'.format(number), 'faculty',
+                           student_count, assignment_count)
+            for number in range(class_count)}
+
+
+def write_info(path: str, class_count: int, student_count: int,
+               assignment_count: int, seed: int = 0) -> int:
+    """
+    Write a synthetic info file.
+
+    :param path: path of the file to write
+    :param class_count: number of classes
+    :param student_count: number of students in each class
+    :param assignment_count: number of assignments in each class
+    :param seed: seed of the random number generator
+    :return: size of the file in bytes
+    """
+
+    with open(path, 'w') as info_file:
+        json.dump(generate_info(class_count, student_count, assignment_count,
+                                seed), info_file)
+    return os.path.getsize(path)
+
+
+def peak_rss() -> int:
+    """
+    Get the peak resident set size of the process so far.
+
+    :return: size in bytes
+    """
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Benchmark:
+    """
+    Times named operations and records the results in a form that can be
+    written as JSON and compared between runs.
+    """
+
+    def __init__(self, repeat: int = 3, trace_memory: bool = True):
+        """
+        Create the object
+        :param repeat: number of timed runs of each operation, the fastest
+        one is recorded
+        :param trace_memory: True to also run each operation once under
+        tracemalloc to record its peak allocation
+        """
+
+        self.repeat = repeat
+        self.trace_memory = trace_memory
+        self.results = []
+
+    def measure(self, name: str, function, *args):
+        """
+        Time an operation and record the result.
+
+        :param name: name of the operation in the results
+        :param function: the operation
+        :param args: arguments of the operation
+        :return: the return value of the last run of the operation
+        """
+
+        times = []
+        for _ in range(self.repeat):
+            start = perf_counter()
+            value = function(*args)
+            times.append(perf_counter() - start)
+        result = {'name': name, 'seconds': min(times),
+                  'mean_seconds': sum(times) / len(times)}
+        if self.trace_memory:
+            tracemalloc.start()
+            function(*args)
+            result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.results.append(result)
+        return value
+
+
+def bench_load(benchmark: Benchmark, path: str):
+    """
+    Time reading an info file eagerly, lazily and through a snapshot.
+
+    :param benchmark: Benchmark recording the results
+    :param path: path of the info file
+    :return: a LazyJsonInfo of the file, as the table uses
+    """
+
+    def load_eager():
+        with open(path, 'r') as info_file:
+            return IndexedJsonInfo(json.load(info_file))
+
+    def load_snapshot():
+        return InfoSnapshotCache(path, snapshot_path).load()
+
+    snapshot_path = path + '.snapshot'
+    cache = InfoSnapshotCache(path, snapshot_path)
+    cache.load()
+    if cache.writer is not None:
+        cache.writer.join()
+
+    benchmark.measure('load.json', load_eager)
+    json_info = benchmark.measure('load.lazy', LazyJsonInfo.from_file, path)
+    benchmark.measure('load.snapshot', load_snapshot)
+    return json_info
+
+
+def retained_bytes(function, *args) -> int:
+    """
+    Measure the memory still allocated for the return value of a function
+    once it returns.
+
+    :param function: the function
+    :param args: arguments of the function
+    :return: size in bytes
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    value = function(*args)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def bench_memory(path: str) -> dict:
+    """
+    Measure the memory held by the info of every class as the parsed info
+    dictionary and as compact records.
+
+    :param path: path of the info file
+    :return: dictionary with the sizes in bytes
+    """
+
+    def load_dict():
+        with open(path, 'r') as info_file:
+            return IndexedJsonInfo(json.load(info_file))
+
+    def load_compact():
+        json_info = LazyJsonInfo.from_file(path)
+        for class_name in json_info.class_list():
+            json_info.load_class(class_name)
+        return json_info
+
+    def load_compact_eager():
+        with open(path, 'r') as info_file:
+            return CompactJsonInfo.from_dict(json.load(info_file))
+
+    return {'dict_bytes': retained_bytes(load_dict),
+            'compact_bytes': retained_bytes(load_compact),
+            'compact_eager_bytes': retained_bytes(load_compact_eager)}
+
+
+def bench_queries(benchmark: Benchmark, json_info):
+    """
+    Time each JsonInfo query over every class, assignment and student.
+
+    :param benchmark: Benchmark recording the results
+    :param json_info: JsonInfo of the info file
+    """
+
+    classes = json_info.class_list()
+    for class_name in classes:
+        json_info.load_class(class_name)
+    assignments = {class_name: json_info.assignment_list(class_name)
+                   for class_name in classes}
+    students = {class_name: json_info.student_list(class_name)
+                for class_name in classes}
+
+    def per_class(query):
+        return lambda: [query(class_name) for class_name in classes]
+
+    def per_assignment(query):
+        return lambda: [query(class_name, assignment)
+                        for class_name in classes
+                        for assignment in assignments[class_name]]
+
+    def per_student(query):
+        return lambda: [query(class_name, username)
+                        for class_name in classes
+                        for username in students[class_name]]
+
+    def per_submission(query):
+        return lambda: [query(class_name, assignment, username)
+                        for class_name in classes
+                        for assignment in assignments[class_name]
+                        for username in json_info.students_repos_list(
+                            class_name, assignment)]
+
+    queries = [
+        ('class_list', lambda: json_info.class_list()),
+        ('student_count', per_class(json_info.student_count)),
+        ('student_list', per_class(json_info.student_list)),
+        ('assignment_list', per_class(json_info.assignment_list)),
+        ('student_submitted_count',
+         per_assignment(json_info.student_submitted_count)),
+        ('students_submitted_list',
+         per_assignment(json_info.students_submitted_list)),
+        ('students_repos_list', per_assignment(json_info.students_repos_list)),
+        ('assignments_by_student_list',
+         per_student(json_info.assignments_by_student_list)),
+        ('last_first_username', per_student(json_info.last_first_username)),
+        ('submission_count', per_submission(json_info.submission_count)),
+        ('time', per_submission(json_info.time)),
+        ('time_converted', per_submission(json_info.time_converted)),
+    ]
+    for name, query in queries:
+        benchmark.measure('query.' + name, query)
+
+
+def bench_tables(benchmark: Benchmark, json_info):
+    """
+    Time building each table of the first class until all of its rows are
+    computed. Needs a QApplication.
+
+    :param benchmark: Benchmark recording the results
+    :param json_info: JsonInfo of the info file
+    """
+
+    from PyQt5.QtWidgets import QApplication
+    from table import (ASSIGNMENT_DETAILS_VIEW, ASSIGNMENTS_VIEW, CLASS_VIEW,
+                       STUDENT_VIEW, CreateTable)
+
+    app = QApplication.instance()
+    window = CreateTable(json_info)
+    class_name = json_info.class_list()[0]
+    assignment = json_info.assignment_list(class_name)[0]
+    username = json_info.student_list(class_name)[0]
+
+    def build(key, create_table, *args):
+        def run():
+            window.evict_view(key)
+            create_table(*args)
+            model = window.current_table.model().sourceModel()
+            while not model.is_populated():
+                app.processEvents()
+        return run
+
+    tables = [
+        ('class', (CLASS_VIEW,), window.create_table_class, ()),
+        ('assignments', (ASSIGNMENTS_VIEW, class_name),
+         window.create_table_assignments, (class_name,)),
+        ('assignment_details',
+         (ASSIGNMENT_DETAILS_VIEW, class_name, assignment),
+         window.create_table_assignment_details, (class_name, assignment)),
+        ('student', (STUDENT_VIEW, class_name, username),
+         window.create_table_student, (class_name, username)),
+    ]
+    for name, key, create_table, args in tables:
+        benchmark.measure('table.' + name, build(key, create_table, *args))
+    window.close()
+
+
+def main(argv: list = None) -> int:
+    """
+    Generate a synthetic info file and benchmark loading it, querying it and
+    building its tables.
+
+    :param argv: command line arguments, defaults to sys.argv[1:]
+    :return: exit status
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark the info loading, queries and tables on '
+                    'synthetic data.')
+    parser.add_argument('--classes', type=int, default=100,
+                        help='number of classes to generate')
+    parser.add_argument('--students', type=int, default=100,
+                        help='number of students in each class')
+    parser.add_argument('--assignments', type=int, default=12,
+                        help='number of assignments in each class')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the generator')
+    parser.add_argument('--info', default='benchmark_info.json',
+                        help='path of the generated info file')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of timed runs of each operation')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='do not trace the peak allocation of each '
+                             'operation')
+    parser.add_argument('--no-tables', action='store_true',
+                        help='skip the table benchmarks, no Qt needed')
+    parser.add_argument('-o', '--output',
+                        help='write the results to this JSON file instead of '
+                             'standard output')
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    size = write_info(args.info, args.classes, args.students,
+                      args.assignments, args.seed)
+    generate_seconds = perf_counter() - start
+
+    benchmark = Benchmark(args.repeat, not args.no_memory)
+    memory = None if args.no_memory else bench_memory(args.info)
+    json_info = bench_load(benchmark, args.info)
+    bench_queries(benchmark, json_info)
+    if not args.no_tables:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication(sys.argv[:1])
+        bench_tables(benchmark, json_info)
+        app.quit()
+
+    report = {
+        'parameters': {'classes': args.classes, 'students': args.students,
+                       'assignments': args.assignments, 'seed': args.seed,
+                       'repeat': args.repeat},
+        'info_bytes': size,
+        'generate_seconds': generate_seconds,
+        'peak_rss_bytes': peak_rss(),
+        'retained_memory': memory,
+        'results': benchmark.results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,276 @@
+import mmap
+import os
+import shutil
+import subprocess
+import tempfile
+from collections import OrderedDict
+from threading import Lock
+
+from fetch import FetchError, run_git
+
+PAGE_SIZE = 64 * 1024
+CHUNK_SIZE = 256 * 1024
+BLOB_CACHE_BYTES = 64 * 1024 * 1024
+TREE = 'tree'
+BLOB = 'blob'
+COMMIT = 'commit'
+
+
+class TreeEntry:
+    """A file, directory or submodule listed in a tree of a repository."""
+
+    def __init__(self, path: str, mode: str, kind: str, object_hash: str,
+                 size: int):
+        """
+        Create the object
+        :param path: path of the entry from the root of the repository
+        :param mode: git file mode of the entry
+        :param kind: TREE, BLOB or COMMIT for submodules
+        :param object_hash: hash of the object of the entry
+        :param size: size of a blob in bytes, None for other kinds
+        """
+
+        self.path = path
+        self.mode = mode
+        self.kind = kind
+        self.object_hash = object_hash
+        self.size = size
+        self.name = path.rsplit('/', 1)[-1]
+
+    def page_count(self, page_size: int = PAGE_SIZE) -> int:
+        """
+        Get the number of pages of a blob.
+
+        :param page_size: number of bytes per page
+        :return: the number of pages, at least 1, 0 for other kinds
+        """
+
+        if self.kind != BLOB:
+            return 0
+        return max(1, -(-self.size // page_size))
+
+
+def parse_tree(output: str, directory: str = '') -> list:
+    """
+    Parse the output of git ls-tree -l -z.
+
+    :param output: output of the command
+    :param directory: path of the listed directory, '' for the root
+    :return: list of TreeEntry, directories first, then by name
+    """
+
+    prefix = directory + '/' if directory else ''
+    entries = []
+    for record in output.split('\0'):
+        if not record:
+            continue
+        fields, name = record.split('\t', 1)
+        mode, kind, object_hash, size = fields.split()
+        entries.append(TreeEntry(prefix + name, mode, kind, object_hash,
+                                 int(size) if size != '-' else None))
+    entries.sort(key=lambda entry: (entry.kind != TREE, entry.path))
+    return entries
+
+
+class BlobCache:
+    """
+    Keeps the most recently read blobs in files of a temporary directory, up
+    to a total number of bytes. A blob is copied out of git in chunks and
+    pages are read from it through a memory map, so no blob is ever held in
+    memory whole. Shared between threads.
+    """
+
+    def __init__(self, max_bytes: int = BLOB_CACHE_BYTES):
+        """
+        Create the object
+        :param max_bytes: total size of the cached blobs to keep, the most
+        recent blob is kept even if it is larger
+        """
+
+        self.max_bytes = max_bytes
+        self.directory = None
+        self.blobs = OrderedDict()
+        self.size = 0
+        self.lock = Lock()
+
+    def __contains__(self, object_hash: str) -> bool:
+        with self.lock:
+            return object_hash in self.blobs
+
+    def read(self, repo_path: str, object_hash: str, offset: int,
+             length: int) -> bytes:
+        """
+        Read part of a blob, copying the blob into the cache first if it is
+        not there.
+
+        :param repo_path: path of the repository holding the blob
+        :param object_hash: hash of the blob
+        :param offset: position of the first byte to read
+        :param length: maximum number of bytes to read
+        :return: the bytes, empty past the end of the blob
+        """
+
+        with self.lock:
+            cached = object_hash in self.blobs
+        if not cached:
+            self.add(object_hash, self.copy_blob(repo_path, object_hash))
+
+        with self.lock:
+            self.blobs.move_to_end(object_hash)
+            path, size = self.blobs[object_hash]
+            if offset >= size:
+                return b''
+            with open(path, 'rb') as blob_file, \
+                    mmap.mmap(blob_file.fileno(), 0,
+                              access=mmap.ACCESS_READ) as blob_map:
+                return blob_map[offset:offset + length]
+
+    def copy_blob(self, repo_path: str, object_hash: str) -> str:
+        """
+        Copy a blob from git into a file of the cache directory, a chunk at
+        a time.
+
+        :param repo_path: path of the repository holding the blob
+        :param object_hash: hash of the blob
+        :return: path of the file
+        """
+
+        with self.lock:
+            if self.directory is None:
+                self.directory = tempfile.mkdtemp(prefix='gkeep_blobs_')
+            descriptor, path = tempfile.mkstemp(dir=self.directory)
+        try:
+            process = subprocess.Popen(
+                ['git', 'cat-file', 'blob', object_hash], cwd=repo_path,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            os.close(descriptor)
+            os.remove(path)
+            raise FetchError(str(e))
+        with os.fdopen(descriptor, 'wb') as blob_file:
+            shutil.copyfileobj(process.stdout, blob_file, CHUNK_SIZE)
+        process.stdout.close()
+        error = process.stderr.read().decode(errors='replace').strip()
+        process.stderr.close()
+        if process.wait() != 0:
+            os.remove(path)
+            raise FetchError(error)
+        return path
+
+    def add(self, object_hash: str, path: str):
+        """
+        Add a copied blob, evicting the least recently read blobs beyond
+        max_bytes.
+
+        :param object_hash: hash of the blob
+        :param path: path of the file holding it
+        """
+
+        with self.lock:
+            if object_hash in self.blobs:
+                # another thread copied it first
+                os.remove(path)
+                return
+            size = os.path.getsize(path)
+            self.blobs[object_hash] = (path, size)
+            self.size += size
+            while self.size > self.max_bytes and len(self.blobs) > 1:
+                _, (old_path, old_size) = self.blobs.popitem(last=False)
+                os.remove(old_path)
+                self.size -= old_size
+
+    def close(self):
+        """
+        Remove the cached blobs.
+        """
+
+        with self.lock:
+            if self.directory is not None:
+                shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+            self.blobs.clear()
+            self.size = 0
+
+
+class RepoBrowser:
+    """
+    Browses the files of a repository as they were at one commit. Each
+    directory is listed the first time it is asked for, and files are read
+    a page at a time through a BlobCache.
+    """
+
+    def __init__(self, repo_path: str, commit: str, cache: BlobCache = None,
+                 page_size: int = PAGE_SIZE):
+        """
+        Create the object
+        :param repo_path: path of the repository, bare or not
+        :param commit: hash of the commit to browse
+        :param cache: BlobCache to read files through, defaults to a new one
+        :param page_size: number of bytes per page
+        """
+
+        self.repo_path = repo_path
+        self.commit = commit
+        self.cache = cache if cache is not None else BlobCache()
+        self.page_size = page_size
+        self.trees = {}
+
+    def list_directory(self, directory: str = '') -> list:
+        """
+        List a directory, running git only the first time.
+
+        :param directory: path of the directory, '' for the root
+        :return: list of TreeEntry, directories first
+        """
+
+        entries = self.trees.get(directory)
+        if entries is None:
+            output = run_git(['ls-tree', '-l', '-z',
+                              '{0}:{1}'.format(self.commit, directory)],
+                             self.repo_path)
+            entries = parse_tree(output, directory)
+            self.trees[directory] = entries
+        return entries
+
+    def read_page(self, entry: TreeEntry, page: int) -> bytes:
+        """
+        Read a page of a file.
+
+        :param entry: TreeEntry of the file
+        :param page: number of the page, from 0
+        :return: the bytes of the page
+        """
+
+        return self.cache.read(self.repo_path, entry.object_hash,
+                               page * self.page_size, self.page_size)
+
+
+def is_binary(data: bytes) -> bool:
+    """
+    Guess whether the start of a file is binary, as git does, by looking
+    for a NUL byte.
+
+    :param data: first bytes of the file
+    :return: True if the file looks binary
+    """
+
+    return b'\0' in data[:8000]
+
+
+def hex_dump(data: bytes, offset: int = 0) -> str:
+    """
+    Format bytes as lines of 16 hexadecimal bytes and their printable
+    characters.
+
+    :param data: the bytes
+    :param offset: position of the first byte in the file
+    :return: the dump
+    """
+
+    lines = []
+    for start in range(0, len(data), 16):
+        row = data[start:start + 16]
+        lines.append('{0:08x}  {1:<48} {2}'.format(
+            offset + start, ' '.join('{:02x}'.format(byte) for byte in row),
+            ''.join(chr(byte) if 32 <= byte < 127 else '.' for byte in row)))
+    return '\n'.join(lines)
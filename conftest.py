@@ -0,0 +1,42 @@
+import os
+import subprocess
+
+
+def git(args: list, cwd: str, time: int = None) -> str:
+    env = dict(os.environ, GIT_AUTHOR_NAME='Test', GIT_COMMITTER_NAME='Test',
+               GIT_AUTHOR_EMAIL='test@example.com',
+               GIT_COMMITTER_EMAIL='test@example.com')
+    if time is not None:
+        env['GIT_AUTHOR_DATE'] = env['GIT_COMMITTER_DATE'] = \
+            '@{} +0000'.format(time)
+    return subprocess.run(['git'] + args, cwd=cwd, env=env, check=True,
+                          stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout.strip()
+
+
+def commit(work: str, name: str, time: int) -> str:
+    with open(os.path.join(work, name), 'w') as work_file:
+        work_file.write(name)
+    git(['add', name], work)
+    git(['commit', '-q', '-m', name], work, time)
+    return git(['rev-parse', 'HEAD'], work)
+
+
+def bare_repo(tmp_path, commit_times: list) -> tuple:
+    """
+    Create a bare repository with a linear history pushed into it, so its
+    branch is a loose ref.
+
+    :return: path of the bare repository and hash of its head
+    """
+
+    work = str(tmp_path / 'work')
+    bare = str(tmp_path / 'bare.git')
+    git(['init', '-q', '--initial-branch=master', work], str(tmp_path))
+    git(['init', '-q', '--bare', '--initial-branch=master', bare],
+        str(tmp_path))
+    head = None
+    for number, time in enumerate(commit_times):
+        head = commit(work, 'file{}'.format(number), time)
+    git(['push', '-q', bare, 'master'], work)
+    return bare, head
@@ -0,0 +1,352 @@
+import argparse
+import csv
+import json
+import sys
+
+from info import TIME_FORMATS, InfoSnapshotCache, JsonInfo, LazyJsonInfo, \
+    find_info_files
+
+CLASSES_REPORT = 'classes'
+ASSIGNMENTS_REPORT = 'assignments'
+DETAILS_REPORT = 'details'
+STUDENTS_REPORT = 'students'
+TIME_HEADER = 'last_submission_time'
+REPORT_HEADERS = {
+    CLASSES_REPORT: ('class', 'students'),
+    ASSIGNMENTS_REPORT: ('class', 'assignment', 'submitted'),
+    DETAILS_REPORT: ('class', 'assignment', 'username', 'name', TIME_HEADER,
+                     'submission_count'),
+    STUDENTS_REPORT: ('class', 'username', 'name', 'assignment', TIME_HEADER,
+                      'submission_count'),
+}
+
+
+def selected(names: list, wanted: list) -> list:
+    """
+    Keep the names asked for, in their original order.
+
+    :param names: list of names
+    :param wanted: list of the names asked for, None or empty for all
+    :return: list of names
+    """
+
+    if not wanted:
+        return names
+    return [name for name in names if name in wanted]
+
+
+def full_name(json_info: JsonInfo, class_name: str, username: str) -> str:
+    """
+    Get the name of a student as the tables show it.
+
+    :param json_info: JsonInfo of the info
+    :param class_name: name of a class
+    :param username: username of a student
+    :return: the name in the format "last name, first name"
+    """
+
+    return '{0}, {1}'.format(json_info.last_name(class_name, username),
+                             json_info.first_name(class_name, username))
+
+
+def class_rows(json_info: JsonInfo, classes: list = None):
+    """
+    Generate the rows of the classes table.
+
+    :param json_info: JsonInfo of the info
+    :param classes: names of the classes to include, None for all
+    :return: generator of (class, student count) tuples
+    """
+
+    for class_name in selected(json_info.class_list(), classes):
+        yield class_name, json_info.student_count(class_name)
+
+
+def assignment_rows(json_info: JsonInfo, classes: list = None,
+                    assignments: list = None):
+    """
+    Generate the rows of the assignments tables. Each class is loaded only
+    when its rows are reached.
+
+    :param json_info: JsonInfo of the info
+    :param classes: names of the classes to include, None for all
+    :param assignments: names of the assignments to include, None for all
+    :return: generator of (class, assignment, submitted count) tuples
+    """
+
+    for class_name in selected(json_info.class_list(), classes):
+        json_info.load_class(class_name)
+        for assignment in selected(json_info.assignment_list(class_name),
+                                   assignments):
+            yield (class_name, assignment,
+                   json_info.student_submitted_count(class_name, assignment))
+
+
+def detail_rows(json_info: JsonInfo, classes: list = None,
+                assignments: list = None, students: list = None):
+    """
+    Generate the rows of the assignment details tables, skipping students
+    without a repository for the assignment.
+
+    :param json_info: JsonInfo of the info
+    :param classes: names of the classes to include, None for all
+    :param assignments: names of the assignments to include, None for all
+    :param students: usernames of the students to include, None for all
+    :return: generator of (class, assignment, username, name, time,
+    submission count) tuples
+    """
+
+    for class_name in selected(json_info.class_list(), classes):
+        json_info.load_class(class_name)
+        usernames = selected(json_info.student_list(class_name), students)
+        for assignment in selected(json_info.assignment_list(class_name),
+                                   assignments):
+            repos = set(json_info.students_repos_list(class_name, assignment))
+            for username in usernames:
+                if username not in repos:
+                    continue
+                yield (class_name, assignment, username,
+                       full_name(json_info, class_name, username),
+                       json_info.time(class_name, assignment, username),
+                       json_info.submission_count(class_name, assignment,
+                                                  username))
+
+
+def student_rows(json_info: JsonInfo, classes: list = None,
+                 students: list = None, assignments: list = None):
+    """
+    Generate the rows of the student tables.
+
+    :param json_info: JsonInfo of the info
+    :param classes: names of the classes to include, None for all
+    :param students: usernames of the students to include, None for all
+    :param assignments: names of the assignments to include, None for all
+    :return: generator of (class, username, name, assignment, time,
+    submission count) tuples
+    """
+
+    for class_name in selected(json_info.class_list(), classes):
+        json_info.load_class(class_name)
+        for username in selected(json_info.student_list(class_name),
+                                 students):
+            name = full_name(json_info, class_name, username)
+            for assignment in selected(
+                    json_info.assignments_by_student_list(class_name,
+                                                          username),
+                    assignments):
+                yield (class_name, username, name, assignment,
+                       json_info.time(class_name, assignment, username),
+                       json_info.submission_count(class_name, assignment,
+                                                  username))
+
+
+def report_rows(json_info: JsonInfo, report: str, classes: list = None,
+                assignments: list = None, students: list = None):
+    """
+    Generate the rows of a report.
+
+    :param json_info: JsonInfo of the info
+    :param report: name of the report, a key of REPORT_HEADERS
+    :param classes: names of the classes to include, None for all
+    :param assignments: names of the assignments to include, None for all
+    :param students: usernames of the students to include, None for all
+    :return: generator of tuples matching REPORT_HEADERS[report]
+    """
+
+    if report == CLASSES_REPORT:
+        return class_rows(json_info, classes)
+    if report == ASSIGNMENTS_REPORT:
+        return assignment_rows(json_info, classes, assignments)
+    if report == DETAILS_REPORT:
+        return detail_rows(json_info, classes, assignments, students)
+    return student_rows(json_info, classes, students, assignments)
+
+
+class CsvReportWriter:
+    """Writes report rows as CSV, with times formatted as in the tables."""
+
+    def __init__(self, out, headers: tuple):
+        """
+        Create the object and write the header row
+        :param out: text file to write to
+        :param headers: names of the columns
+        """
+
+        self.writer = csv.writer(out)
+        self.time_column = headers.index(TIME_HEADER) \
+            if TIME_HEADER in headers else None
+        self.writer.writerow(headers)
+
+    def write(self, row: tuple):
+        """
+        Write a row.
+
+        :param row: values of the row
+        """
+
+        if self.time_column is not None:
+            row = list(row)
+            row[self.time_column] = TIME_FORMATS.format(row[self.time_column])
+        self.writer.writerow(row)
+
+    def close(self):
+        """
+        Finish the output, nothing is left to write for CSV.
+        """
+
+        pass
+
+
+class JsonReportWriter:
+    """
+    Writes report rows as JSON objects, either streamed into one array or
+    one per line. Times are kept as Unix times.
+    """
+
+    def __init__(self, out, headers: tuple, lines: bool = False):
+        """
+        Create the object
+        :param out: text file to write to
+        :param headers: names of the columns, used as the object keys
+        :param lines: True to write JSON Lines instead of an array
+        """
+
+        self.out = out
+        self.headers = headers
+        self.lines = lines
+        self.separator = '' if lines else '[\n'
+
+    def write(self, row: tuple):
+        """
+        Write a row.
+
+        :param row: values of the row
+        """
+
+        self.out.write(self.separator)
+        self.out.write(json.dumps(dict(zip(self.headers, row))))
+        self.separator = '\n' if self.lines else ',\n'
+
+    def close(self):
+        """
+        Finish the output.
+        """
+
+        if self.lines:
+            self.out.write(self.separator)
+        else:
+            self.out.write('[]\n' if self.separator == '[\n' else '\n]\n')
+
+
+def load_info(path: str, snapshot: bool = False) -> JsonInfo:
+    """
+    Load an info file lazily, so only the classes reported on are parsed.
+
+    :param path: path of the info file
+    :param snapshot: True to load through an InfoSnapshotCache, writing the
+    snapshot next to the info file if it is missing or stale
+    :return: JsonInfo of the info file
+    """
+
+    if not snapshot:
+        return LazyJsonInfo.from_file(path)
+    cache = InfoSnapshotCache(path)
+    json_info = cache.load()
+    if cache.writer is not None:
+        cache.writer.join()
+    return json_info
+
+
+def export(info_paths: list, report: str, out, output_format: str = 'csv',
+           classes: list = None, assignments: list = None,
+           students: list = None, snapshot: bool = False) -> int:
+    """
+    Stream a report of one or more info files. With several files, a first
+    column gives the info file of each row. Each file is released before the
+    next one is loaded.
+
+    :param info_paths: paths of the info files
+    :param report: name of the report, a key of REPORT_HEADERS
+    :param out: text file to write to
+    :param output_format: csv, json or jsonl
+    :param classes: names of the classes to include, None for all
+    :param assignments: names of the assignments to include, None for all
+    :param students: usernames of the students to include, None for all
+    :param snapshot: True to load the info files through snapshots
+    :return: number of rows written
+    """
+
+    headers = REPORT_HEADERS[report]
+    if len(info_paths) > 1:
+        headers = ('info',) + headers
+    if output_format == 'csv':
+        writer = CsvReportWriter(out, headers)
+    else:
+        writer = JsonReportWriter(out, headers, output_format == 'jsonl')
+
+    count = 0
+    for path in info_paths:
+        json_info = load_info(path, snapshot)
+        prefix = (path,) if len(info_paths) > 1 else ()
+        for row in report_rows(json_info, report, classes, assignments,
+                               students):
+            writer.write(prefix + row)
+            count += 1
+        del json_info
+    writer.close()
+    return count
+
+
+def main(argv: list = None) -> int:
+    """
+    Export the tables the GUI shows without Qt.
+
+    :param argv: command line arguments, defaults to sys.argv[1:]
+    :return: exit status
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Export the tables of one or more info files as CSV or '
+                    'JSON.')
+    parser.add_argument('report', choices=sorted(REPORT_HEADERS),
+                        help='table to export')
+    parser.add_argument('info', nargs='*', default=['info.json'],
+                        help='paths of the info files, or directories of '
+                             'them, info.json by default')
+    parser.add_argument('-c', '--class', dest='classes', action='append',
+                        help='only export this class, may be repeated')
+    parser.add_argument('-a', '--assignment', dest='assignments',
+                        action='append',
+                        help='only export this assignment, may be repeated')
+    parser.add_argument('-s', '--student', dest='students', action='append',
+                        help='only export this student, may be repeated')
+    parser.add_argument('-f', '--format', default='csv',
+                        choices=('csv', 'json', 'jsonl'),
+                        help='output format, jsonl writes one object per '
+                             'line')
+    parser.add_argument('-o', '--output',
+                        help='file to write to instead of standard output')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='load the info files through snapshots written '
+                             'next to them')
+    args = parser.parse_args(argv)
+    args.info = find_info_files(args.info)
+
+    try:
+        if args.output:
+            with open(args.output, 'w', newline='') as out:
+                export(args.info, args.report, out, args.format,
+                       args.classes, args.assignments, args.students,
+                       args.snapshot)
+        else:
+            export(args.info, args.report, sys.stdout, args.format,
+                   args.classes, args.assignments, args.students,
+                   args.snapshot)
+    except BrokenPipeError:
+        # the reader of the output, such as head, stopped early
+        sys.stderr.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,437 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from time import perf_counter, sleep
+
+from info import LazyJsonInfo, file_lock, write_atomically
+
+DEFAULT_WORKSPACE = os.path.join(os.path.expanduser('~'), 'gkeep_submissions')
+FETCHED = 'fetched'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+MANIFEST_NAME = 'manifest.json'
+
+
+class FetchError(Exception):
+    """Raised when a git command fails."""
+
+
+class RepoFetch:
+    """A repository to clone or update in the local workspace."""
+
+    def __init__(self, label: str, source: str, destination: str,
+                 expected_hash: str = None):
+        """
+        Create the object
+        :param label: text identifying the repository in progress reports
+        :param source: path or URL of the repository to fetch from
+        :param destination: path of the local clone
+        :param expected_hash: hash the local clone is expected to be at, a
+        clone already at this hash is not fetched again
+        """
+
+        self.label = label
+        self.source = source
+        self.destination = destination
+        self.expected_hash = expected_hash
+
+
+class FetchResult:
+    """Outcome of fetching a repository."""
+
+    def __init__(self, repo_fetch: RepoFetch, status: str, head: str = None,
+                 error: str = None, elapsed: float = 0.0, attempts: int = 1):
+        """
+        Create the object
+        :param repo_fetch: the fetched repository
+        :param status: FETCHED, SKIPPED or FAILED
+        :param head: hash of the local HEAD after fetching
+        :param error: error message if the fetch failed
+        :param elapsed: seconds spent on the repository
+        :param attempts: number of times the fetch was tried
+        """
+
+        self.repo_fetch = repo_fetch
+        self.status = status
+        self.head = head
+        self.error = error
+        self.elapsed = elapsed
+        self.attempts = attempts
+
+    def __str__(self) -> str:
+        text = '{0}: {1} ({2:.2f} s)'.format(self.repo_fetch.label,
+                                            self.status, self.elapsed)
+        if self.attempts > 1:
+            text += ' after {} attempts'.format(self.attempts)
+        if self.error is not None:
+            text += ' {}'.format(self.error)
+        return text
+
+
+class FetchManifest:
+    """
+    Records the hash each local clone was last fetched at, so unchanged
+    repositories are skipped without running git. The error of a failed
+    save is kept in error for the summary.
+    """
+
+    def __init__(self, path: str):
+        """
+        Create the object, reading the manifest file if it exists
+        :param path: path of the manifest file
+        """
+
+        self.path = path
+        self.hashes = {}
+        self.updated = {}
+        self.error = None
+        self.lock = Lock()
+        try:
+            with open(path, 'r') as manifest_file:
+                self.hashes = json.load(manifest_file)
+        except (OSError, ValueError):
+            pass
+
+    def is_current(self, repo_fetch: RepoFetch) -> bool:
+        """
+        Determine if a repository's clone is already at its expected hash.
+
+        :param repo_fetch: the repository to fetch
+        :return: True if the clone exists and was last fetched at the
+        expected hash, False otherwise
+        """
+
+        return repo_fetch.expected_hash is not None and \
+            self.hashes.get(repo_fetch.label) == repo_fetch.expected_hash \
+            and os.path.isdir(os.path.join(repo_fetch.destination, '.git'))
+
+    def record(self, result: FetchResult):
+        """
+        Record the hash of a successfully fetched repository.
+
+        :param result: outcome of fetching the repository
+        """
+
+        if result.status != FAILED and result.head is not None:
+            with self.lock:
+                self.hashes[result.repo_fetch.label] = result.head
+                self.updated[result.repo_fetch.label] = result.head
+
+    def save(self):
+        """
+        Write the recorded hashes, merged into the manifest file as it is
+        now so concurrent fetches into the same workspace keep each
+        other's entries.
+        """
+
+        with file_lock(self.path), self.lock:
+            hashes = {}
+            try:
+                with open(self.path, 'r') as manifest_file:
+                    hashes = json.load(manifest_file)
+            except (OSError, ValueError):
+                pass
+            hashes.update(self.updated)
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            write_atomically(self.path, json.dumps(
+                hashes, indent=1, sort_keys=True).encode('utf-8'))
+
+
+class FetchSummary:
+    """Counts and timings of a set of fetches."""
+
+    def __init__(self, results: list, elapsed: float,
+                 manifest: FetchManifest = None):
+        """
+        Create the object
+        :param results: list of FetchResult
+        :param elapsed: wall time of the whole set of fetches in seconds
+        :param manifest: FetchManifest the fetches were recorded in
+        """
+
+        self.results = results
+        self.elapsed = elapsed
+        self.manifest_error = manifest.error if manifest is not None else None
+        self.counts = {FETCHED: 0, SKIPPED: 0, FAILED: 0}
+        for result in results:
+            self.counts[result.status] += 1
+
+    def failed(self) -> list:
+        """
+        Get the fetches that failed.
+
+        :return: list of FetchResult
+        """
+
+        return [result for result in self.results if result.status == FAILED]
+
+    def __str__(self) -> str:
+        slowest = max((result.elapsed for result in self.results),
+                      default=0.0)
+        text = 'fetched {0}, skipped {1}, failed {2} in {3:.2f} s ' \
+            '(slowest repository {4:.2f} s)'.format(
+                self.counts[FETCHED], self.counts[SKIPPED],
+                self.counts[FAILED], self.elapsed, slowest)
+        if self.manifest_error is not None:
+            text += ', manifest not saved: {}'.format(self.manifest_error)
+        return text
+
+
+def run_git(args: list, cwd: str = None) -> str:
+    """
+    Run a git command without prompting for credentials.
+
+    :param args: arguments to git
+    :param cwd: directory to run git in
+    :return: standard output of the command, stripped
+    """
+
+    env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+    try:
+        process = subprocess.run(['git'] + args, cwd=cwd, env=env,
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE,
+                                 universal_newlines=True)
+    except OSError as e:
+        raise FetchError(str(e))
+    if process.returncode != 0:
+        raise FetchError(process.stderr.strip())
+    return process.stdout.strip()
+
+
+def local_head(path: str) -> str:
+    """
+    Get the hash of the HEAD of a local clone.
+
+    :param path: path of the clone
+    :return: hash of HEAD, or None if there is no clone or it has no commits
+    """
+
+    if not os.path.isdir(os.path.join(path, '.git')):
+        return None
+    try:
+        return run_git(['rev-parse', '--verify', '--quiet', 'HEAD'], path)
+    except FetchError:
+        return None
+
+
+def fetch_repo(repo_fetch: RepoFetch) -> FetchResult:
+    """
+    Clone a repository, or fast-forward an existing clone of it. A clone
+    whose HEAD is already at the expected hash is skipped.
+
+    :param repo_fetch: the repository to fetch
+    :return: the outcome
+    """
+
+    start = perf_counter()
+    head = local_head(repo_fetch.destination)
+    if head is not None and head == repo_fetch.expected_hash:
+        return FetchResult(repo_fetch, SKIPPED, head,
+                           elapsed=perf_counter() - start)
+
+    try:
+        if head is None and not os.path.exists(repo_fetch.destination):
+            os.makedirs(os.path.dirname(repo_fetch.destination),
+                        exist_ok=True)
+            run_git(['clone', '--quiet', repo_fetch.source,
+                     repo_fetch.destination])
+        else:
+            run_git(['pull', '--ff-only', '--quiet'], repo_fetch.destination)
+    except (FetchError, OSError) as e:
+        return FetchResult(repo_fetch, FAILED, head, str(e),
+                           perf_counter() - start)
+
+    return FetchResult(repo_fetch, FETCHED,
+                       local_head(repo_fetch.destination),
+                       elapsed=perf_counter() - start)
+
+
+def fetch_repo_with_retries(repo_fetch: RepoFetch, retries: int = 0,
+                            retry_delay: float = 1.0) -> FetchResult:
+    """
+    Fetch a repository, trying again after failures. The delay doubles
+    after each failed attempt.
+
+    :param repo_fetch: the repository to fetch
+    :param retries: number of times to try again after a failure
+    :param retry_delay: seconds to wait before the first retry
+    :return: the outcome of the last attempt
+    """
+
+    elapsed = 0.0
+    for attempt in range(1, retries + 2):
+        result = fetch_repo(repo_fetch)
+        elapsed += result.elapsed
+        if result.status != FAILED or attempt > retries:
+            break
+        sleep(retry_delay * 2 ** (attempt - 1))
+    result.elapsed = elapsed
+    result.attempts = attempt
+    return result
+
+
+def fetch_repos(repo_fetches: list, max_workers: int = 4,
+                progress=None, manifest: FetchManifest = None,
+                retries: int = 0) -> list:
+    """
+    Fetch repositories concurrently.
+
+    :param repo_fetches: list of RepoFetch
+    :param max_workers: maximum number of repositories fetched at once
+    :param progress: function called with each FetchResult as soon as the
+    repository is done
+    :param manifest: FetchManifest to skip unchanged repositories with and
+    to record fetched hashes in, it is saved once all are done and its error
+    is set if saving fails
+    :param retries: number of times to try again after a failure
+    :return: list of FetchResult, in the order the repositories finished
+    """
+
+    results = []
+
+    def done(result):
+        if manifest is not None:
+            manifest.record(result)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for repo_fetch in repo_fetches:
+            if manifest is not None and manifest.is_current(repo_fetch):
+                done(FetchResult(repo_fetch, SKIPPED,
+                                 repo_fetch.expected_hash))
+            else:
+                futures.append(executor.submit(fetch_repo_with_retries,
+                                               repo_fetch, retries))
+        for future in as_completed(futures):
+            done(future.result())
+
+    if manifest is not None:
+        try:
+            manifest.save()
+        except OSError as e:
+            manifest.error = str(e)
+    return results
+
+
+def submission_fetch(json_info, workspace: str, class_name: str,
+                     assignment: str, username: str) -> RepoFetch:
+    """
+    Describe how to fetch a student's submission of an assignment. The clone
+    goes to workspace/class/assignment/username.
+
+    :param json_info: JsonInfo of the info
+    :param workspace: directory holding the local clones
+    :param class_name: name of a class
+    :param assignment: name of an assignment
+    :param username: username of a student
+    :return: the RepoFetch of the submission
+    """
+
+    return RepoFetch(
+        '{0}/{1}/{2}'.format(class_name, assignment, username),
+        json_info.assignment_by_student_path(class_name, assignment, username),
+        os.path.join(workspace, class_name, assignment, username),
+        json_info.assignment_by_student_hash(class_name, assignment, username))
+
+
+def student_fetches(json_info, workspace: str, class_name: str,
+                    username: str) -> list:
+    """
+    Describe how to fetch all the submissions of a student.
+
+    :param json_info: JsonInfo of the info
+    :param workspace: directory holding the local clones
+    :param class_name: name of a class
+    :param username: username of a student
+    :return: list of RepoFetch
+    """
+
+    return [submission_fetch(json_info, workspace, class_name, assignment,
+                             username)
+            for assignment
+            in json_info.assignments_by_student_list(class_name, username)]
+
+
+def assignment_fetches(json_info, workspace: str, class_name: str,
+                       assignment: str) -> list:
+    """
+    Describe how to fetch every submission of an assignment, one per
+    student repository.
+
+    :param json_info: JsonInfo of the info
+    :param workspace: directory holding the local clones
+    :param class_name: name of a class
+    :param assignment: name of an assignment
+    :return: list of RepoFetch
+    """
+
+    return [submission_fetch(json_info, workspace, class_name, assignment,
+                             username)
+            for username
+            in json_info.students_repos_list(class_name, assignment)]
+
+
+def workspace_manifest(workspace: str) -> FetchManifest:
+    """
+    Get the manifest of a workspace.
+
+    :param workspace: directory holding the local clones
+    :return: FetchManifest stored in the workspace
+    """
+
+    return FetchManifest(os.path.join(workspace, MANIFEST_NAME))
+
+
+def main(argv: list = None) -> int:
+    """
+    Fetch every student's submission of an assignment without the GUI.
+
+    :param argv: command line arguments, defaults to sys.argv[1:]
+    :return: exit status, 1 if any repository failed or the manifest could
+    not be saved
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Fetch all the submissions of an assignment.')
+    parser.add_argument('class_name', help='name of the class')
+    parser.add_argument('assignment', help='name of the assignment')
+    parser.add_argument('--info', default='info.json',
+                        help='path of the info file')
+    parser.add_argument('--workspace', default=DEFAULT_WORKSPACE,
+                        help='directory to clone the submissions into')
+    parser.add_argument('-j', '--jobs', type=int, default=8,
+                        help='number of repositories fetched at once')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='number of times to retry a failed fetch')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='only print the summary')
+    args = parser.parse_args(argv)
+
+    json_info = LazyJsonInfo.from_file(args.info)
+    json_info.load_class(args.class_name)
+
+    def progress(result):
+        if not args.quiet or result.status == FAILED:
+            print(result, flush=True)
+
+    start = perf_counter()
+    manifest = workspace_manifest(args.workspace)
+    results = fetch_repos(
+        assignment_fetches(json_info, args.workspace, args.class_name,
+                           args.assignment),
+        args.jobs, progress, manifest, args.retries)
+    summary = FetchSummary(results, perf_counter() - start, manifest)
+    print(summary)
+    return 1 if summary.failed() or summary.manifest_error else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1877 @@
+import multiprocessing
+import os
+import pickle
+import re
+import struct
+import tempfile
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha1
+from json import JSONDecoder, JSONDecodeError, loads
+from sys import intern
+from threading import Lock, RLock, Thread
+from time import localtime, perf_counter
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+NON_BRACKETS = r'[^"{}\[\]]*'
+UNESCAPED_STRING = r'"[^"]*"'
+FLAT_OBJECT = r'\{{{0}(?:{1}{0})*\}}'.format(NON_BRACKETS, UNESCAPED_STRING)
+TO_NEXT_BRACKET = re.compile(r'{0}(?:(?:{1}|{2}){0})*'.format(
+    NON_BRACKETS, UNESCAPED_STRING, FLAT_OBJECT))
+SNAPSHOT_MAGIC = b'GKSNAP4\n'
+SNAPSHOT_HEADER_LENGTH = struct.Struct('<Q')
+# mkstemp creates files only their owner can read, written files get the
+# permissions open would give them instead
+UMASK = os.umask(0)
+os.umask(UMASK)
+FILE_LOCKS = {}
+FILE_LOCKS_LOCK = Lock()
+
+
+def file_lock(path: str) -> Lock:
+    """
+    Get the lock of a file, shared by every object of the process that
+    reads and rewrites it.
+
+    :param path: path of the file
+    :return: the same Lock for every call with the same file
+    """
+
+    with FILE_LOCKS_LOCK:
+        return FILE_LOCKS.setdefault(os.path.abspath(path), Lock())
+
+
+def write_atomically(path: str, *chunks):
+    """
+    Write a file through a temporary file of its directory renamed over it,
+    so readers never see it half written. Each write has its own temporary
+    file, so concurrent writes of the same file cannot mix.
+
+    :param path: path of the file
+    :param chunks: bytes-like objects making up the contents of the file
+    """
+
+    descriptor, temp_path = tempfile.mkstemp(
+        prefix=os.path.basename(path) + '.', suffix='.tmp',
+        dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(descriptor, 'wb') as temp_file:
+            for chunk in chunks:
+                temp_file.write(chunk)
+        os.chmod(temp_path, 0o666 & ~UMASK)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def format_time(timestamp: int) -> str:
+    """
+    Format a Unix time as month/day/year hour:min:second in local time.
+
+    :param timestamp: Unix time
+    :return: the formatted time
+    """
+
+    time = localtime(timestamp)
+    return '{0}/{1}/{2} {3}:{4}:{5}'.\
+        format(time.tm_mon, time.tm_mday, time.tm_year,
+               time.tm_hour, time.tm_min, time.tm_sec)
+
+
+class TimeFormatCache:
+    """
+    Formats Unix times with format_time once per distinct value. Many
+    submissions share a time, e.g. the initial commit of every student's
+    repository, and a sorted table formats nothing again.
+    """
+
+    def __init__(self):
+        """
+        Create an empty cache
+        """
+
+        self.formatted = {}
+
+    def format(self, timestamp: int) -> str:
+        """
+        Get a formatted time, formatting it if it is not cached.
+
+        :param timestamp: Unix time
+        :return: the formatted time
+        """
+
+        text = self.formatted.get(timestamp)
+        if text is None:
+            text = self.formatted[timestamp] = format_time(timestamp)
+        return text
+
+    def format_many(self, timestamps):
+        """
+        Format and cache a batch of times, skipping the cached ones.
+
+        :param timestamps: iterable of Unix times
+        """
+
+        formatted = self.formatted
+        formatted.update((timestamp, format_time(timestamp))
+                         for timestamp in set(timestamps)
+                         if timestamp not in formatted)
+
+
+TIME_FORMATS = TimeFormatCache()
+
+
+class JsonInfo:
+    """Provides methods for extracting information from the info dictionary."""
+
+    def __init__(self, info_dict: dict):
+        """
+        Create the object
+        :param info_dict: dictionary of info
+        """
+
+        self.info_dict = info_dict
+
+    def class_count(self) -> int:
+        """
+        Get the number of classes.
+
+        :return: number of classes
+        """
+
+        return len(self.info_dict)
+
+    def class_list(self) -> list:
+        """
+        Get the list of classes.
+
+        :return: list of classes
+        """
+
+        return list(self.info_dict.keys())
+
+    def is_loaded(self, class_name: str) -> bool:
+        """
+        Determine if all the info of a class is available.
+
+        :param class_name: name of a class
+        :return: True, the info dictionary is complete
+        """
+
+        return True
+
+    def load_class(self, class_name: str):
+        """
+        Make sure all the info of a class is available. The info dictionary
+        is complete already, so there is nothing to do.
+
+        :param class_name: name of a class
+        """
+
+        pass
+
+    def student_count(self, class_name: str) -> int:
+        """
+        Get the number of students in a class.
+
+        :param class_name: name of a class
+        :return: number of students in the class
+        """
+
+        return len(self.info_dict[class_name]['students'])
+
+    def student_list(self, class_name: str) -> list:
+        """
+        Get the list of the students in a class.
+
+        :param class_name: name of a class
+        :return: list of students in the class
+        """
+
+        return list(self.info_dict[class_name]['students'])
+
+    def assignment_count(self, class_name: str) -> int:
+        """
+        Get the number of assignments for a class.
+
+        :param class_name: name of a class
+        :return: number of assignments for the class
+        """
+
+        return len(self.info_dict[class_name]['assignments'])
+
+    def assignment_list(self, class_name: str) -> list:
+        """
+        Get the info dictionary of assignments for a class.
+
+        :param class_name: name of a class
+        :return: info dictionary of assignments for a class
+        """
+
+        return list(self.info_dict[class_name]['assignments'])
+
+    def is_published(self, class_name: str, assignment: str) -> bool:
+        """
+        Determine if an assignment is published.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: True if the assignment is published, False otherwise
+        """
+
+        return self.info_dict[class_name][assignment]['published']
+
+    def assignment_hash(self, class_name: str, assignment: str) -> str:
+        """
+        Get the hash of an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: assignment's hash
+        """
+
+        return self.info_dict[class_name][assignment]['hash']
+
+    def assignment_path(self, class_name: str, assignment: str) -> str:
+        """
+        Get the path of an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: assignment's path
+        """
+
+        return self.info_dict[class_name][assignment]['path']
+
+    def student_submitted_count(self, class_name: str, assignment: str) -> int:
+        """
+        Get the number of students who submitted an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: number of students who submitted the assignment
+        """
+
+        students_submitted = 0
+        for student in self.student_list(class_name):
+            if self.submission_count(class_name, assignment, student) != 0:
+                students_submitted += 1
+        return students_submitted
+
+    def students_submitted_list(self, class_name: str, assignment: str) \
+            -> list:
+        """
+        Get the info dictionary of students who submitted an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: info dictionary of students who submitted an assignment
+        """
+
+        students_submitted = []
+        for student in self.student_list(class_name):
+            if self.submission_count(class_name, assignment, student) != 0:
+                students_submitted.append(student)
+        return students_submitted
+
+    def email_address(self, class_name: str, username: str) -> str:
+        """
+        Get the email address of a student.
+
+        :param class_name: name of a class
+        :param username: username of a student
+        :return: student's email address
+        """
+
+        return self.info_dict[class_name]['students'][username][
+            'email_address']
+
+    def first_name(self, class_name: str, username: str) -> str:
+        """
+        Get the first name of a student.
+
+        :param class_name: name of a class
+        :param username: username of a student
+        :return: student's first name
+        """
+
+        return self.info_dict[class_name]['students'][username]['first']
+
+    def home_dir(self, class_name: str, username: str) -> str:
+        """
+        Get the home directory of a student.
+
+        :param class_name: name of a class
+        :param username: username of a student
+        :return: student's home directory
+        """
+
+        return self.info_dict[class_name]['students'][username]['home_dir']
+
+    def last_name(self, class_name: str, username: str) -> str:
+        """
+        Get the last name of a student.
+
+        :param class_name: name of a class
+        :param username: username of a student
+        :return: student's last name
+        """
+
+        return self.info_dict[class_name]['students'][username]['last']
+
+    def students_repos_list(self, class_name: str, assignment: str) -> list:
+        """
+        Get the students who have a repository for an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: list of usernames
+        """
+
+        return [username for username, student_repo
+                in self.info_dict[class_name]['assignments'][assignment][
+                    'students_repos'].items()
+                if student_repo is not None]
+
+    def assignments_by_student_list(self, class_name: str, username: str) \
+            -> list:
+        """
+        Get all the assignments for a student.
+
+        :param class_name: name of a student
+        :param username: username of a student
+        :return: an info dict of all the assignments for a student
+        """
+
+        student_assignments = []
+        for an_assignment in self.assignment_list(class_name):
+            student_assignment = self.info_dict[class_name]['assignments'][
+                an_assignment]['students_repos'][username]
+            if student_assignment is not None:
+                student_assignments.append(an_assignment)
+        return student_assignments
+
+    def assignment_by_student_hash(self, class_name: str, assignment: str,
+                                   username: str) -> str:
+        """
+        Get the hash of a student's assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :param username: username of a student
+        :return: the hash of a student's assignment
+        """
+        return self.info_dict[class_name]['assignments'][assignment][
+            'students_repos'][username]['hash']
+
+    def assignment_by_student_path(self, class_name: str, assignment: str,
+                                   username: str) -> str:
+        """
+        Get the path of a student's assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :param username: username of a student
+        :return: the path of a student's assignment
+        """
+
+        return self.info_dict[class_name]['assignments'][assignment][
+            'students_repos'][username]['path']
+
+    def submission_count(self, class_name: str, assignment: str,
+                         username: str) -> int:
+        """
+        Get the submission count of a student for an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :param username: username of a student
+        :return: student's submission count for an assignment
+        """
+
+        return self.info_dict[class_name]['assignments'][assignment][
+            'students_repos'][username]['submission_count']
+
+    def time(self, class_name: str, assignment: str, username: str):
+        """
+        Get the Unix time a student last submitted an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :param username: username of a student
+        :return: the Unix time a student last submitted an assignment.
+        """
+
+        return self.info_dict[class_name]['assignments'][assignment][
+            'students_repos'][username]['time']
+
+    def time_converted(self, class_name: str, assignment: str, username: str)\
+            -> str:
+        """
+        Get a string of the time a student last submitted an assignment
+        (month/day/year hour:min:second)
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :param username: username of a student
+        :return: a string of the time a student last submitted an assignment
+        """
+
+        return format_time(self.time(class_name, assignment, username))
+
+    def get_username_from_name(self, class_name: str, name: str) -> str:
+        """
+        Get the username of a student from his/her full name.
+
+        :param class_name: name of a class
+        :param name: a student's full name in the format
+        "last name, first name"
+        :return: student's username
+        """
+
+        for username in self.student_list(class_name):
+            name_form = '{0}, {1}'.format(
+                self.last_name(class_name, username),
+                self.first_name(class_name, username))
+            if name_form == name:
+                return username
+
+    def last_first_username(self, class_name: str, username: str) -> str:
+        """
+        Get the last name, first name, and username of a student.
+
+        :param class_name: name of a class
+        :param username: username of a student
+        :return: a string in the format "last name, first name, username"
+
+        """
+        return self.info_dict[class_name]['students'][username][
+            'last_first_username']
+
+
+class IndexedJsonInfo(JsonInfo):
+    """
+    Provides the JsonInfo methods backed by indexes that are built once
+    from the info dictionary, so per-assignment and per-student queries do
+    not walk the whole class on every call.
+    """
+
+    def __init__(self, info_dict: dict):
+        """
+        Create the object and index every class
+        :param info_dict: dictionary of info
+        """
+
+        super().__init__(info_dict)
+        self.submitted_lists = {}
+        self.student_assignments = {}
+        self.usernames_by_name = {}
+
+        for class_name in self.info_dict:
+            self.index_class(class_name)
+
+    def index_class(self, class_name: str):
+        """
+        Build the indexes of a class, replacing any previous ones.
+
+        :param class_name: name of a class
+        """
+
+        students = self.info_dict[class_name]['students']
+        assignments = self.info_dict[class_name]['assignments']
+
+        submitted_lists = {}
+        student_assignments = {username: [] for username in students}
+        for assignment, assignment_info in assignments.items():
+            students_repos = assignment_info['students_repos']
+            submitted = []
+            for username in students:
+                student_repo = students_repos.get(username)
+                if student_repo is None:
+                    continue
+                student_assignments[username].append(assignment)
+                if student_repo['submission_count'] != 0:
+                    submitted.append(username)
+            submitted_lists[assignment] = submitted
+
+        usernames_by_name = {}
+        for username, student in students.items():
+            name_form = '{0}, {1}'.format(student['last'], student['first'])
+            usernames_by_name.setdefault(name_form, username)
+
+        self.submitted_lists[class_name] = submitted_lists
+        self.student_assignments[class_name] = student_assignments
+        self.usernames_by_name[class_name] = usernames_by_name
+
+    def student_submitted_count(self, class_name: str, assignment: str) -> int:
+        """
+        Get the number of students who submitted an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: number of students who submitted the assignment
+        """
+
+        return len(self.submitted_lists[class_name][assignment])
+
+    def students_submitted_list(self, class_name: str, assignment: str) \
+            -> list:
+        """
+        Get the info dictionary of students who submitted an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: info dictionary of students who submitted an assignment
+        """
+
+        return list(self.submitted_lists[class_name][assignment])
+
+    def assignments_by_student_list(self, class_name: str, username: str) \
+            -> list:
+        """
+        Get all the assignments for a student.
+
+        :param class_name: name of a student
+        :param username: username of a student
+        :return: an info dict of all the assignments for a student
+        """
+
+        return list(self.student_assignments[class_name][username])
+
+    def get_username_from_name(self, class_name: str, name: str) -> str:
+        """
+        Get the username of a student from his/her full name.
+
+        :param class_name: name of a class
+        :param name: a student's full name in the format
+        "last name, first name"
+        :return: student's username
+        """
+
+        return self.usernames_by_name[class_name].get(name)
+
+
+def intern_text(value):
+    """
+    Intern a string, leaving any other value, e.g. a null name, as it is.
+
+    :param value: the value
+    :return: the interned string, or the value
+    """
+
+    return intern(value) if type(value) is str else value
+
+
+def set_number(column: array, odd: dict, row: int, value):
+    """
+    Store a number in a column of an AssignmentRecord, or in odd if the
+    column cannot hold it, e.g. a float, a null or a number too large.
+
+    :param column: the column
+    :param odd: dictionary mapping rows to values kept as they are
+    :param row: row of the value
+    :param value: the value
+    """
+
+    if type(value) is int:
+        try:
+            column[row] = value
+            return
+        except OverflowError:
+            pass
+    odd[row] = value
+
+
+class StudentRecord:
+    """The info of a student, with interned names."""
+
+    __slots__ = ('username', 'first', 'last', 'email_address', 'home_dir',
+                 'last_first_username')
+
+    def __init__(self, username: str, student: dict):
+        """
+        Create the object
+        :param username: username of the student
+        :param student: info dictionary of the student
+        """
+
+        self.username = intern(username)
+        self.first = intern_text(student.get('first', ''))
+        self.last = intern_text(student.get('last', ''))
+        self.email_address = student.get('email_address')
+        self.home_dir = student.get('home_dir')
+        self.last_first_username = student.get('last_first_username')
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+        self.username = intern(self.username)
+        self.first = intern_text(self.first)
+        self.last = intern_text(self.last)
+
+
+class AssignmentRecord:
+    """
+    The student repositories of an assignment stored as columns, indexed by
+    the row of each username in its ClassRecord. Hashes are stored as 20
+    bytes each, and the path of a repository is rebuilt from its student's
+    home directory and a suffix shared by the assignment. Counts, times,
+    hashes and paths that do not fit are kept as they are in odd_counts,
+    odd_times, odd_hashes and odd_paths.
+    """
+
+    __slots__ = ('name', 'published', 'reports_hash', 'reports_path',
+                 'present', 'submission_counts', 'times', 'hashes',
+                 'path_suffix', 'odd_counts', 'odd_times', 'odd_hashes',
+                 'odd_paths')
+
+    def __init__(self, name: str, assignment: dict, class_record):
+        """
+        Create the object
+        :param name: name of the assignment
+        :param assignment: info dictionary of the assignment
+        :param class_record: ClassRecord of the class, which must already
+        have a row for every username of the assignment's repositories
+        """
+
+        row_count = len(class_record.usernames)
+        reports_repo = assignment.get('reports_repo') or {}
+        self.name = intern(name)
+        self.published = assignment.get('published')
+        self.reports_hash = reports_repo.get('hash')
+        self.reports_path = reports_repo.get('path')
+        self.present = bytearray(row_count)
+        self.submission_counts = array('l', [0]) * row_count
+        self.times = array('q', [0]) * row_count
+        hashes = bytearray(row_count * 20)
+        self.path_suffix = None
+        self.odd_counts = {}
+        self.odd_times = {}
+        self.odd_hashes = {}
+        self.odd_paths = {}
+
+        for username, repo in assignment['students_repos'].items():
+            if repo is None:
+                continue
+            row = class_record.rows[username]
+            self.present[row] = 1
+            set_number(self.submission_counts, self.odd_counts, row,
+                       repo['submission_count'])
+            set_number(self.times, self.odd_times, row, repo['time'])
+
+            repo_hash = repo.get('hash')
+            try:
+                binary_hash = bytes.fromhex(repo_hash)
+            except (TypeError, ValueError):
+                binary_hash = b''
+            if len(binary_hash) == 20 and binary_hash.hex() == repo_hash:
+                hashes[row * 20:row * 20 + 20] = binary_hash
+            else:
+                self.odd_hashes[row] = repo_hash
+
+            path = repo.get('path')
+            student = class_record.students.get(username)
+            home_dir = student.home_dir if student is not None else None
+            prefix = '{}/'.format(home_dir)
+            if home_dir and path and path.startswith(prefix):
+                suffix = path[len(prefix):]
+                if self.path_suffix is None:
+                    self.path_suffix = suffix
+                if suffix == self.path_suffix:
+                    continue
+            self.odd_paths[row] = path
+
+        self.hashes = bytes(hashes)
+
+    def submission_count(self, row: int) -> int:
+        """
+        Get the submission count of a student repository.
+
+        :param row: row of the student's username
+        :return: the submission count
+        """
+
+        if row in self.odd_counts:
+            return self.odd_counts[row]
+        return self.submission_counts[row]
+
+    def time(self, row: int) -> int:
+        """
+        Get the last submission time of a student repository.
+
+        :param row: row of the student's username
+        :return: the Unix time
+        """
+
+        if row in self.odd_times:
+            return self.odd_times[row]
+        return self.times[row]
+
+    def repo_hash(self, row: int) -> str:
+        """
+        Get the hash of a student repository.
+
+        :param row: row of the student's username
+        :return: the hash
+        """
+
+        if row in self.odd_hashes:
+            return self.odd_hashes[row]
+        return self.hashes[row * 20:row * 20 + 20].hex()
+
+    def repo_path(self, row: int, home_dir: str) -> str:
+        """
+        Get the path of a student repository.
+
+        :param row: row of the student's username
+        :param home_dir: home directory of the student
+        :return: the path
+        """
+
+        if row in self.odd_paths:
+            return self.odd_paths[row]
+        return '{0}/{1}'.format(home_dir, self.path_suffix)
+
+
+class ClassRecord:
+    """
+    The students of a class, and its assignments once they are loaded. Each
+    username of the students or of a student repository has a row indexing
+    the columns of the AssignmentRecords. Loading the assignments also
+    builds the lists of the students who submitted each assignment and of
+    the assignments of each username, as IndexedJsonInfo does.
+    """
+
+    __slots__ = ('students', 'usernames', 'rows', 'usernames_by_name',
+                 'assignments', 'submitted_lists', 'student_assignments')
+
+    def __init__(self, students: dict):
+        """
+        Create the object without assignments
+        :param students: info dictionary of the students of the class
+        """
+
+        self.students = {}
+        self.usernames = []
+        self.rows = {}
+        self.usernames_by_name = {}
+        self.assignments = None
+        self.submitted_lists = None
+        self.student_assignments = None
+        for username, student in students.items():
+            record = StudentRecord(username, student)
+            self.students[record.username] = record
+            self.add_row(record.username)
+            self.usernames_by_name.setdefault(
+                '{0}, {1}'.format(record.last, record.first), record.username)
+
+    def add_row(self, username: str) -> int:
+        """
+        Get the row of a username, adding one if it has none.
+
+        :param username: the username
+        :return: the row
+        """
+
+        row = self.rows.get(username)
+        if row is None:
+            row = self.rows[username] = len(self.usernames)
+            self.usernames.append(intern(username))
+        return row
+
+    def load_assignments(self, assignments: dict):
+        """
+        Convert the assignments of the class into AssignmentRecords and
+        index them.
+
+        :param assignments: info dictionary of the assignments of the class
+        """
+
+        for assignment in assignments.values():
+            for username in assignment['students_repos']:
+                self.add_row(username)
+        self.assignments = {name: AssignmentRecord(name, assignment, self)
+                            for name, assignment in assignments.items()}
+
+        student_rows = [(username, self.rows[username])
+                        for username in self.students]
+        self.submitted_lists = {}
+        self.student_assignments = {username: []
+                                    for username in self.usernames}
+        for name, record in self.assignments.items():
+            present = record.present
+            submission_count = record.submission_count
+            self.submitted_lists[name] = [
+                username for username, row in student_rows
+                if present[row] and submission_count(row) != 0]
+            for row, username in enumerate(self.usernames):
+                if present[row]:
+                    self.student_assignments[username].append(name)
+
+    def assignments_state(self) -> tuple:
+        """
+        Get the assignments and their indexes, to store them apart from the
+        students.
+
+        :return: tuple to pass to set_assignments_state
+        """
+
+        return self.assignments, self.submitted_lists, self.student_assignments
+
+    def set_assignments_state(self, state: tuple):
+        """
+        Replace the assignments and their indexes.
+
+        :param state: tuple returned by assignments_state, or a tuple of
+        three None to unload them
+        """
+
+        self.assignments, self.submitted_lists, self.student_assignments = \
+            state
+
+    def __getstate__(self):
+        return (list(self.students.values()), self.usernames,
+                self.usernames_by_name, self.assignments_state())
+
+    def __setstate__(self, state):
+        students, usernames, self.usernames_by_name, assignments_state = \
+            state
+        self.set_assignments_state(assignments_state)
+        self.students = {student.username: student for student in students}
+        self.usernames = [intern(username) for username in usernames]
+        self.rows = {username: row
+                     for row, username in enumerate(self.usernames)}
+
+
+class CompactJsonInfo(JsonInfo):
+    """
+    Provides the JsonInfo methods from ClassRecords instead of the info
+    dictionary. Student repositories are stored as columns of numbers and
+    binary hashes instead of one dictionary each, names are interned, and the
+    names repeated in each repository are dropped.
+    """
+
+    def __init__(self, classes: dict):
+        """
+        Create the object
+        :param classes: dictionary mapping each class to its ClassRecord
+        """
+
+        super().__init__(None)
+        self.classes = classes
+
+    @classmethod
+    def from_dict(cls, info_dict: dict):
+        """
+        Convert an info dictionary.
+
+        :param info_dict: dictionary of info
+        :return: the object
+        """
+
+        classes = {}
+        for class_name, class_info in info_dict.items():
+            classes[class_name] = ClassRecord(class_info['students'])
+            classes[class_name].load_assignments(class_info['assignments'])
+        return cls(classes)
+
+    def repo_row(self, class_name: str, assignment: str, username: str) \
+            -> tuple:
+        """
+        Find the record and row of a student repository.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :param username: username of a student
+        :return: the AssignmentRecord and the row of the repository
+        """
+
+        class_record = self.classes[class_name]
+        record = class_record.assignments[assignment]
+        row = class_record.rows[username]
+        if not record.present[row]:
+            raise KeyError(username)
+        return record, row
+
+    def class_count(self) -> int:
+        """
+        Get the number of classes.
+
+        :return: number of classes
+        """
+
+        return len(self.classes)
+
+    def class_list(self) -> list:
+        """
+        Get the list of classes.
+
+        :return: list of classes
+        """
+
+        return list(self.classes)
+
+    def is_loaded(self, class_name: str) -> bool:
+        """
+        Determine if all the info of a class is available.
+
+        :param class_name: name of a class
+        :return: True if the assignments of the class are loaded, False
+        otherwise
+        """
+
+        return self.classes[class_name].assignments is not None
+
+    def student_count(self, class_name: str) -> int:
+        """
+        Get the number of students in a class.
+
+        :param class_name: name of a class
+        :return: number of students in the class
+        """
+
+        return len(self.classes[class_name].students)
+
+    def student_list(self, class_name: str) -> list:
+        """
+        Get the list of the students in a class.
+
+        :param class_name: name of a class
+        :return: list of students in the class
+        """
+
+        return list(self.classes[class_name].students)
+
+    def assignment_count(self, class_name: str) -> int:
+        """
+        Get the number of assignments for a class.
+
+        :param class_name: name of a class
+        :return: number of assignments for the class
+        """
+
+        return len(self.classes[class_name].assignments)
+
+    def assignment_list(self, class_name: str) -> list:
+        """
+        Get the info dictionary of assignments for a class.
+
+        :param class_name: name of a class
+        :return: info dictionary of assignments for a class
+        """
+
+        return list(self.classes[class_name].assignments)
+
+    def is_published(self, class_name: str, assignment: str) -> bool:
+        """
+        Determine if an assignment is published.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: True if the assignment is published, False otherwise
+        """
+
+        return self.classes[class_name].assignments[assignment].published
+
+    def assignment_hash(self, class_name: str, assignment: str) -> str:
+        """
+        Get the hash of an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: assignment's hash
+        """
+
+        return self.classes[class_name].assignments[assignment].reports_hash
+
+    def assignment_path(self, class_name: str, assignment: str) -> str:
+        """
+        Get the path of an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: assignment's path
+        """
+
+        return self.classes[class_name].assignments[assignment].reports_path
+
+    def student_submitted_count(self, class_name: str, assignment: str) -> int:
+        """
+        Get the number of students who submitted an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: number of students who submitted the assignment
+        """
+
+        return len(self.classes[class_name].submitted_lists[assignment])
+
+    def students_submitted_list(self, class_name: str, assignment: str) \
+            -> list:
+        """
+        Get the info dictionary of students who submitted an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: info dictionary of students who submitted an assignment
+        """
+
+        return list(self.classes[class_name].submitted_lists[assignment])
+
+    def email_address(self, class_name: str, username: str) -> str:
+        """
+        Get the email address of a student.
+
+        :param class_name: name of a class
+        :param username: username of a student
+        :return: student's email address
+        """
+
+        return self.classes[class_name].students[username].email_address
+
+    def first_name(self, class_name: str, username: str) -> str:
+        """
+        Get the first name of a student.
+
+        :param class_name: name of a class
+        :param username: username of a student
+        :return: student's first name
+        """
+
+        return self.classes[class_name].students[username].first
+
+    def home_dir(self, class_name: str, username: str) -> str:
+        """
+        Get the home directory of a student.
+
+        :param class_name: name of a class
+        :param username: username of a student
+        :return: student's home directory
+        """
+
+        return self.classes[class_name].students[username].home_dir
+
+    def last_name(self, class_name: str, username: str) -> str:
+        """
+        Get the last name of a student.
+
+        :param class_name: name of a class
+        :param username: username of a student
+        :return: student's last name
+        """
+
+        return self.classes[class_name].students[username].last
+
+    def students_repos_list(self, class_name: str, assignment: str) -> list:
+        """
+        Get the students who have a repository for an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :return: list of usernames
+        """
+
+        class_record = self.classes[class_name]
+        present = class_record.assignments[assignment].present
+        return [username for row, username
+                in enumerate(class_record.usernames) if present[row]]
+
+    def assignments_by_student_list(self, class_name: str, username: str) \
+            -> list:
+        """
+        Get all the assignments for a student.
+
+        :param class_name: name of a student
+        :param username: username of a student
+        :return: an info dict of all the assignments for a student
+        """
+
+        return list(self.classes[class_name].student_assignments[username])
+
+    def assignment_by_student_hash(self, class_name: str, assignment: str,
+                                   username: str) -> str:
+        """
+        Get the hash of a student's assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :param username: username of a student
+        :return: the hash of a student's assignment
+        """
+
+        record, row = self.repo_row(class_name, assignment, username)
+        return record.repo_hash(row)
+
+    def assignment_by_student_path(self, class_name: str, assignment: str,
+                                   username: str) -> str:
+        """
+        Get the path of a student's assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :param username: username of a student
+        :return: the path of a student's assignment
+        """
+
+        record, row = self.repo_row(class_name, assignment, username)
+        student = self.classes[class_name].students.get(username)
+        return record.repo_path(row, student and student.home_dir)
+
+    def submission_count(self, class_name: str, assignment: str,
+                         username: str) -> int:
+        """
+        Get the submission count of a student for an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :param username: username of a student
+        :return: student's submission count for an assignment
+        """
+
+        record, row = self.repo_row(class_name, assignment, username)
+        return record.submission_count(row)
+
+    def time(self, class_name: str, assignment: str, username: str):
+        """
+        Get the Unix time a student last submitted an assignment.
+
+        :param class_name: name of a class
+        :param assignment: name of an assignment
+        :param username: username of a student
+        :return: the Unix time a student last submitted an assignment.
+        """
+
+        record, row = self.repo_row(class_name, assignment, username)
+        return record.time(row)
+
+    def get_username_from_name(self, class_name: str, name: str) -> str:
+        """
+        Get the username of a student from his/her full name.
+
+        :param class_name: name of a class
+        :param name: a student's full name in the format
+        "last name, first name"
+        :return: student's username
+        """
+
+        return self.classes[class_name].usernames_by_name.get(name)
+
+    def last_first_username(self, class_name: str, username: str) -> str:
+        """
+        Get the last name, first name, and username of a student.
+
+        :param class_name: name of a class
+        :param username: username of a student
+        :return: a string in the format "last name, first name, username"
+        """
+
+        return self.classes[class_name].students[
+            username].last_first_username
+
+
+def skip_json_value(text: str, pos: int) -> int:
+    """
+    Find the end of the JSON object or array starting at a position without
+    building it. Objects without nested objects or arrays are skipped in one
+    regular expression match.
+
+    :param text: JSON text whose escape sequences for backslashes and quotes
+    have been blanked out
+    :param pos: position of the opening bracket of the value
+    :return: position just after the closing bracket of the value
+    """
+
+    # the opening bracket is consumed here, so a flat value is not swallowed
+    # by FLAT_OBJECT along with whatever follows it
+    depth = 1
+    pos += 1
+    while True:
+        pos = TO_NEXT_BRACKET.match(text, pos).end()
+        if pos >= len(text):
+            raise JSONDecodeError('Unterminated value', text, pos)
+        if text[pos] in '{[':
+            depth += 1
+        else:
+            depth -= 1
+        pos += 1
+        if depth == 0:
+            return pos
+
+
+def scan_info(text: str) -> tuple:
+    """
+    Parse the info JSON text except for the assignments of each class.
+
+    :param text: JSON text of the info dictionary
+    :return: the info dictionary without the assignments of the classes, and
+    a dictionary mapping each class to the (start, end) span of its
+    assignments in the text
+    """
+
+    decoder = JSONDecoder()
+    info_dict = {}
+    assignment_spans = {}
+    # blanking escaped backslashes and quotes keeps every offset while
+    # leaving only the quotes that delimit strings
+    unescaped_text = text
+    if '\\' in text:
+        unescaped_text = text.replace('\\\\', '  ').replace('\\"', '  ')
+
+    def expect(char, pos):
+        pos = WHITESPACE.match(text, pos).end()
+        if text[pos:pos + 1] != char:
+            raise JSONDecodeError('Expecting {!r}'.format(char), text, pos)
+        return WHITESPACE.match(text, pos + 1).end()
+
+    def items(pos, parse_value):
+        pos = expect('{', pos)
+        if text[pos:pos + 1] == '}':
+            return pos + 1
+        while True:
+            key, pos = decoder.raw_decode(text, pos)
+            pos = expect(':', pos)
+            pos = parse_value(key, pos)
+            pos = WHITESPACE.match(text, pos).end()
+            if text[pos:pos + 1] == '}':
+                return pos + 1
+            pos = expect(',', pos)
+
+    def parse_class(class_name, pos):
+        class_info = info_dict[class_name] = {}
+
+        def parse_class_value(key, value_pos):
+            if key == 'assignments':
+                end = skip_json_value(unescaped_text, value_pos)
+                assignment_spans[class_name] = (value_pos, end)
+                return end
+            class_info[key], end = decoder.raw_decode(text, value_pos)
+            return end
+
+        return items(pos, parse_class_value)
+
+    items(0, parse_class)
+    return info_dict, assignment_spans
+
+
+class LazyJsonInfo(CompactJsonInfo):
+    """
+    Provides the CompactJsonInfo methods while parsing the assignments of a
+    class only the first time load_class is called for it. Only the class
+    names and students are parsed up front. load_class may be called from
+    several threads.
+    """
+
+    def __init__(self, text: str):
+        """
+        Create the object
+        :param text: JSON text of the info dictionary
+        """
+
+        info_dict, self.assignment_spans = scan_info(text)
+        self.text = text
+        self.load_lock = RLock()
+        super().__init__({class_name: ClassRecord(class_info['students'])
+                          for class_name, class_info in info_dict.items()})
+
+    @classmethod
+    def from_file(cls, path: str):
+        """
+        Create the object from an info JSON file.
+
+        :param path: path of the info file
+        :return: the object
+        """
+
+        with open(path, 'r') as json_file:
+            return cls(json_file.read())
+
+    def load_class(self, class_name: str):
+        """
+        Parse and convert the assignments of a class if not done already.
+
+        :param class_name: name of a class
+        """
+
+        with self.load_lock:
+            span = self.assignment_spans.get(class_name)
+            if span is None:
+                return
+            start, end = span
+            self.classes[class_name].load_assignments(
+                JSONDecoder().decode(self.text[start:end]))
+            del self.assignment_spans[class_name]
+            if not self.assignment_spans:
+                self.text = None
+
+
+class SnapshotJsonInfo(CompactJsonInfo):
+    """
+    Provides the CompactJsonInfo methods from a snapshot written by
+    InfoSnapshotCache. The AssignmentRecords of a class are unpickled the
+    first time load_class is called for it, so nothing is parsed or
+    converted again.
+    """
+
+    def __init__(self, data: bytes, classes: dict, class_spans: dict):
+        """
+        Create the object
+        :param data: contents of the snapshot file
+        :param classes: dictionary mapping each class to its ClassRecord
+        without assignments
+        :param class_spans: dictionary mapping each class to the (start, end)
+        span of its pickled assignments in data
+        """
+
+        self.data = data
+        self.class_spans = class_spans
+        self.load_lock = RLock()
+        super().__init__(classes)
+
+    def load_class(self, class_name: str):
+        """
+        Unpickle the assignments of a class if not done already.
+
+        :param class_name: name of a class
+        """
+
+        with self.load_lock:
+            span = self.class_spans.get(class_name)
+            if span is None:
+                return
+            start, end = span
+            self.classes[class_name].set_assignments_state(
+                pickle.loads(memoryview(self.data)[start:end]))
+            del self.class_spans[class_name]
+            if not self.class_spans:
+                self.data = None
+
+
+class InfoSnapshotCache:
+    """
+    Keeps a binary snapshot of a parsed and indexed info file, and loads from
+    it as long as the info file is unchanged.
+
+    The snapshot is keyed on the size, modification time and SHA-1 of the
+    info file. A changed modification time alone only costs hashing the file
+    once, the snapshot is then rewritten with the new time. On a miss the
+    info file is loaded lazily and the snapshot is rewritten in a background
+    thread.
+    """
+
+    def __init__(self, info_path: str, snapshot_path: str = None):
+        """
+        Create the object
+        :param info_path: path of the info file
+        :param snapshot_path: path of the snapshot file, defaults to the info
+        path with a .snapshot suffix
+        """
+
+        self.info_path = info_path
+        if snapshot_path is None:
+            snapshot_path = info_path + '.snapshot'
+        self.snapshot_path = snapshot_path
+        self.hit = False
+        self.load_time = 0.0
+        self.writer = None
+
+    def load(self) -> JsonInfo:
+        """
+        Load the info, from the snapshot if it is up to date.
+
+        :return: JsonInfo of the info file
+        """
+
+        start = perf_counter()
+        stat = os.stat(self.info_path)
+        json_info = self.read_snapshot(stat)
+        self.hit = json_info is not None
+
+        if json_info is None:
+            with open(self.info_path, 'rb') as info_file:
+                raw = info_file.read()
+            json_info = LazyJsonInfo(raw.decode('utf-8'))
+            self.writer = Thread(target=self.write_snapshot, args=(raw, stat))
+            self.writer.start()
+
+        self.load_time = perf_counter() - start
+        return json_info
+
+    def report(self) -> str:
+        """
+        Describe the outcome of the last load.
+
+        :return: whether the snapshot was hit and how long loading took
+        """
+
+        return 'info snapshot {0}, loaded in {1:.3f} s'.format(
+            'hit' if self.hit else 'miss', self.load_time)
+
+    def read_snapshot(self, stat: os.stat_result):
+        """
+        Read the snapshot if it matches the info file.
+
+        :param stat: status of the info file
+        :return: SnapshotJsonInfo of the snapshot, or None if there is no
+        usable snapshot
+        """
+
+        try:
+            with open(self.snapshot_path, 'rb') as snapshot_file:
+                data = snapshot_file.read()
+            if not data.startswith(SNAPSHOT_MAGIC):
+                return None
+            header_start = len(SNAPSHOT_MAGIC) + SNAPSHOT_HEADER_LENGTH.size
+            header_length, = SNAPSHOT_HEADER_LENGTH.unpack_from(
+                data, len(SNAPSHOT_MAGIC))
+            header_end = header_start + header_length
+            if header_end > len(data):
+                return None
+            header = pickle.loads(data[header_start:header_end])
+            size, mtime_ns, digest = header['source']
+            classes = header['classes']
+            class_spans = {}
+            for class_name, (start, end) in header['spans'].items():
+                if class_name not in classes or not \
+                        0 <= start <= end <= len(data) - header_end:
+                    return None
+                class_spans[class_name] = (header_end + start,
+                                           header_end + end)
+        except Exception:
+            # a truncated or garbled snapshot, or one of another version, is
+            # only a miss
+            return None
+
+        if size != stat.st_size:
+            return None
+        if mtime_ns != stat.st_mtime_ns:
+            with open(self.info_path, 'rb') as info_file:
+                if sha1(info_file.read()).hexdigest() != digest:
+                    return None
+            header['source'] = (size, stat.st_mtime_ns, digest)
+            self.writer = Thread(target=self.write_snapshot_file,
+                                 args=(pickle.dumps(header,
+                                                    pickle.HIGHEST_PROTOCOL),
+                                       [memoryview(data)[header_end:]]))
+            self.writer.start()
+
+        return SnapshotJsonInfo(data, classes, class_spans)
+
+    def write_snapshot(self, raw: bytes, stat: os.stat_result):
+        """
+        Parse and convert the info file and write the snapshot of it.
+
+        :param raw: contents of the info file
+        :param stat: status of the info file when it was read
+        """
+
+        json_info = CompactJsonInfo.from_dict(loads(raw))
+        class_spans = {}
+        blobs = []
+        offset = 0
+
+        for class_name, class_record in json_info.classes.items():
+            blob = pickle.dumps(class_record.assignments_state(),
+                                pickle.HIGHEST_PROTOCOL)
+            class_spans[class_name] = (offset, offset + len(blob))
+            offset += len(blob)
+            blobs.append(blob)
+            # the header holds the classes without their assignments
+            class_record.set_assignments_state((None, None, None))
+
+        header = pickle.dumps({'source': (stat.st_size, stat.st_mtime_ns,
+                                          sha1(raw).hexdigest()),
+                               'classes': json_info.classes,
+                               'spans': class_spans},
+                              pickle.HIGHEST_PROTOCOL)
+        self.write_snapshot_file(header, blobs)
+
+    def write_snapshot_file(self, header: bytes, blobs: list):
+        """
+        Replace the snapshot file.
+
+        :param header: pickled header of the snapshot
+        :param blobs: pickled assignments of the classes, in the order of
+        their spans
+        """
+
+        try:
+            write_atomically(self.snapshot_path, SNAPSHOT_MAGIC,
+                             SNAPSHOT_HEADER_LENGTH.pack(len(header)), header,
+                             *blobs)
+        except OSError:
+            pass
+
+
+def server_name(path: str) -> str:
+    """
+    Name the server an info file comes from, after the file, or after its
+    directory if the file is named info.json.
+
+    :param path: path of the info file
+    :return: the name
+    """
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if stem == 'info':
+        stem = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    return stem
+
+
+def find_info_files(paths: list) -> list:
+    """
+    Expand the directories of a list of info files and directories. A
+    directory stands for its .json files and the info.json file of each of
+    its subdirectories, in sorted order.
+
+    :param paths: paths of info files and directories
+    :return: list of paths of info files
+    """
+
+    info_paths = []
+    for path in paths:
+        if not os.path.isdir(path):
+            info_paths.append(path)
+            continue
+        for name in sorted(os.listdir(path)):
+            entry = os.path.join(path, name)
+            if os.path.isdir(entry):
+                entry = os.path.join(entry, 'info.json')
+                if os.path.isfile(entry):
+                    info_paths.append(entry)
+            elif name.endswith('.json'):
+                info_paths.append(entry)
+    return info_paths
+
+
+def load_server_classes(path: str) -> dict:
+    """
+    Parse and convert an info file. Runs in the worker processes of
+    load_info_files.
+
+    :param path: path of the info file
+    :return: dictionary mapping each class to its ClassRecord
+    """
+
+    with open(path, 'rb') as info_file:
+        return CompactJsonInfo.from_dict(loads(info_file.read())).classes
+
+
+def load_infos(info_paths: list, max_workers: int = None) -> JsonInfo:
+    """
+    Load one info file lazily, or several in parallel with load_info_files.
+
+    :param info_paths: paths of the info files
+    :param max_workers: maximum number of processes, defaults to one per CPU
+    :return: JsonInfo of the info files
+    """
+
+    if len(info_paths) == 1:
+        return LazyJsonInfo.from_file(info_paths[0])
+    return load_info_files(info_paths, max_workers)
+
+
+def load_info_files(info_paths: list, max_workers: int = None) -> JsonInfo:
+    """
+    Load the info files of several servers in parallel in a process pool
+    and merge them.
+
+    :param info_paths: paths of the info files, in the order their classes
+    are listed
+    :param max_workers: maximum number of processes, defaults to one per CPU
+    :return: MergedJsonInfo of the info files
+    """
+
+    names = [server_name(path) for path in info_paths]
+    if len(set(names)) != len(names):
+        names = list(info_paths)
+    # spawned workers do not inherit the threads of the GUI
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers, mp_context=context) as executor:
+        servers = [(name, CompactJsonInfo(classes)) for name, classes
+                   in zip(names, executor.map(load_server_classes,
+                                              info_paths))]
+    return MergedJsonInfo(servers)
+
+
+class MergedJsonInfo(JsonInfo):
+    """
+    Provides the JsonInfo methods over the info of several servers. Each
+    class is listed under its own name, unless several servers have a class
+    of that name; then each of them is listed as server/class. Classes are
+    listed in the order of the servers, so the names do not depend on which
+    server was loaded first.
+    """
+
+    def __init__(self, servers: list):
+        """
+        Create the object
+        :param servers: list of (server name, JsonInfo) tuples
+        """
+
+        super().__init__(None)
+        self.servers = servers
+        counts = {}
+        for _, json_info in servers:
+            for class_name in json_info.class_list():
+                counts[class_name] = counts.get(class_name, 0) + 1
+        self.sources = {}
+        for server, json_info in servers:
+            for class_name in json_info.class_list():
+                merged_name = class_name if counts[class_name] == 1 else \
+                    '{0}/{1}'.format(server, class_name)
+                self.sources[merged_name] = (server, json_info, class_name)
+
+    def server(self, class_name: str) -> str:
+        """
+        Get the server a class comes from.
+
+        :param class_name: name of a class
+        :return: name of the server
+        """
+
+        return self.sources[class_name][0]
+
+    def server_list(self) -> list:
+        """
+        Get the list of servers.
+
+        :return: list of server names
+        """
+
+        return [server for server, _ in self.servers]
+
+    def class_count(self) -> int:
+        """
+        Get the number of classes of every server.
+
+        :return: number of classes
+        """
+
+        return len(self.sources)
+
+    def class_list(self) -> list:
+        """
+        Get the list of classes of every server.
+
+        :return: list of classes
+        """
+
+        return list(self.sources)
+
+
+def merged_method(name: str):
+    """
+    Make a MergedJsonInfo method calling a JsonInfo method on the server of
+    its class.
+
+    :param name: name of the JsonInfo method, whose first parameter is the
+    name of a class
+    :return: the method
+    """
+
+    def method(self, class_name, *args):
+        _, json_info, source_class = self.sources[class_name]
+        return getattr(json_info, name)(source_class, *args)
+
+    method.__name__ = name
+    method.__qualname__ = 'MergedJsonInfo.' + name
+    method.__doc__ = getattr(JsonInfo, name).__doc__
+    return method
+
+
+for method_name in ('is_loaded', 'load_class', 'student_count',
+                    'student_list', 'assignment_count', 'assignment_list',
+                    'is_published', 'assignment_hash', 'assignment_path',
+                    'student_submitted_count', 'students_submitted_list',
+                    'email_address', 'first_name', 'home_dir', 'last_name',
+                    'students_repos_list', 'assignments_by_student_list',
+                    'assignment_by_student_hash',
+                    'assignment_by_student_path', 'submission_count', 'time',
+                    'time_converted', 'get_username_from_name',
+                    'last_first_username'):
+    setattr(MergedJsonInfo, method_name, merged_method(method_name))
+
+
+class SubmissionTimeIndex:
+    """
+    Every submission of every class, sorted by the time it was made, so the
+    submissions made after a given time are found with a binary search in
+    O(log n + k). Repositories without a submission, or without a time to
+    sort them by, are left out.
+    """
+
+    def __init__(self, json_info: JsonInfo):
+        """
+        Build the index, loading every class
+        :param json_info: JsonInfo to index
+        """
+
+        entries = []
+        for class_name in json_info.class_list():
+            json_info.load_class(class_name)
+            for assignment in json_info.assignment_list(class_name):
+                for username in json_info.students_repos_list(class_name,
+                                                              assignment):
+                    if json_info.submission_count(class_name, assignment,
+                                                  username) == 0:
+                        continue
+                    timestamp = json_info.time(class_name, assignment,
+                                               username)
+                    if type(timestamp) not in (int, float):
+                        continue
+                    entries.append((timestamp, class_name, assignment,
+                                    username))
+        entries.sort()
+        self.entries = entries
+        self.times = [entry[0] for entry in entries]
+
+    def since(self, timestamp: int) -> list:
+        """
+        Get the submissions made after a time.
+
+        :param timestamp: Unix time
+        :return: list of (time, class, assignment, username) tuples, oldest
+        first
+        """
+
+        return self.entries[bisect_right(self.times, timestamp):]
+
+    def latest(self) -> int:
+        """
+        Get the time of the newest submission.
+
+        :return: Unix time, or None if there are no submissions
+        """
+
+        return self.times[-1] if self.times else None
+
+
+class InfoChanges:
+    """Differences between two versions of the info, found by diff_info."""
+
+    def __init__(self):
+        """
+        Create the object with no changes
+        """
+
+        self.classes = set()
+        self.students = set()
+        self.cells = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.classes or self.students or self.cells)
+
+    def class_changed(self, class_name: str) -> bool:
+        """
+        Determine if a class was added, removed or had students or
+        assignments added or removed.
+
+        :param class_name: name of a class
+        :return: True if the class changed, False otherwise
+        """
+
+        return class_name in self.classes
+
+
+def diff_info(old: JsonInfo, new: JsonInfo) -> InfoChanges:
+    """
+    Find the classes, students and student submissions that differ between
+    two versions of the info. Submissions are compared on their submission
+    count, time and hash. Classes whose assignments are loaded in the old
+    version are loaded in the new one so they can be compared.
+
+    :param old: JsonInfo of the current info
+    :param new: JsonInfo of the reloaded info
+    :return: the changes
+    """
+
+    changes = InfoChanges()
+    old_classes = old.class_list()
+    new_classes = new.class_list()
+    changes.classes.update(set(old_classes).symmetric_difference(new_classes))
+
+    for class_name in old_classes:
+        if class_name not in changes.classes:
+            diff_class(old, new, class_name, changes)
+    return changes
+
+
+def diff_class(old: JsonInfo, new: JsonInfo, class_name: str,
+               changes: InfoChanges):
+    """
+    Add the differences of a class present in both versions of the info to
+    changes.
+
+    :param old: JsonInfo of the current info
+    :param new: JsonInfo of the reloaded info
+    :param class_name: name of a class
+    :param changes: changes to add to
+    """
+
+    old_students = old.student_list(class_name)
+    if old_students != new.student_list(class_name):
+        changes.classes.add(class_name)
+        return
+    for username in old_students:
+        if student_fields(old, class_name, username) != \
+                student_fields(new, class_name, username):
+            changes.students.add((class_name, username))
+
+    if not old.is_loaded(class_name):
+        return
+    new.load_class(class_name)
+    old_assignments = old.assignment_list(class_name)
+    if old_assignments != new.assignment_list(class_name):
+        changes.classes.add(class_name)
+        return
+
+    for assignment in old_assignments:
+        if old.students_repos_list(class_name, assignment) != \
+                new.students_repos_list(class_name, assignment):
+            changes.classes.add(class_name)
+            continue
+        for username in old.students_repos_list(class_name, assignment):
+            if repo_fields(old, class_name, assignment, username) != \
+                    repo_fields(new, class_name, assignment, username):
+                changes.cells.add((class_name, assignment, username))
+
+
+def student_fields(json_info: JsonInfo, class_name: str,
+                   username: str) -> tuple:
+    """
+    Get the fields of a student compared by diff_class.
+
+    :param json_info: JsonInfo of the info
+    :param class_name: name of a class
+    :param username: username of a student
+    :return: tuple of the student's names, email address and home directory
+    """
+
+    return (json_info.first_name(class_name, username),
+            json_info.last_name(class_name, username),
+            json_info.email_address(class_name, username),
+            json_info.home_dir(class_name, username),
+            json_info.last_first_username(class_name, username))
+
+
+def repo_fields(json_info: JsonInfo, class_name: str, assignment: str,
+                username: str) -> tuple:
+    """
+    Get the fields of a student repository compared by diff_class.
+
+    :param json_info: JsonInfo of the info
+    :param class_name: name of a class
+    :param assignment: name of an assignment
+    :param username: username of a student
+    :return: tuple of the repository's submission count, time and hash
+    """
+
+    return (json_info.submission_count(class_name, assignment, username),
+            json_info.time(class_name, assignment, username),
+            json_info.assignment_by_student_hash(class_name, assignment,
+                                                 username))
@@ -0,0 +1,241 @@
+import json
+import os
+from functools import wraps
+from threading import Lock
+from time import perf_counter, time
+
+PROFILE_VARIABLE = 'GKEEP_PROFILE'
+DEFAULT_TRACE = 'gkeep_profile.json'
+
+
+class NullTimer:
+    """Context manager that does nothing, used while profiling is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+class PhaseTimer:
+    """Context manager recording the wall time of a block in a Profiler."""
+
+    def __init__(self, profiler, name: str):
+        """
+        Create the object
+        :param profiler: Profiler to record the time in
+        :param name: name of the timed phase
+        """
+
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record_phase(self.name, perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """
+    Opt-in instrumentation recording call counts and cumulative times of
+    methods and the wall times of named phases. While disabled, methods are
+    not wrapped and phase only returns a shared do-nothing context manager,
+    so the cost is one attribute check per phase.
+    """
+
+    def __init__(self):
+        """
+        Create a disabled profiler
+        """
+
+        self.enabled = False
+        self.trace_path = None
+        self.lock = Lock()
+        self.calls = {}
+        self.phases = []
+        self.started = time()
+
+    def enable(self, trace_path: str = None):
+        """
+        Start recording.
+
+        :param trace_path: path of the JSON trace written by dump, None to
+        not write one
+        """
+
+        self.enabled = True
+        self.trace_path = trace_path
+        self.started = time()
+
+    def enable_from_environment(self):
+        """
+        Start recording if the GKEEP_PROFILE environment variable is set.
+        Its value is the path of the trace file, or 1 for the default one.
+        """
+
+        value = os.environ.get(PROFILE_VARIABLE)
+        if value:
+            self.enable(DEFAULT_TRACE if value == '1' else value)
+
+    def instrument(self, cls):
+        """
+        Wrap the public methods a class defines itself to record their
+        calls. Does nothing while disabled.
+
+        :param cls: the class
+        """
+
+        if not self.enabled:
+            return
+        for name, function in list(vars(cls).items()):
+            if name.startswith('_') or not callable(function) or \
+                    getattr(function, 'profiled', False):
+                continue
+            setattr(cls, name, self.wrap(function))
+
+    def wrap(self, function):
+        """
+        Wrap a function to record its calls under its qualified name.
+
+        :param function: the function
+        :return: the wrapper
+        """
+
+        name = function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record_call(name, perf_counter() - start)
+
+        wrapper.profiled = True
+        return wrapper
+
+    def record_call(self, name: str, seconds: float):
+        """
+        Record a call of a method. Called from any thread.
+
+        :param name: qualified name of the method
+        :param seconds: time the call took
+        """
+
+        with self.lock:
+            stats = self.calls.get(name)
+            if stats is None:
+                self.calls[name] = [1, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+
+    def phase(self, name: str):
+        """
+        Get a context manager timing a phase.
+
+        :param name: name of the phase
+        :return: the context manager
+        """
+
+        if not self.enabled:
+            return NULL_TIMER
+        return PhaseTimer(self, name)
+
+    def record_phase(self, name: str, seconds: float):
+        """
+        Record the wall time of a phase. Called from any thread.
+
+        :param name: name of the phase
+        :param seconds: wall time of the phase
+        """
+
+        with self.lock:
+            self.phases.append((name, time() - self.started, seconds))
+
+    def top_calls(self, count: int = 5) -> list:
+        """
+        Get the methods with the largest cumulative times.
+
+        :param count: number of methods
+        :return: list of (name, calls, seconds) tuples, slowest first
+        """
+
+        with self.lock:
+            calls = [(name, stats[0], stats[1])
+                     for name, stats in self.calls.items()]
+        calls.sort(key=lambda call: call[2], reverse=True)
+        return calls[:count]
+
+    def last_phases(self, prefix: str) -> list:
+        """
+        Get the latest time of each phase whose name starts with a prefix.
+
+        :param prefix: prefix of the phase names
+        :return: list of (name, seconds) tuples in recording order
+        """
+
+        latest = {}
+        with self.lock:
+            for name, _, seconds in self.phases:
+                if name.startswith(prefix):
+                    latest.pop(name, None)
+                    latest[name] = seconds
+        return list(latest.items())
+
+    def summary(self, prefix: str = '') -> str:
+        """
+        Describe the latest phases and the slowest methods in one line.
+
+        :param prefix: prefix of the phases to describe
+        :return: the description
+        """
+
+        phases = ', '.join('{0} {1:.2f} ms'.format(name[len(prefix):],
+                                                   seconds * 1000)
+                           for name, seconds in self.last_phases(prefix))
+        calls = ', '.join('{0} {1}x {2:.2f} ms'.format(
+            name, count, seconds * 1000)
+            for name, count, seconds in self.top_calls(3))
+        return ' | '.join(part for part in (phases, calls) if part)
+
+    def trace(self) -> dict:
+        """
+        Get everything recorded so far.
+
+        :return: dictionary with the method calls and the phases
+        """
+
+        with self.lock:
+            return {
+                'calls': {name: {'count': stats[0], 'seconds': stats[1]}
+                          for name, stats in sorted(self.calls.items())},
+                'phases': [{'name': name, 'at': at, 'seconds': seconds}
+                           for name, at, seconds in self.phases],
+            }
+
+    def dump(self, path: str = None):
+        """
+        Write the trace to a JSON file. Does nothing while disabled.
+
+        :param path: path of the file, defaults to the trace path given to
+        enable
+        """
+
+        path = path or self.trace_path
+        if not self.enabled or path is None:
+            return
+        with open(path, 'w') as trace_file:
+            json.dump(self.trace(), trace_file, indent=2)
+
+
+PROFILER = Profiler()
@@ -0,0 +1,392 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from time import perf_counter
+
+from fetch import FetchError, run_git
+from info import file_lock, write_atomically
+
+STATS_FIELDS = ('hash', 'time', 'submission_count')
+BATCH_SIZE = 256
+
+
+class RepoStats:
+    """The submission fields of a student repository, read from git."""
+
+    def __init__(self, head: str, time: int, submission_count: int):
+        """
+        Create the object
+        :param head: hash of the commit HEAD points to
+        :param time: Unix committer time of that commit
+        :param submission_count: number of commits after the initial one
+        """
+
+        self.head = head
+        self.time = time
+        self.submission_count = submission_count
+
+    def fields(self) -> dict:
+        """
+        Get the fields as they are stored in a students_repos entry.
+
+        :return: dictionary of the hash, time and submission count
+        """
+
+        return {'hash': self.head, 'time': self.time,
+                'submission_count': self.submission_count}
+
+
+class StatsChange:
+    """A students_repos field whose value in the info differs from git."""
+
+    def __init__(self, class_name: str, assignment: str, username: str,
+                 field: str, old, new):
+        """
+        Create the object
+        :param class_name: name of the class
+        :param assignment: name of the assignment
+        :param username: username of the student
+        :param field: name of the field
+        :param old: value in the info
+        :param new: value read from git
+        """
+
+        self.class_name = class_name
+        self.assignment = assignment
+        self.username = username
+        self.field = field
+        self.old = old
+        self.new = new
+
+    def __str__(self) -> str:
+        return '{0}/{1}/{2}: {3} {4!r} -> {5!r}'.format(
+            self.class_name, self.assignment, self.username, self.field,
+            self.old, self.new)
+
+
+class StatsCache:
+    """
+    Remembers the time and commit count of each head commit. A commit hash
+    determines its whole history, so a repository whose head is cached is
+    not read with git at all.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Create the object, reading the cache file if it exists
+        :param path: path of the cache file, None to keep the cache in memory
+        """
+
+        self.path = path
+        self.commits = {}
+        self.updated = {}
+        self.lock = Lock()
+        if path is None:
+            return
+        try:
+            with open(path, 'r') as cache_file:
+                self.commits = json.load(cache_file)
+        except (OSError, ValueError):
+            pass
+
+    def get(self, head: str) -> RepoStats:
+        """
+        Get the cached stats of a head commit.
+
+        :param head: hash of the commit
+        :return: the stats, or None if they are not cached
+        """
+
+        with self.lock:
+            cached = self.commits.get(head)
+        if cached is None:
+            return None
+        return RepoStats(head, cached[0], cached[1])
+
+    def record(self, stats: RepoStats):
+        """
+        Cache the stats of a head commit.
+
+        :param stats: the stats
+        """
+
+        with self.lock:
+            entry = [stats.time, stats.submission_count]
+            self.commits[stats.head] = entry
+            self.updated[stats.head] = entry
+
+    def save(self):
+        """
+        Write the recorded stats, merged into the cache file as it is now.
+        """
+
+        if self.path is None:
+            return
+        with file_lock(self.path), self.lock:
+            commits = {}
+            try:
+                with open(self.path, 'r') as cache_file:
+                    commits = json.load(cache_file)
+            except (OSError, ValueError):
+                pass
+            commits.update(self.updated)
+            write_atomically(self.path, json.dumps(
+                commits, sort_keys=True).encode('utf-8'))
+
+
+def read_head(repo_path: str) -> str:
+    """
+    Get the hash of the commit HEAD points to by reading the ref files of a
+    bare repository, falling back to git for layouts it does not know.
+
+    :param repo_path: path of the bare repository
+    :return: the hash, or None if the branch has no commits
+    """
+
+    try:
+        with open(os.path.join(repo_path, 'HEAD'), 'r') as head_file:
+            head = head_file.read().strip()
+    except OSError as e:
+        raise FetchError(str(e))
+    if not head.startswith('ref: '):
+        return head
+    ref = head[len('ref: '):]
+
+    try:
+        with open(os.path.join(repo_path, ref), 'r') as ref_file:
+            return ref_file.read().strip()
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(repo_path, 'packed-refs'), 'r') as packed_file:
+            for line in packed_file:
+                fields = line.split()
+                if len(fields) == 2 and fields[1] == ref:
+                    return fields[0]
+    except OSError:
+        pass
+
+    try:
+        return run_git(['rev-parse', '--verify', '--quiet', 'HEAD'],
+                       repo_path)
+    except FetchError:
+        return None
+
+
+class CommitReader:
+    """
+    Reads commit objects of a repository through one long-lived
+    git cat-file --batch process.
+    """
+
+    def __init__(self, repo_path: str):
+        """
+        Start the process
+        :param repo_path: path of the repository
+        """
+
+        self.process = subprocess.Popen(
+            ['git', 'cat-file', '--batch'], cwd=repo_path,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL)
+
+    def read_commits(self, hashes: list) -> list:
+        """
+        Read a batch of commits, sending every request before reading the
+        answers.
+
+        :param hashes: hashes of the commits
+        :return: list of (committer time, list of parent hashes) tuples
+        """
+
+        self.process.stdin.write(''.join(commit_hash + '\n'
+                                         for commit_hash in hashes).encode())
+        self.process.stdin.flush()
+        commits = []
+        for commit_hash in hashes:
+            header = self.process.stdout.readline().split()
+            if len(header) != 3 or header[1] != b'commit':
+                raise FetchError('{} is not a commit'.format(commit_hash))
+            body = self.process.stdout.read(int(header[2]) + 1)
+            commits.append(parse_commit(body))
+        return commits
+
+    def close(self):
+        """
+        Stop the process.
+        """
+
+        self.process.stdin.close()
+        self.process.wait()
+        self.process.stdout.close()
+
+
+def parse_commit(body: bytes) -> tuple:
+    """
+    Get the committer time and parents of a raw commit object.
+
+    :param body: contents of the commit object
+    :return: (committer time, list of parent hashes) tuple
+    """
+
+    time = 0
+    parents = []
+    for line in body.split(b'\n'):
+        if not line:
+            break
+        if line.startswith(b'parent '):
+            parents.append(line[len(b'parent '):].decode())
+        elif line.startswith(b'committer '):
+            time = int(line.rsplit(b' ', 2)[1])
+    return time, parents
+
+
+def commit_stats(repo_path: str, head: str) -> RepoStats:
+    """
+    Count the commits reachable from a head commit and get its time, walking
+    the history in batches through a CommitReader.
+
+    :param repo_path: path of the repository
+    :param head: hash of the head commit
+    :return: the stats
+    """
+
+    reader = CommitReader(repo_path)
+    try:
+        seen = {head}
+        frontier = [head]
+        time = None
+        while frontier:
+            batch = frontier[:BATCH_SIZE]
+            del frontier[:BATCH_SIZE]
+            for commit_time, parents in reader.read_commits(batch):
+                if time is None:
+                    time = commit_time
+                for parent in parents:
+                    if parent not in seen:
+                        seen.add(parent)
+                        frontier.append(parent)
+    finally:
+        reader.close()
+    return RepoStats(head, time, len(seen) - 1)
+
+
+def repo_stats(repo_path: str, cache: StatsCache) -> RepoStats:
+    """
+    Get the stats of a repository, from the cache if its head is cached.
+
+    :param repo_path: path of the bare repository
+    :param cache: StatsCache to read and record stats in
+    :return: the stats, or None if the repository has no commits
+    """
+
+    head = read_head(repo_path)
+    if head is None:
+        return None
+    stats = cache.get(head)
+    if stats is None:
+        stats = commit_stats(repo_path, head)
+        cache.record(stats)
+    return stats
+
+
+def regenerate_stats(info_dict: dict, max_workers: int = 8,
+                     cache: StatsCache = None, progress=None) -> list:
+    """
+    Rebuild the hash, time and submission count of every student repository
+    of an info dictionary from the bare repositories at their paths, reading
+    several repositories at once. The dictionary is updated in place.
+
+    :param info_dict: dictionary of info
+    :param max_workers: maximum number of repositories read at once
+    :param cache: StatsCache to reuse stats with, defaults to an empty one
+    :param progress: function called with the path and error message of each
+    repository that could not be read
+    :return: list of StatsChange, one per field that changed
+    """
+
+    if cache is None:
+        cache = StatsCache()
+    entries = []
+    for class_name, class_info in info_dict.items():
+        for assignment, assignment_info in class_info['assignments'].items():
+            for username, repo in assignment_info['students_repos'].items():
+                if repo is not None:
+                    entries.append((class_name, assignment, username, repo))
+
+    changes = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(repo_stats, entry[3]['path'], cache): entry
+                   for entry in entries}
+        for future in as_completed(futures):
+            class_name, assignment, username, repo = futures[future]
+            try:
+                stats = future.result()
+            except (FetchError, OSError, ValueError) as e:
+                if progress is not None:
+                    progress(repo['path'], str(e))
+                continue
+            if stats is None:
+                continue
+            for field, value in stats.fields().items():
+                if repo.get(field) != value:
+                    changes.append(StatsChange(class_name, assignment,
+                                               username, field,
+                                               repo.get(field), value))
+                    repo[field] = value
+    return changes
+
+
+def main(argv: list = None) -> int:
+    """
+    Rebuild the submission stats of an info file from the repositories.
+
+    :param argv: command line arguments, defaults to sys.argv[1:]
+    :return: exit status, 1 if any repository could not be read
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Rebuild the hash, time and submission count of every '
+                    'student repository of an info file from git.')
+    parser.add_argument('info', nargs='?', default='info.json',
+                        help='path of the info file')
+    parser.add_argument('-o', '--output',
+                        help='file to write the updated info to, defaults to '
+                             'replacing the info file')
+    parser.add_argument('--cache', default='stats_cache.json',
+                        help='file caching the stats of each head commit')
+    parser.add_argument('-j', '--jobs', type=int, default=8,
+                        help='number of repositories read at once')
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help='only print the changes')
+    args = parser.parse_args(argv)
+
+    with open(args.info, 'r') as info_file:
+        info_dict = json.load(info_file)
+    errors = []
+
+    def progress(path, error):
+        errors.append(path)
+        print('{0}: {1}'.format(path, error), file=sys.stderr)
+
+    start = perf_counter()
+    cache = StatsCache(args.cache)
+    changes = regenerate_stats(info_dict, args.jobs, cache, progress)
+    cache.save()
+    for change in changes:
+        print(change)
+    print('{0} fields changed, {1} repositories unreadable in {2:.2f} s'
+          .format(len(changes), len(errors), perf_counter() - start))
+
+    if changes and not args.dry_run:
+        output = args.output or args.info
+        write_atomically(output, json.dumps(info_dict).encode('utf-8'))
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,499 @@
+import argparse
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+from hashlib import sha1
+from time import perf_counter, time
+
+from info import format_time, write_atomically
+
+MANIFEST_NAME = 'manifest.json'
+INFO_NAME = 'info.json'
+CHUNKS_DIRECTORY = 'chunks'
+VERSIONS_DIRECTORY = 'versions'
+DEFAULT_STORE = os.path.join(os.path.expanduser('~'), '.gkeep_sync')
+DEFAULT_KEEP = 10
+CHUNK_HASH = re.compile('[0-9a-f]{40}')
+
+
+class SyncError(Exception):
+    """Raised when the info cannot be read from a source."""
+
+
+def class_chunk(class_info: dict) -> bytes:
+    """
+    Serialize the info of a class the same way on every machine, so equal
+    classes give equal chunks.
+
+    :param class_info: dictionary of the info of the class
+    :return: the JSON text of the class, encoded
+    """
+
+    return json.dumps(class_info, separators=(',', ':')).encode()
+
+
+def chunk_hash(chunk: bytes) -> str:
+    """
+    Get the name a chunk is stored under.
+
+    :param chunk: JSON text of a class
+    :return: SHA-1 of the chunk in hexadecimal
+    """
+
+    return sha1(chunk).hexdigest()
+
+
+def chunk_path(directory: str, class_hash: str) -> str:
+    return os.path.join(directory, CHUNKS_DIRECTORY, class_hash + '.json.gz')
+
+
+def split_info(info_dict: dict) -> tuple:
+    """
+    Split an info dictionary into one chunk per class.
+
+    :param info_dict: dictionary of info
+    :return: list of (class, hash) pairs in the order of the info, and a
+    dictionary mapping each hash to its chunk
+    """
+
+    classes = []
+    chunks = {}
+    for class_name, class_info in info_dict.items():
+        chunk = class_chunk(class_info)
+        class_hash = chunk_hash(chunk)
+        classes.append((class_name, class_hash))
+        chunks[class_hash] = chunk
+    return classes, chunks
+
+
+def join_chunks(classes: list, chunks: dict) -> bytes:
+    """
+    Assemble the info JSON text from its chunks without parsing them.
+
+    :param classes: list of (class, hash) pairs
+    :param chunks: dictionary mapping each hash to its chunk
+    :return: the JSON text of the info dictionary, encoded
+    """
+
+    return b'{' + b','.join(json.dumps(class_name).encode() + b':' +
+                            chunks[class_hash]
+                            for class_name, class_hash in classes) + b'}'
+
+
+def parse_manifest(data: bytes) -> list:
+    """
+    Parse and check a manifest read from a source. The hashes become file
+    paths and command arguments, so anything but a SHA-1 in lowercase
+    hexadecimal is rejected before it is used.
+
+    :param data: contents of the manifest
+    :return: list of (class, hash) pairs
+    """
+
+    try:
+        classes = [tuple(pair) for pair in
+                   json.loads(data.decode())['classes']]
+    except (ValueError, KeyError, TypeError) as e:
+        raise SyncError('{0}: {1}'.format(MANIFEST_NAME, e))
+    for pair in classes:
+        if len(pair) != 2 or not isinstance(pair[0], str) or \
+                not isinstance(pair[1], str) or \
+                not CHUNK_HASH.fullmatch(pair[1]):
+            raise SyncError('{0}: invalid class entry {1!r}'.format(
+                MANIFEST_NAME, pair))
+    return classes
+
+
+def publish(info_path: str, directory: str) -> int:
+    """
+    Publish an info file as compressed per-class chunks and a manifest
+    listing them, for clients to fetch only the classes that changed. Run
+    on the server after each change of the info. Chunks are never removed,
+    so clients in the middle of a sync still find theirs.
+
+    :param info_path: path of the info file
+    :param directory: directory to publish to
+    :return: number of chunks written
+    """
+
+    with open(info_path, 'r') as info_file:
+        classes, chunks = split_info(json.load(info_file))
+    os.makedirs(os.path.join(directory, CHUNKS_DIRECTORY), exist_ok=True)
+    written = 0
+    for class_hash, chunk in chunks.items():
+        path = chunk_path(directory, class_hash)
+        if not os.path.exists(path):
+            write_atomically(path, gzip.compress(chunk))
+            written += 1
+    manifest = {'published': int(time()), 'classes': classes}
+    write_atomically(os.path.join(directory, MANIFEST_NAME),
+                     json.dumps(manifest).encode())
+    return written
+
+
+class DirectorySource:
+    """
+    A directory the info is published to, standing in for the server. It
+    holds either what publish writes or a plain info.json.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Create the object
+        :param directory: path of the directory
+        """
+
+        self.directory = directory
+
+    def read(self, name: str) -> bytes:
+        """
+        Read a file of the published info.
+
+        :param name: path of the file relative to the directory
+        :return: contents of the file
+        """
+
+        try:
+            with open(os.path.join(self.directory, name), 'rb') as source:
+                return source.read()
+        except OSError as e:
+            raise SyncError(str(e))
+
+    def __str__(self) -> str:
+        return self.directory
+
+
+class CommandSource:
+    """
+    A shell command printing a file of the published info, such as
+    "ssh server cat gkeep_sync/{}". The {} is replaced by the path of the
+    file relative to the published directory.
+    """
+
+    def __init__(self, command: str):
+        """
+        Create the object
+        :param command: the command, with {} where the path of the file goes
+        """
+
+        self.command = command
+
+    def read(self, name: str) -> bytes:
+        """
+        Read a file of the published info by running the command.
+
+        :param name: path of the file relative to the published directory
+        :return: contents of the file
+        """
+
+        try:
+            process = subprocess.run(self.command.format(name), shell=True,
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE)
+        except OSError as e:
+            raise SyncError(str(e))
+        if process.returncode != 0:
+            raise SyncError(process.stderr.decode(errors='replace').strip())
+        return process.stdout
+
+    def __str__(self) -> str:
+        return self.command
+
+
+def make_source(source: str):
+    """
+    Get the source described by a command line argument.
+
+    :param source: path of a directory, or a command containing {}
+    :return: a DirectorySource or a CommandSource
+    """
+
+    if '{}' in source:
+        return CommandSource(source)
+    return DirectorySource(source)
+
+
+class SyncResult:
+    """Outcome of syncing a SyncStore."""
+
+    def __init__(self, version: int, changed: list, removed: list,
+                 transferred: int, elapsed: float):
+        """
+        Create the object
+        :param version: number of the newest version after the sync
+        :param changed: names of the classes added or changed
+        :param removed: names of the classes removed
+        :param transferred: number of bytes read from the source
+        :param elapsed: seconds the sync took
+        """
+
+        self.version = version
+        self.changed = changed
+        self.removed = removed
+        self.transferred = transferred
+        self.elapsed = elapsed
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.removed)
+
+    def __str__(self) -> str:
+        if not self:
+            return 'version {0} is up to date, {1} bytes read in {2:.2f} s'\
+                .format(self.version, self.transferred, self.elapsed)
+        return 'version {0}: {1} classes changed, {2} removed, {3} bytes ' \
+               'read in {4:.2f} s'.format(self.version, len(self.changed),
+                                          len(self.removed), self.transferred,
+                                          self.elapsed)
+
+
+class SyncStore:
+    """
+    Local versions of the info of a server. Each version is a manifest of
+    the hashes of its classes, and each class is stored once as a compressed
+    chunk shared by every version it appears in, so a sync only transfers
+    and stores the classes that changed. The newest version is also kept
+    whole in info.json for the rest of the tools to read.
+    """
+
+    def __init__(self, directory: str = DEFAULT_STORE,
+                 keep: int = DEFAULT_KEEP):
+        """
+        Create the object
+        :param directory: directory holding the versions
+        :param keep: number of versions to keep, older ones are removed
+        along with the chunks only they use
+        """
+
+        self.directory = directory
+        self.keep = keep
+        self.info_path = os.path.join(directory, INFO_NAME)
+
+    def versions(self) -> list:
+        """
+        Get the numbers of the stored versions.
+
+        :return: list of version numbers, oldest first
+        """
+
+        try:
+            names = os.listdir(os.path.join(self.directory,
+                                            VERSIONS_DIRECTORY))
+        except OSError:
+            return []
+        return sorted(int(name[:-len('.json')]) for name in names
+                      if name.endswith('.json') and name[:-len('.json')]
+                      .isdigit())
+
+    def latest(self) -> int:
+        """
+        Get the number of the newest version.
+
+        :return: the number, or None if nothing was synced yet
+        """
+
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def version_path(self, version: int) -> str:
+        return os.path.join(self.directory, VERSIONS_DIRECTORY,
+                            '{:06d}.json'.format(version))
+
+    def manifest(self, version: int) -> dict:
+        """
+        Read the manifest of a version.
+
+        :param version: number of the version
+        :return: dictionary with the time of the sync, the source and the
+        (class, hash) pairs of the version
+        """
+
+        with open(self.version_path(version), 'r') as manifest_file:
+            return json.load(manifest_file)
+
+    def read_chunk(self, class_hash: str) -> bytes:
+        with open(chunk_path(self.directory, class_hash), 'rb') as chunk_file:
+            return gzip.decompress(chunk_file.read())
+
+    def checkout(self, version: int) -> bytes:
+        """
+        Assemble the info of a version.
+
+        :param version: number of the version
+        :return: the JSON text of the info, encoded
+        """
+
+        classes = self.manifest(version)['classes']
+        return join_chunks(classes, {class_hash: self.read_chunk(class_hash)
+                                     for _, class_hash in classes})
+
+    def fetch(self, source) -> tuple:
+        """
+        Get the classes of the info of a source, reading from it only the
+        chunks missing from the store. A source holding a plain info.json
+        has to be read whole.
+
+        :param source: DirectorySource or CommandSource
+        :return: list of (class, hash) pairs, a dictionary mapping the hash
+        of each missing chunk to the chunk, and the number of bytes read
+        """
+
+        try:
+            manifest_data = source.read(MANIFEST_NAME)
+        except SyncError:
+            info_data = source.read(INFO_NAME)
+            try:
+                classes, chunks = split_info(json.loads(info_data.decode()))
+            except ValueError as e:
+                raise SyncError('{0}: {1}'.format(INFO_NAME, e))
+            chunks = {class_hash: chunk for class_hash, chunk in chunks.items()
+                      if not os.path.exists(chunk_path(self.directory,
+                                                       class_hash))}
+            return classes, chunks, len(info_data)
+
+        transferred = len(manifest_data)
+        classes = parse_manifest(manifest_data)
+        chunks = {}
+        for _, class_hash in classes:
+            if class_hash in chunks or \
+                    os.path.exists(chunk_path(self.directory, class_hash)):
+                continue
+            compressed = source.read('{0}/{1}.json.gz'.format(
+                CHUNKS_DIRECTORY, class_hash))
+            transferred += len(compressed)
+            chunk = gzip.decompress(compressed)
+            if chunk_hash(chunk) != class_hash:
+                raise SyncError('chunk {} is corrupt'.format(class_hash))
+            chunks[class_hash] = chunk
+        return classes, chunks, transferred
+
+    def sync(self, source) -> SyncResult:
+        """
+        Bring the store up to date with a source. A new version is written
+        only if a class changed, and info.json is rewritten only then.
+
+        :param source: DirectorySource or CommandSource
+        :return: the outcome
+        """
+
+        start = perf_counter()
+        classes, chunks, transferred = self.fetch(source)
+        latest = self.latest()
+        old_classes = []
+        if latest is not None:
+            old_classes = [tuple(pair)
+                           for pair in self.manifest(latest)['classes']]
+        old_hashes = dict(old_classes)
+        changed = [class_name for class_name, class_hash in classes
+                   if old_hashes.get(class_name) != class_hash]
+        names = {class_name for class_name, _ in classes}
+        removed = [class_name for class_name, _ in old_classes
+                   if class_name not in names]
+        if classes == old_classes and os.path.exists(self.info_path):
+            return SyncResult(latest, [], [], transferred,
+                              perf_counter() - start)
+
+        os.makedirs(os.path.join(self.directory, CHUNKS_DIRECTORY),
+                    exist_ok=True)
+        os.makedirs(os.path.join(self.directory, VERSIONS_DIRECTORY),
+                    exist_ok=True)
+        for class_hash, chunk in chunks.items():
+            write_atomically(chunk_path(self.directory, class_hash),
+                             gzip.compress(chunk))
+        version = latest if classes == old_classes else (latest or 0) + 1
+        manifest = {'synced': int(time()), 'source': str(source),
+                    'classes': classes}
+        write_atomically(self.version_path(version),
+                         json.dumps(manifest).encode())
+        write_atomically(self.info_path, self.checkout(version))
+        self.prune()
+        return SyncResult(version, changed, removed, transferred,
+                          perf_counter() - start)
+
+    def prune(self):
+        """
+        Remove the versions beyond the number to keep and the chunks no
+        remaining version uses.
+        """
+
+        versions = self.versions()
+        for version in versions[:-self.keep]:
+            os.remove(self.version_path(version))
+        used = set()
+        for version in versions[-self.keep:]:
+            used.update(class_hash for _, class_hash
+                        in self.manifest(version)['classes'])
+        chunks_directory = os.path.join(self.directory, CHUNKS_DIRECTORY)
+        for name in os.listdir(chunks_directory):
+            if name.endswith('.json.gz') and \
+                    name[:-len('.json.gz')] not in used:
+                os.remove(os.path.join(chunks_directory, name))
+
+
+def main(argv: list = None) -> int:
+    """
+    Publish the info on the server, or sync a local store with it.
+
+    :param argv: command line arguments, defaults to sys.argv[1:]
+    :return: exit status
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Sync the info of a git-keeper server, transferring only '
+                    'the classes that changed.')
+    subparsers = parser.add_subparsers(dest='command')
+    publish_parser = subparsers.add_parser(
+        'publish', help='split an info file into chunks for clients to sync')
+    publish_parser.add_argument('info', help='path of the info file')
+    publish_parser.add_argument('directory', help='directory to publish to')
+    pull_parser = subparsers.add_parser(
+        'pull', help='sync the local store with a source')
+    pull_parser.add_argument('source',
+                             help='directory the info is published to, or a '
+                                  'command printing a published file, with '
+                                  '{} where its path goes')
+    versions_parser = subparsers.add_parser(
+        'versions', help='list the versions in the local store')
+    checkout_parser = subparsers.add_parser(
+        'checkout', help='write the info of a stored version')
+    checkout_parser.add_argument('version', type=int,
+                                 help='number of the version')
+    checkout_parser.add_argument('-o', '--output', required=True,
+                                 help='file to write the info to')
+    for subparser in (pull_parser, versions_parser, checkout_parser):
+        subparser.add_argument('--store', default=DEFAULT_STORE,
+                               help='directory of the local store')
+    pull_parser.add_argument('--keep', type=int, default=DEFAULT_KEEP,
+                             help='number of versions to keep')
+    args = parser.parse_args(argv)
+
+    if args.command == 'publish':
+        written = publish(args.info, args.directory)
+        print('{} chunks written'.format(written))
+        return 0
+    if args.command is None:
+        parser.print_usage(sys.stderr)
+        return 2
+
+    store = SyncStore(args.store, getattr(args, 'keep', DEFAULT_KEEP))
+    try:
+        if args.command == 'pull':
+            print(store.sync(make_source(args.source)))
+        elif args.command == 'versions':
+            for version in store.versions():
+                manifest = store.manifest(version)
+                print('{0}  {1}  {2} classes  {3}'.format(
+                    version, format_time(manifest['synced']),
+                    len(manifest['classes']), manifest['source']))
+        else:
+            write_atomically(args.output, store.checkout(args.version))
+    except (SyncError, OSError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,315 +1,1270 @@
+import argparse
 import sys
-from PyQt5.QtWidgets import QApplication, QWidget, QTableWidgetItem, \
-    QVBoxLayout, QTableWidget, QToolBar, QAction, QPushButton
-from PyQt5.QtGui import QIcon
-from json import load
-from time import localtime
+import traceback
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, \
+    QTableView, QToolBar, QAction, QPushButton, QDialog, QListWidget, \
+    QProgressBar, QLineEdit, QLabel, QTreeWidget, QTreeWidgetItem, \
+    QPlainTextEdit, QSplitter, QHBoxLayout
+from PyQt5.QtGui import QIcon, QFontDatabase, QTextCursor
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, \
+    QSortFilterProxyModel, QObject, QThread, QTimer, QFileSystemWatcher, \
+    QRunnable, QThreadPool, pyqtSignal
+import codecs
+import os
+import re
+from bisect import bisect_left
+from collections import OrderedDict
+from time import perf_counter, time
+try:
+    from analytics import LATENESS_LABELS, ClassMatrix, load_deadlines
+except ImportError:
+    # the analytics view needs NumPy
+    ClassMatrix = None
+from info import JsonInfo, IndexedJsonInfo, CompactJsonInfo, LazyJsonInfo, \
+    SnapshotJsonInfo, MergedJsonInfo, InfoSnapshotCache, InfoChanges, \
+    SubmissionTimeIndex, diff_info, find_info_files, load_info_files, \
+    load_infos, TIME_FORMATS
+from profiling import DEFAULT_TRACE, PROFILER
+from sync import DEFAULT_STORE, SyncError, SyncStore, make_source
+from browse import BLOB, TREE, BlobCache, RepoBrowser, TreeEntry, \
+    hex_dump, is_binary
+from fetch import DEFAULT_WORKSPACE, FetchError, FetchManifest, \
+    FetchSummary, assignment_fetches, fetch_repos, student_fetches, \
+    workspace_manifest
+
+CLASS_VIEW = 'classes'
+ASSIGNMENTS_VIEW = 'assignments'
+ASSIGNMENT_DETAILS_VIEW = 'assignment details'
+STUDENT_VIEW = 'student'
+SEARCH_VIEW = 'search'
+NEW_VIEW = 'new'
+LAST_VISIT_PATH = os.path.join(os.path.expanduser('~'), '.gkeep_last_visit')
+SEARCH_SEPARATORS = re.compile(r'[\s,]+')
+SORT_ROLE = Qt.UserRole
+
+
+def view_exists(key: tuple, json_info: JsonInfo) -> bool:
+    """
+    Determine if the class, assignment or student a navigation key refers
+    to is in the info.
+
+    :param key: navigation key of a view, or a search result
+    :param json_info: JsonInfo of the info
+    :return: True if the key refers to existing info, False otherwise
+    """
+
+    if key[0] in (CLASS_VIEW, SEARCH_VIEW, NEW_VIEW):
+        return True
+    if key[1] not in json_info.class_list():
+        return False
+    json_info.load_class(key[1])
+    if key[0] == ASSIGNMENTS_VIEW:
+        return True
+    if key[0] == ASSIGNMENT_DETAILS_VIEW:
+        return key[2] in json_info.assignment_list(key[1])
+    return key[2] in json_info.student_list(key[1])
+
+
+class SearchIndex:
+    """
+    Finds the students and assignments of every class from part of a first
+    or last name, username, email address, last_first_username or
+    assignment name.
+
+    Distinct lower-cased terms are indexed by trigram, so a word of three
+    characters or more only checks the terms sharing all its trigrams.
+    Shorter words match terms by prefix with a binary search of the sorted
+    terms. Every word of a query must match.
+    """
+
+    def __init__(self, json_info: JsonInfo):
+        """
+        Build the index, loading every class
+        :param json_info: JsonInfo to index
+        """
 
-with open('info.json', 'r') as json_file:
-    info = load(json_file)
+        self.records = []
+        record_terms = {}
+
+        def add_record(record, texts):
+            record_id = len(self.records)
+            self.records.append(record)
+            for text in texts:
+                # fields missing from the info are None
+                if text:
+                    record_terms.setdefault(text.lower(),
+                                            set()).add(record_id)
+
+        for class_name in json_info.class_list():
+            json_info.load_class(class_name)
+            for username in json_info.student_list(class_name):
+                add_record((STUDENT_VIEW, class_name, username), (
+                    json_info.first_name(class_name, username),
+                    json_info.last_name(class_name, username),
+                    username,
+                    json_info.email_address(class_name, username),
+                    json_info.last_first_username(class_name, username)))
+            for assignment in json_info.assignment_list(class_name):
+                add_record((ASSIGNMENT_DETAILS_VIEW, class_name, assignment),
+                           (assignment,))
+
+        self.terms = sorted(record_terms)
+        self.term_records = [record_terms[term] for term in self.terms]
+        self.trigrams = {}
+        for term_id, term in enumerate(self.terms):
+            for start in range(len(term) - 2):
+                self.trigrams.setdefault(term[start:start + 3],
+                                         set()).add(term_id)
+
+    def word_terms(self, word: str) -> list:
+        """
+        Get the terms containing a word, or starting with it if it is
+        shorter than a trigram.
 
+        :param word: lower-cased word
+        :return: list of term ids
+        """
 
-class JsonInfo:
-    """Provides methods for extracting information from the info dictionary."""
+        if len(word) < 3:
+            term_ids = []
+            term_id = bisect_left(self.terms, word)
+            while term_id < len(self.terms) and \
+                    self.terms[term_id].startswith(word):
+                term_ids.append(term_id)
+                term_id += 1
+            return term_ids
+
+        postings = []
+        for start in range(len(word) - 2):
+            posting = self.trigrams.get(word[start:start + 3])
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        return [term_id for term_id in postings[0].intersection(*postings[1:])
+                if word in self.terms[term_id]]
+
+    def search(self, query: str, limit: int = 200) -> list:
+        """
+        Find the students and assignments matching every word of a query.
 
-    def __init__(self, info_dict: dict):
+        :param query: words to search for
+        :param limit: maximum number of results
+        :return: list of navigation keys of the matching students and
+        assignments, in the order they were indexed
         """
-        Create the object
-        :param info_dict: dictionary of info
+
+        record_ids = None
+        for word in SEARCH_SEPARATORS.split(query.lower()):
+            if not word:
+                continue
+            word_records = set()
+            for term_id in self.word_terms(word):
+                word_records.update(self.term_records[term_id])
+            if record_ids is None:
+                record_ids = word_records
+            else:
+                record_ids &= word_records
+            if not record_ids:
+                break
+
+        if not record_ids:
+            return []
+        return [self.records[record_id]
+                for record_id in sorted(record_ids)[:limit]]
+
+
+class PopulateSignals(QObject):
+    """
+    Signals of the PopulateJobs of a model, which are not QObjects
+    themselves. Created once per model on the GUI thread.
+    """
+
+    chunk = pyqtSignal(object, object)
+    finished = pyqtSignal(object)
+
+
+class PopulateJob(QRunnable):
+    """
+    Computes the cells of the rows of an InfoTableModel in a worker thread
+    and hands them to the model in chunks. A cancelled job stops before its
+    next chunk, a failing one after printing its error, keeping the chunks
+    already handed over. Every job emits finished, so the model releases it
+    on the GUI thread.
+    """
+
+    chunkSize = 200
+
+    def __init__(self, model, json_info: JsonInfo, keys: list, start: int,
+                 signals: PopulateSignals):
+        """
+        Create the job
+        :param model: InfoTableModel whose rows are computed
+        :param json_info: JsonInfo to read the cells from
+        :param keys: keys of all the rows of the model
+        :param start: index of the first row to compute
+        :param signals: PopulateSignals of the model
         """
 
-        self.info_dict = info_dict
+        super().__init__()
+        self.setAutoDelete(False)
+        self.model = model
+        self.json_info = json_info
+        self.keys = keys
+        self.start = start
+        self.cancelled = False
+        self.signals = signals
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            for start in range(self.start, len(self.keys), self.chunkSize):
+                if self.cancelled:
+                    break
+                rows = [self.model.row_cells(self.json_info, key)
+                        for key in self.keys[start:start + self.chunkSize]]
+                self.model.prepare_display(rows)
+                self.signals.chunk.emit(self, rows)
+        except Exception:
+            # an exception would end the process from a pool thread
+            print('cannot compute the rows of {}:'.format(
+                type(self.model).__name__), file=sys.stderr)
+            traceback.print_exc()
+        finally:
+            self.signals.finished.emit(self)
+
+
+class InfoTableModel(QAbstractTableModel):
+    """
+    Table model whose cells are computed from a JsonInfo by a PopulateJob
+    in the global thread pool and streamed in, so building a table never
+    blocks the GUI thread. Only the rows computed so far are shown.
+
+    Cells hold raw values, returned as is for SORT_ROLE so counts and times
+    sort numerically. They are formatted only for display, times through
+    TIME_FORMATS, and None is shown as a blank cell.
+    """
+
+    headers = ()
+    timeColumns = ()
+    populated = pyqtSignal(int, int)
+
+    def __init__(self, json_info: JsonInfo):
+        """
+        Create the model, without computing any row yet
+        :param json_info: JsonInfo to read the cells from
+        """
 
-    def class_count(self) -> int:
+        super().__init__()
+        self.json_info = json_info
+        self.keys = self.row_keys(json_info)
+        self.rows = []
+        self.job = None
+        # running jobs, including cancelled ones, are only released by
+        # populate_finished on the GUI thread
+        self.jobs = set()
+        self.populateSignals = PopulateSignals()
+        self.populateSignals.chunk.connect(self.append_rows)
+        self.populateSignals.finished.connect(self.populate_finished)
+        self.populateStart = 0.0
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.rows[index.row()][index.column()]
+        if role == SORT_ROLE:
+            return value
+        if role != Qt.DisplayRole:
+            return None
+        if value is None:
+            return ''
+        if index.column() in self.timeColumns:
+            return TIME_FORMATS.format(value)
+        return str(value)
+
+    def row_key(self, row: int):
         """
-        Get the number of classes.
+        Get the key of a row.
 
-        :return: number of classes
+        :param row: row of the model
+        :return: the key the row was built from
         """
 
-        return len(self.info_dict)
+        return self.keys[row]
 
-    def class_list(self) -> list:
+    def row_keys(self, json_info: JsonInfo) -> list:
         """
-        Get the list of classes.
+        Get the key of each row, e.g. class names or usernames.
 
-        :return: list of classes
+        :param json_info: JsonInfo to read the keys from
+        :return: list of row keys
         """
 
-        return list(self.info_dict.keys())
+        raise NotImplementedError
 
-    def student_count(self, class_name: str) -> int:
+    def changed_keys(self, changes: InfoChanges) -> set:
         """
-        Get the number of students in a class.
+        Get the keys of the rows whose cells are affected by changes. Every
+        row of a class in changes.classes is affected, diff_class does not
+        list the cells of such a class.
 
-        :param class_name: name of a class
-        :return: number of students in the class
+        :param changes: changes found by diff_info
+        :return: set of row keys
         """
 
-        return len(self.info_dict[class_name]['students'])
+        raise NotImplementedError
 
-    def student_list(self, class_name: str) -> list:
+    def cell(self, json_info: JsonInfo, key, column: int):
         """
-        Get the list of the students in a class.
+        Get the raw value of a cell. Called from worker threads.
 
-        :param class_name: name of a class
-        :return: list of students in the class
+        :param json_info: JsonInfo to read the cell from
+        :param key: key of the cell's row
+        :param column: column of the cell
+        :return: value of the cell, a Unix time for the timeColumns, None
+        for a blank cell
         """
 
-        return list(self.info_dict[class_name]['students'])
+        raise NotImplementedError
 
-    def assignment_count(self, class_name: str) -> int:
+    def row_cells(self, json_info: JsonInfo, key) -> tuple:
         """
-        Get the number of assignments for a class.
+        Get the raw value of every cell of a row. Called from worker
+        threads.
 
-        :param class_name: name of a class
-        :return: number of assignments for the class
+        :param json_info: JsonInfo to read the cells from
+        :param key: key of the row
+        :return: tuple of the values of the cells
         """
 
-        return len(self.info_dict[class_name]['assignments'])
+        return tuple(self.cell(json_info, key, column)
+                     for column in range(len(self.headers)))
 
-    def assignment_list(self, class_name: str) -> list:
+    def prepare_display(self, rows: list):
         """
-        Get the info dictionary of assignments for a class.
+        Format the times of computed rows in one batch, so displaying them
+        only looks them up. Called from worker threads.
 
-        :param class_name: name of a class
-        :return: info dictionary of assignments for a class
+        :param rows: list of rows returned by row_cells
         """
 
-        return list(self.info_dict[class_name]['assignments'])
+        for column in self.timeColumns:
+            TIME_FORMATS.format_many(row[column] for row in rows
+                                     if row[column] is not None)
 
-    def is_published(self, class_name: str, assignment: str) -> bool:
+    def is_populated(self) -> bool:
         """
-        Determine if an assignment is published.
+        Determine if the cells of every row have been computed.
 
-        :param class_name: name of a class
-        :param assignment: name of an assignment
-        :return: True if the assignment is published, False otherwise
+        :return: True if all rows are computed, False otherwise
         """
 
-        return self.info_dict[class_name][assignment]['published']
+        return len(self.rows) == len(self.keys)
 
-    def assignment_hash(self, class_name: str, assignment: str) -> str:
+    def populate(self):
         """
-        Get the hash of an assignment.
-
-        :param class_name: name of a class
-        :param assignment: name of an assignment
-        :return: assignment's hash
+        Start computing the rows that are not computed yet, unless a job is
+        already doing it.
         """
 
-        return self.info_dict[class_name][assignment]['hash']
+        if self.job is not None or self.is_populated():
+            return
+        self.job = PopulateJob(self, self.json_info, self.keys,
+                               len(self.rows), self.populateSignals)
+        self.jobs.add(self.job)
+        self.populateStart = perf_counter()
+        QThreadPool.globalInstance().start(self.job)
 
-    def assignment_path(self, class_name: str, assignment: str) -> str:
+    def stop_populating(self):
         """
-        Get the path of an assignment.
-
-        :param class_name: name of a class
-        :param assignment: name of an assignment
-        :return: assignment's path
+        Cancel the job computing the rows, the rows computed so far are
+        kept and populate resumes after them.
         """
 
-        return self.info_dict[class_name][assignment]['path']
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+
+    def append_rows(self, job: PopulateJob, rows: list):
+        if job is not self.job:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+        if PROFILER.enabled and self.is_populated():
+            PROFILER.record_phase(type(self).__name__ + '.population',
+                                  perf_counter() - self.populateStart)
+        self.populated.emit(len(self.rows), len(self.keys))
+
+    def populate_finished(self, job: PopulateJob):
+        self.jobs.discard(job)
+        if job is self.job:
+            self.job = None
+
+    def refresh(self, json_info: JsonInfo, changes: InfoChanges):
+        """
+        Switch to a reloaded JsonInfo, updating only the rows that changed.
+        The model is reset only if rows were added, removed or reordered.
 
-    def student_submitted_count(self, class_name: str, assignment: str) -> int:
+        :param json_info: JsonInfo of the reloaded info
+        :param changes: changes found by diff_info
         """
-        Get the number of students who submitted an assignment.
 
-        :param class_name: name of a class
-        :param assignment: name of an assignment
-        :return: number of students who submitted the assignment
+        populating = self.job is not None
+        self.stop_populating()
+        keys = self.row_keys(json_info)
+        self.json_info = json_info
+        if keys != self.keys:
+            self.beginResetModel()
+            self.keys = keys
+            self.rows = []
+            self.endResetModel()
+        else:
+            changed_keys = self.changed_keys(changes)
+            last_column = self.columnCount() - 1
+            for row, key in enumerate(self.keys[:len(self.rows)]):
+                if key in changed_keys:
+                    self.rows[row] = self.row_cells(json_info, key)
+                    self.dataChanged.emit(self.index(row, 0),
+                                          self.index(row, last_column))
+        if populating:
+            self.populate()
+
+
+class ClassTableModel(InfoTableModel):
+    """Rows of classes with their number of students."""
+
+    headers = ('Name', 'Students')
+
+    def __init__(self, json_info: JsonInfo):
+        if isinstance(json_info, MergedJsonInfo):
+            self.headers = ('Name', 'Server', 'Students')
+        super().__init__(json_info)
+
+    def row_keys(self, json_info):
+        return json_info.class_list()
+
+    def changed_keys(self, changes):
+        return changes.classes
+
+    def cell(self, json_info, class_name, column):
+        if column == 0:
+            return class_name
+        if self.headers[column] == 'Server':
+            return json_info.server(class_name)
+        return json_info.student_count(class_name)
+
+
+class AssignmentTableModel(InfoTableModel):
+    """Rows of the assignments of a class with their submitted counts."""
+
+    headers = ('Assignment name', 'Submitted')
+
+    def __init__(self, json_info: JsonInfo, class_name: str):
+        self.class_name = class_name
+        super().__init__(json_info)
+
+    def row_keys(self, json_info):
+        return json_info.assignment_list(self.class_name)
+
+    def changed_keys(self, changes):
+        if changes.class_changed(self.class_name):
+            return set(self.keys)
+        return {assignment for class_name, assignment, username
+                in changes.cells if class_name == self.class_name}
+
+    def cell(self, json_info, assignment, column):
+        if column == 0:
+            return assignment
+        return json_info.student_submitted_count(self.class_name, assignment)
+
+
+class AssignmentDetailsTableModel(InfoTableModel):
+    """Rows of the students of a class with their submissions of an
+    assignment."""
+
+    headers = ('Name', 'Last submission time', 'Submission Count')
+    timeColumns = (1,)
+
+    def __init__(self, json_info: JsonInfo, class_name: str, assignment: str):
+        self.class_name = class_name
+        self.assignment = assignment
+        super().__init__(json_info)
+
+    def row_keys(self, json_info):
+        self.repos = set(json_info.students_repos_list(self.class_name,
+                                                       self.assignment))
+        return json_info.student_list(self.class_name)
+
+    def changed_keys(self, changes):
+        if changes.class_changed(self.class_name):
+            return set(self.keys)
+        keys = {username for class_name, username in changes.students
+                if class_name == self.class_name}
+        keys.update(username for class_name, assignment, username
+                    in changes.cells if class_name == self.class_name and
+                    assignment == self.assignment)
+        return keys
+
+    def cell(self, json_info, username, column):
+        if column == 0:
+            return '{0}, {1}'.format(
+                json_info.last_name(self.class_name, username),
+                json_info.first_name(self.class_name, username))
+        if username not in self.repos:
+            # no repository for the assignment, nothing was submitted
+            return None
+        if column == 1:
+            return json_info.time(self.class_name, self.assignment, username)
+        return json_info.submission_count(self.class_name, self.assignment,
+                                          username)
+
+
+class StudentTableModel(InfoTableModel):
+    """Rows of the assignments of a student with their submissions."""
+
+    headers = ('Assignment', 'Last submission time', 'Submission count')
+    timeColumns = (1,)
+
+    def __init__(self, json_info: JsonInfo, class_name: str, username: str):
+        self.class_name = class_name
+        self.username = username
+        super().__init__(json_info)
+
+    def row_keys(self, json_info):
+        return json_info.assignments_by_student_list(self.class_name,
+                                                     self.username)
+
+    def changed_keys(self, changes):
+        if changes.class_changed(self.class_name):
+            return set(self.keys)
+        return {assignment for class_name, assignment, username
+                in changes.cells if class_name == self.class_name and
+                username == self.username}
+
+    def cell(self, json_info, assignment, column):
+        if column == 0:
+            return assignment
+        if column == 1:
+            return json_info.time(self.class_name, assignment, self.username)
+        return json_info.submission_count(self.class_name, assignment,
+                                          self.username)
+
+
+class SearchTableModel(InfoTableModel):
+    """Rows of the students and assignments found by a search."""
+
+    headers = ('Class', 'Match', 'Kind')
+
+    def __init__(self, json_info: JsonInfo, results: list):
+        self.results = results
+        super().__init__(json_info)
+
+    def row_keys(self, json_info):
+        return [result for result in self.results
+                if view_exists(result, json_info)]
+
+    def changed_keys(self, changes):
+        keys = {result for result in self.keys
+                if changes.class_changed(result[1])}
+        keys.update((STUDENT_VIEW, class_name, username)
+                    for class_name, username in changes.students)
+        return keys
+
+    def cell(self, json_info, result, column):
+        kind, class_name, name = result
+        if column == 0:
+            return class_name
+        if column == 2:
+            return 'Student' if kind == STUDENT_VIEW else 'Assignment'
+        if kind == STUDENT_VIEW:
+            return '{0}, {1} ({2})'.format(
+                json_info.last_name(class_name, name),
+                json_info.first_name(class_name, name), name)
+        return name
+
+    def set_results(self, results: list):
         """
+        Show the results of another search.
 
-        students_submitted = 0
-        for student in self.student_list(class_name):
-            if self.submission_count(class_name, assignment, student) != 0:
-                students_submitted += 1
-        return students_submitted
+        :param results: list of navigation keys found by SearchIndex.search
+        """
 
-    def students_submitted_list(self, class_name: str, assignment: str) \
-            -> list:
+        self.stop_populating()
+        self.beginResetModel()
+        self.results = results
+        self.keys = self.row_keys(self.json_info)
+        self.rows = []
+        self.endResetModel()
+        self.populate()
+
+
+class NewSubmissionsTableModel(InfoTableModel):
+    """Rows of the submissions made since the last visit, newest first."""
+
+    headers = ('Class', 'Assignment', 'Student', 'Submission time',
+               'Submission count')
+    timeColumns = (3,)
+
+    def __init__(self, json_info: JsonInfo, entries: list):
+        self.entries = entries
+        super().__init__(json_info)
+
+    def row_keys(self, json_info):
+        return [entry for entry in self.entries
+                if view_exists((STUDENT_VIEW, entry[1], entry[3]), json_info)
+                and entry[2] in json_info.assignment_list(entry[1])]
+
+    def changed_keys(self, changes):
+        return {entry for entry in self.keys
+                if changes.class_changed(entry[1]) or
+                entry[1:] in changes.cells or
+                (entry[1], entry[3]) in changes.students}
+
+    def cell(self, json_info, entry, column):
+        _, class_name, assignment, username = entry
+        if column == 0:
+            return class_name
+        if column == 1:
+            return assignment
+        if column == 2:
+            return '{0}, {1}'.format(
+                json_info.last_name(class_name, username),
+                json_info.first_name(class_name, username))
+        if column == 3:
+            return json_info.time(class_name, assignment, username)
+        return json_info.submission_count(class_name, assignment, username)
+
+    def set_entries(self, entries: list):
         """
-        Get the info dictionary of students who submitted an assignment.
+        Show the submissions found in a rebuilt index.
 
-        :param class_name: name of a class
-        :param assignment: name of an assignment
-        :return: info dictionary of students who submitted an assignment
+        :param entries: list of (time, class, assignment, username) tuples
         """
 
-        students_submitted = []
-        for student in self.student_list(class_name):
-            if self.submission_count(class_name, assignment, student) != 0:
-                students_submitted.append(student)
-        return students_submitted
+        self.stop_populating()
+        self.beginResetModel()
+        self.entries = entries
+        self.keys = self.row_keys(self.json_info)
+        self.rows = []
+        self.endResetModel()
+        self.populate()
 
-    def email_address(self, class_name: str, username: str) -> str:
-        """
-        Get the email address of a student.
 
-        :param class_name: name of a class
-        :param username: username of a student
-        :return: student's email address
-        """
+class SearchIndexBuilder(QThread):
+    """Builds the SearchIndex of an info off the GUI thread."""
 
-        return self.info_dict[class_name]['students'][username][
-            'email_address']
+    built = pyqtSignal(object, object)
 
-    def first_name(self, class_name: str, username: str) -> str:
+    def __init__(self, json_info: JsonInfo, parent=None):
         """
-        Get the first name of a student.
-
-        :param class_name: name of a class
-        :param username: username of a student
-        :return: student's first name
+        Create the thread
+        :param json_info: JsonInfo to index
+        :param parent: parent QObject
         """
 
-        return self.info_dict[class_name]['students'][username]['first']
+        super().__init__(parent)
+        self.json_info = json_info
 
-    def home_dir(self, class_name: str, username: str) -> str:
-        """
-        Get the home directory of a student.
+    def run(self):
+        self.built.emit(self.json_info, SearchIndex(self.json_info))
 
-        :param class_name: name of a class
-        :param username: username of a student
-        :return: student's home directory
-        """
 
-        return self.info_dict[class_name]['students'][username]['home_dir']
+class SubmissionIndexBuilder(QThread):
+    """Builds the SubmissionTimeIndex of an info off the GUI thread."""
+
+    built = pyqtSignal(object, object)
 
-    def last_name(self, class_name: str, username: str) -> str:
+    def __init__(self, json_info: JsonInfo, parent=None):
+        """
+        Create the thread
+        :param json_info: JsonInfo to index
+        :param parent: parent QObject
         """
-        Get the last name of a student.
 
-        :param class_name: name of a class
-        :param username: username of a student
-        :return: student's last name
+        super().__init__(parent)
+        self.json_info = json_info
+
+    def run(self):
+        self.built.emit(self.json_info, SubmissionTimeIndex(self.json_info))
+
+
+class LastVisit:
+    """
+    Remembers when the tool was last closed, so the next session can show
+    the submissions made since.
+    """
+
+    def __init__(self, path: str = LAST_VISIT_PATH):
+        """
+        Create the object, reading the time of the last visit
+        :param path: path of the file keeping the time
         """
 
-        return self.info_dict[class_name]['students'][username]['last']
+        self.path = path
+        self.time = 0
+        try:
+            with open(path, 'r') as visit_file:
+                self.time = int(visit_file.read().strip())
+        except (OSError, ValueError):
+            pass
 
-    def assignments_by_student_list(self, class_name: str, username: str) \
-            -> list:
+    def save(self, timestamp: int = None):
         """
-        Get all the assignments for a student.
+        Record the end of the current visit.
 
-        :param class_name: name of a student
-        :param username: username of a student
-        :return: an info dict of all the assignments for a student
+        :param timestamp: Unix time to record, defaults to now
         """
 
-        student_assignments = []
-        for an_assignment in self.assignment_list(class_name):
-            student_assignment = self.info_dict[class_name]['assignments'][
-                an_assignment]['students_repos'][username]
-            if student_assignment is not None:
-                student_assignments.append(an_assignment)
-        return student_assignments
+        if timestamp is None:
+            timestamp = int(time())
+        try:
+            with open(self.path, 'w') as visit_file:
+                visit_file.write('{}\n'.format(timestamp))
+        except OSError:
+            pass
 
-    def assignment_by_student_hash(self, class_name: str, assignment: str,
-                                   username: str) -> str:
-        """
-        Get the hash of a student's assignment.
 
-        :param class_name: name of a class
-        :param assignment: name of an assignment
-        :param username: username of a student
-        :return: the hash of a student's assignment
+class InfoReloader(QThread):
+    """Reads the info files again and diffs them against the current info."""
+
+    reloaded = pyqtSignal(object, object)
+
+    def __init__(self, info_paths: list, json_info: JsonInfo, parent=None):
         """
-        return self.info_dict[class_name]['assignments'][assignment][
-            'students_repos'][username]['hash']
+        Create the thread
+        :param info_paths: paths of the info files
+        :param json_info: JsonInfo of the current info
+        :param parent: parent QObject
+        """
+
+        super().__init__(parent)
+        self.info_paths = info_paths
+        self.json_info = json_info
+
+    def run(self):
+        try:
+            new_json_info = load_infos(self.info_paths)
+        except (OSError, ValueError):
+            # the file is most likely being written, the next change
+            # notification reloads it
+            return
+        changes = diff_info(self.json_info, new_json_info)
+        self.reloaded.emit(new_json_info, changes)
+
+
+class InfoWatcher(QObject):
+    """
+    Watches the info files and reloads them off the GUI thread when one
+    changes. Bursts of change notifications are coalesced into one reload.
+    """
+
+    reloaded = pyqtSignal(object, object)
 
-    def assignment_by_student_path(self, class_name: str, assignment: str,
-                                   username: str) -> str:
+    def __init__(self, info_paths: list, json_info: JsonInfo, parent=None,
+                 delay: int = 250):
+        """
+        Create the watcher
+        :param info_paths: paths of the info files
+        :param json_info: JsonInfo of the current info
+        :param parent: parent QObject
+        :param delay: milliseconds to wait for further changes before
+        reloading
         """
-        Get the path of a student's assignment.
 
-        :param class_name: name of a class
-        :param assignment: name of an assignment
-        :param username: username of a student
-        :return: the path of a student's assignment
+        super().__init__(parent)
+        self.info_paths = info_paths
+        self.json_info = json_info
+        self.reloader = None
+        self.pending = False
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.reload)
+        self.watcher = QFileSystemWatcher(info_paths, self)
+        self.watcher.fileChanged.connect(self.file_changed)
+
+    def file_changed(self, path: str):
+        # files replaced by a rename stop being watched
+        if path not in self.watcher.files() and os.path.exists(path):
+            self.watcher.addPath(path)
+        self.timer.start()
+
+    def reload(self):
+        if self.reloader is not None:
+            self.pending = True
+            return
+        self.reloader = InfoReloader(self.info_paths, self.json_info, self)
+        self.reloader.reloaded.connect(self.info_reloaded)
+        self.reloader.finished.connect(self.reloader_finished)
+        self.reloader.start()
+
+    def info_reloaded(self, json_info: JsonInfo, changes: InfoChanges):
+        # emitted even without changes, since changes to classes that are
+        # not loaded are not diffed and the new info must still be used
+        self.json_info = json_info
+        self.reloaded.emit(json_info, changes)
+
+    def reloader_finished(self):
+        self.reloader.deleteLater()
+        self.reloader = None
+        if self.pending:
+            self.pending = False
+            self.reload()
+
+
+class SyncThread(QThread):
+    """
+    Syncs a SyncStore with its source off the GUI thread. When a class
+    changed, the new info.json of the store is picked up by its InfoWatcher.
+    """
+
+    synced = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, store: SyncStore, source, parent=None):
+        """
+        Create the thread
+        :param store: SyncStore to bring up to date
+        :param source: DirectorySource or CommandSource to sync from
+        :param parent: parent QObject
         """
 
-        return self.info_dict[class_name]['assignments'][assignment][
-            'students_repos'][username]['path']
+        super().__init__(parent)
+        self.store = store
+        self.source = source
+
+    def run(self):
+        try:
+            result = self.store.sync(self.source)
+        except (SyncError, OSError) as e:
+            self.failed.emit(str(e))
+            return
+        self.synced.emit(result)
+
 
-    def submission_count(self, class_name: str, assignment: str,
-                         username: str) -> int:
+class FetchThread(QThread):
+    """Fetches repositories with a bounded pool of workers."""
+
+    fetched = pyqtSignal(object)
+    summarized = pyqtSignal(object)
+
+    def __init__(self, repo_fetches: list, max_workers: int = 4,
+                 parent=None, manifest: FetchManifest = None,
+                 retries: int = 0):
+        """
+        Create the thread
+        :param repo_fetches: list of RepoFetch
+        :param max_workers: maximum number of repositories fetched at once
+        :param parent: parent QObject
+        :param manifest: FetchManifest to skip unchanged repositories with
+        :param retries: number of times to retry a failed fetch
         """
-        Get the submission count of a student for an assignment.
 
-        :param class_name: name of a class
-        :param assignment: name of an assignment
-        :param username: username of a student
-        :return: student's submission count for an assignment
+        super().__init__(parent)
+        self.repo_fetches = repo_fetches
+        self.max_workers = max_workers
+        self.manifest = manifest
+        self.retries = retries
+
+    def run(self):
+        start = perf_counter()
+        results = fetch_repos(self.repo_fetches, self.max_workers,
+                              self.fetched.emit, self.manifest, self.retries)
+        self.summarized.emit(FetchSummary(results, perf_counter() - start,
+                                          self.manifest))
+
+
+class FetchDialog(QDialog):
+    """Shows the progress of fetching repositories, one line per
+    repository."""
+
+    def __init__(self, repo_fetches: list, parent=None, max_workers: int = 4,
+                 manifest: FetchManifest = None, retries: int = 0):
+        """
+        Create the dialog and start fetching
+        :param repo_fetches: list of RepoFetch
+        :param parent: parent widget
+        :param max_workers: maximum number of repositories fetched at once
+        :param manifest: FetchManifest to skip unchanged repositories with
+        :param retries: number of times to retry a failed fetch
         """
 
-        return self.info_dict[class_name]['assignments'][assignment][
-            'students_repos'][username]['submission_count']
+        super().__init__(parent)
+        self.layout = QVBoxLayout()
+        self.progressBar = QProgressBar()
+        self.progressBar.setRange(0, len(repo_fetches))
+        self.progressBar.setValue(0)
+        self.resultList = QListWidget()
+        self.items = {}
+        for repo_fetch in repo_fetches:
+            self.resultList.addItem('{}: waiting'.format(repo_fetch.label))
+            self.items[repo_fetch] = \
+                self.resultList.item(self.resultList.count() - 1)
+        self.layout.addWidget(self.progressBar)
+        self.layout.addWidget(self.resultList)
+        self.setLayout(self.layout)
+        self.setWindowTitle('Fetching {} repositories'.format(
+            len(repo_fetches)))
+        self.resize(500, 300)
+
+        # parented to the window so closing the dialog does not stop it
+        self.thread = FetchThread(repo_fetches, max_workers, parent,
+                                  manifest, retries)
+        self.thread.fetched.connect(self.repo_fetched)
+        self.thread.summarized.connect(self.fetch_summarized)
+        self.thread.start()
+
+    def repo_fetched(self, result):
+        self.items[result.repo_fetch].setText(str(result))
+        self.progressBar.setValue(self.progressBar.value() + 1)
+
+    def fetch_summarized(self, summary):
+        text = str(summary)
+        self.setWindowTitle(text[0].upper() + text[1:])
 
-    def time(self, class_name: str, assignment: str, username: str):
+
+class AnalyticsTableModel(QAbstractTableModel):
+    """Rows of precomputed analytics values, sorted on their raw values."""
+
+    def __init__(self, headers: tuple, rows: list, parent=None):
+        """
+        Create the model
+        :param headers: header of each column
+        :param rows: list of rows, each a tuple of (text, value) cells
+        :param parent: parent QObject
         """
-        Get the Unix time a student last submitted an assignment.
 
+        super().__init__(parent)
+        self.headers = headers
+        self.rows = rows
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        text, value = self.rows[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            return text
+        if role == SORT_ROLE:
+            return value
+        return None
+
+
+class ClassMatrixBuilder(QThread):
+    """Builds the ClassMatrix of a class off the GUI thread."""
+
+    built = pyqtSignal(object, str, object)
+
+    def __init__(self, json_info: JsonInfo, class_name: str, parent=None):
+        """
+        Create the thread
+        :param json_info: JsonInfo of the info
         :param class_name: name of a class
-        :param assignment: name of an assignment
-        :param username: username of a student
-        :return: the Unix time a student last submitted an assignment.
+        :param parent: parent QObject
         """
 
-        return self.info_dict[class_name]['assignments'][assignment][
-            'students_repos'][username]['time']
+        super().__init__(parent)
+        self.json_info = json_info
+        self.class_name = class_name
 
-    def time_converted(self, class_name: str, assignment: str, username: str)\
-            -> str:
-        """
-        Get a string of the time a student last submitted an assignment
-        (month/day/year hour:min:second)
+    def run(self):
+        self.built.emit(self.json_info, self.class_name,
+                        ClassMatrix.from_json_info(self.json_info,
+                                                   self.class_name))
 
-        :param class_name: name of a class
-        :param assignment: name of an assignment
-        :param username: username of a student
-        :return: a string of the time a student last submitted an assignment
+
+class AnalyticsDialog(QDialog):
+    """
+    Shows the submission rate, resubmissions and lateness of each
+    assignment of a class, and the students who never submitted.
+    """
+
+    def __init__(self, class_name: str, matrix, deadlines: dict,
+                 parent=None):
+        """
+        Create the dialog
+        :param class_name: name of the class
+        :param matrix: ClassMatrix of the class
+        :param deadlines: dictionary mapping assignment names to Unix times
+        :param parent: parent widget
         """
 
-        time = localtime(self.time(class_name, assignment, username))
-        return '{0}/{1}/{2} {3}:{4}:{5}'.\
-            format(time.tm_mon, time.tm_mday, time.tm_year,
-                   time.tm_hour, time.tm_min, time.tm_sec)
+        super().__init__(parent)
+        submitted = matrix.submitted_counts()
+        rates = matrix.submission_rates()
+        resubmissions = matrix.resubmission_counts()
+        headers = ('Assignment', 'Submitted', 'Rate', 'Resubmissions')
+        columns = [[(assignment, assignment)
+                    for assignment in matrix.assignments],
+                   [(str(count), int(count)) for count in submitted],
+                   [('' if rate != rate else '{:.0%}'.format(rate),
+                     float(rate)) for rate in rates],
+                   [(str(count), int(count)) for count in resubmissions]]
+
+        if deadlines:
+            headers += ('Median lateness (h)',) + LATENESS_LABELS
+            columns.append([('' if median != median else
+                             '{:.1f}'.format(median / 3600),
+                             float(median))
+                            for median in matrix.median_lateness(deadlines)])
+            histogram = matrix.lateness_histogram(deadlines)
+            for interval in range(len(LATENESS_LABELS)):
+                columns.append([(str(count), int(count))
+                                for count in histogram[:, interval]])
+
+        without_submissions = matrix.students_without_submissions()
+        summary = '{0} students, {1} assignments, {2} submitted ' \
+            'nothing{3}'.format(
+                len(matrix.usernames), len(matrix.assignments),
+                len(without_submissions),
+                ': ' + ', '.join(without_submissions)
+                if without_submissions else '')
+        if not deadlines:
+            summary += '\nNo deadlines for this class, lateness is not shown'
 
-    def get_username_from_name(self, class_name: str, name: str) -> str:
+        self.layout = QVBoxLayout()
+        self.summaryLabel = QLabel(summary)
+        self.summaryLabel.setWordWrap(True)
+        self.table = QTableView()
+        model = AnalyticsTableModel(headers, list(zip(*columns)), self.table)
+        proxy = QSortFilterProxyModel(self.table)
+        proxy.setSortRole(SORT_ROLE)
+        proxy.setSourceModel(model)
+        self.table.setModel(proxy)
+        self.table.setSortingEnabled(True)
+        self.table.resizeColumnsToContents()
+        self.layout.addWidget(self.summaryLabel)
+        self.layout.addWidget(self.table)
+        self.setLayout(self.layout)
+        self.setWindowTitle('Analytics for {}'.format(class_name))
+        self.resize(700, 500)
+
+
+class PageReader(QThread):
+    """Reads a page of a file off the GUI thread."""
+
+    read = pyqtSignal(object, int, object)
+    failed = pyqtSignal(object, str)
+
+    def __init__(self, browser: RepoBrowser, entry: TreeEntry, page: int,
+                 parent=None):
+        """
+        Create the thread
+        :param browser: RepoBrowser of the repository
+        :param entry: TreeEntry of the file
+        :param page: number of the page, from 0
+        :param parent: parent QObject
         """
-        Get the username of a student from his/her full name.
 
-        :param class_name: name of a class
-        :param name: a student's full name in the format
-        "last name, first name"
-        :return: student's username
+        super().__init__(parent)
+        self.browser = browser
+        self.entry = entry
+        self.page = page
+
+    def run(self):
+        try:
+            data = self.browser.read_page(self.entry, self.page)
+        except (FetchError, OSError) as e:
+            self.failed.emit(self.entry, str(e))
+            return
+        self.read.emit(self.entry, self.page, data)
+
+
+class RepoBrowserDialog(QDialog):
+    """
+    Shows the files of a submission at its recorded hash. Directories are
+    listed when they are expanded and files are shown a page at a time.
+    """
+
+    def __init__(self, browser: RepoBrowser, title: str, parent=None):
+        """
+        Create the dialog and list the root of the repository
+        :param browser: RepoBrowser of the submission
+        :param title: title of the dialog
+        :param parent: parent widget
         """
 
-        for username in self.student_list(class_name):
-            name_form = '{0}, {1}'.format(
-                self.last_name(class_name, username),
-                self.first_name(class_name, username))
-            if name_form == name:
-                return username
+        super().__init__(parent)
+        self.browser = browser
+        self.entry = None
+        self.pages = 0
+        self.decoder = None
+        self.reader = None
+        self.pending = False
+        self.layout = QVBoxLayout()
+        self.splitter = QSplitter()
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(('Name', 'Size'))
+        self.tree.setColumnWidth(0, 200)
+        self.tree.itemExpanded.connect(self.list_directory)
+        self.tree.currentItemChanged.connect(self.show_file)
+        self.content = QPlainTextEdit()
+        self.content.setReadOnly(True)
+        self.content.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.content.setFont(
+            QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.splitter.addWidget(self.tree)
+        self.splitter.addWidget(self.content)
+        self.splitter.setSizes([250, 550])
+        self.pageLabel = QLabel()
+        self.moreButton = QPushButton('More')
+        self.moreButton.clicked.connect(self.read_next_page)
+        self.moreButton.setVisible(False)
+        self.statusLayout = QHBoxLayout()
+        self.statusLayout.addWidget(self.pageLabel)
+        self.statusLayout.addStretch()
+        self.statusLayout.addWidget(self.moreButton)
+        self.layout.addWidget(self.splitter)
+        self.layout.addLayout(self.statusLayout)
+        self.setLayout(self.layout)
+        self.setWindowTitle(title)
+        self.resize(800, 500)
+        self.add_entries(self.tree.invisibleRootItem(), '')
 
-    def last_first_username(self, class_name: str, username: str) -> str:
+    def add_entries(self, parent_item: QTreeWidgetItem, directory: str):
         """
-        Get the last name, first name, and username of a student.
+        List a directory under its item. Subdirectories get a placeholder
+        child so they can be expanded before they are listed.
 
-        :param class_name: name of a class
-        :param username: username of a student
-        :return: a string in the format "last name, first name, username"
+        :param parent_item: item of the directory
+        :param directory: path of the directory, '' for the root
+        """
 
+        try:
+            entries = self.browser.list_directory(directory)
+        except FetchError as e:
+            self.pageLabel.setText(str(e))
+            return
+        for entry in entries:
+            size = '' if entry.size is None else str(entry.size)
+            item = QTreeWidgetItem(parent_item, [entry.name, size])
+            item.setData(0, Qt.UserRole, entry)
+            if entry.kind == TREE:
+                QTreeWidgetItem(item)
+
+    def list_directory(self, item: QTreeWidgetItem):
+        entry = item.data(0, Qt.UserRole)
+        if entry.path in self.browser.trees:
+            return
+        item.takeChildren()
+        self.add_entries(item, entry.path)
+
+    def show_file(self, item: QTreeWidgetItem):
+        entry = item.data(0, Qt.UserRole) if item is not None else None
+        if entry is None or entry.kind != BLOB:
+            return
+        self.entry = entry
+        self.pages = 0
+        self.decoder = None
+        self.content.clear()
+        self.moreButton.setVisible(False)
+        self.read_next_page()
+
+    def read_next_page(self):
+        """
+        Start reading the page of the shown file after the ones shown, once
+        the page being read is done.
         """
-        return self.info_dict[class_name]['students'][username][
-            'last_first_username']
+
+        if self.reader is not None:
+            self.pending = True
+            return
+        self.pageLabel.setText('Reading {}...'.format(self.entry.path))
+        self.reader = PageReader(self.browser, self.entry, self.pages, self)
+        self.reader.read.connect(self.page_read)
+        self.reader.failed.connect(self.page_failed)
+        self.reader.finished.connect(self.reader_finished)
+        self.reader.start()
+
+    def page_read(self, entry: TreeEntry, page: int, data: bytes):
+        if entry is not self.entry or page != self.pages:
+            # another file was selected while this page was read
+            return
+        if self.decoder is None:
+            self.decoder = hex_dump if is_binary(data) else \
+                codecs.getincrementaldecoder('utf-8')(errors='replace')
+        page_count = entry.page_count(self.browser.page_size)
+        if self.decoder is not hex_dump:
+            text = self.decoder.decode(data, page + 1 >= page_count)
+        else:
+            text = hex_dump(data, page * self.browser.page_size)
+            if page > 0:
+                text = '\n' + text
+        self.content.moveCursor(QTextCursor.End)
+        self.content.insertPlainText(text)
+        self.pages += 1
+        self.pageLabel.setText('{0}: page {1} of {2}'.format(
+            entry.path, self.pages, page_count))
+        self.moreButton.setVisible(self.pages < page_count)
+
+    def page_failed(self, entry: TreeEntry, error: str):
+        if entry is self.entry:
+            self.pageLabel.setText('{0}: {1}'.format(entry.path, error))
+
+    def reader_finished(self):
+        reader = self.reader
+        self.reader = None
+        reader.deleteLater()
+        if self.pending:
+            self.pending = False
+            self.read_next_page()
+
+
+class NavigationView:
+    """A table view kept alive by CreateTable, with the window settings it
+    was built with."""
+
+    def __init__(self, key: tuple, table: QTableView, title: str, width: int,
+                 height: int):
+        """
+        Create the object
+        :param key: navigation key of the view, its kind followed by the
+        class, assignment or username it shows
+        :param table: the table view
+        :param title: window title of the view
+        :param width: window width of the view
+        :param height: window height of the view
+        """
+
+        self.key = key
+        self.table = table
+        self.title = title
+        self.width = width
+        self.height = height
 
 
 class CreateTable(QWidget):
 
-    def __init__(self):
+    viewCacheSize = 8
+
+    def __init__(self, json_info: JsonInfo):
         super().__init__()
+        self.json_info = json_info
         self.left = 550
         self.top = 50
         self.width = 0
@@ -318,88 +1273,285 @@ class CreateTable(QWidget):
         self.class_name = ''
         self.assignment = ''
         self.username = ''
-        self.tableClass = QTableWidget()
-        self.tableAssignment = QTableWidget()
-        self.tableAssignmentDetails = QTableWidget()
-        self.tableStudent = QTableWidget()
+        self.workspace = DEFAULT_WORKSPACE
+        self.fetchWorkers = 8
+        self.fetchRetries = 2
+        self.fetchDialog = None
+        self.browserDialog = None
+        self.blobCache = BlobCache()
+        self.tableClass = None
+        self.tableAssignment = None
+        self.tableAssignmentDetails = None
+        self.tableStudent = None
+        self.tableSearch = None
+        self.tableNew = None
+        self.current_table = None
+        self.searchIndex = None
+        self.searchIndexBuilder = None
+        self.searchResults = []
+        self.lastVisit = LastVisit()
+        self.submissionIndex = None
+        self.submissionIndexBuilder = None
+        self.newSubmissionsWanted = False
+        self.viewStack = []
+        self.viewCache = OrderedDict()
         self.toolbar = QToolBar(self)
         self.layout.addWidget(self.toolbar)
         self.fetchSubmissionButton = QPushButton("Fetch", self.toolbar)
+        self.fetchSubmissionButton.clicked.connect(
+            self.fetch_student_submission)
+        self.fetchAllButton = QPushButton("Fetch All", self.toolbar)
+        self.fetchAllButton.clicked.connect(self.fetch_all_submissions)
+        self.analyticsButton = QPushButton("Analytics", self.toolbar)
+        self.analyticsButton.clicked.connect(self.show_analytics)
+        self.newButton = QPushButton("New", self.toolbar)
+        self.newButton.clicked.connect(self.show_new_submissions)
+        self.analyticsDialog = None
+        self.classMatrices = {}
+        self.classMatrixBuilders = {}
+        self.deadlines = {}
         self.backAction = QAction(QIcon('left_arrow.png'), 'Back', self)
+        self.backAction.triggered.connect(self.go_back)
         self.toolbar.addAction(self.backAction)
+        self.searchBox = QLineEdit()
+        self.searchBox.setPlaceholderText('Search')
+        self.searchBox.setFixedWidth(160)
+        self.toolbar.addWidget(self.searchBox)
+        self.toolbar.addWidget(self.newButton)
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(100)
+        self.searchTimer.timeout.connect(self.search)
+        self.searchBox.textEdited.connect(self.searchTimer.start)
+        self.progressBar = QProgressBar()
+        self.progressBar.setVisible(False)
+        self.layout.addWidget(self.progressBar)
+        self.profileLabel = QLabel()
+        self.profileLabel.setWordWrap(True)
+        self.profileLabel.setVisible(PROFILER.enabled)
+        self.layout.addWidget(self.profileLabel)
         self.init_ui()
 
     def init_ui(self):
         self.setLayout(self.layout)
-        self.create_table_class()
+        self.navigate((CLASS_VIEW,))
+
+    def create_table_view(self, model: InfoTableModel) -> QTableView:
+        """
+        Create a table view showing a model through a sorting proxy.
+
+        :param model: model holding the rows of the table
+        :return: the table view, already added to the layout
+        """
+
+        table = QTableView()
+        model.setParent(table)
+        model.populated.connect(self.population_progress)
+        proxy = QSortFilterProxyModel(table)
+        proxy.setSortRole(SORT_ROLE)
+        proxy.setSourceModel(model)
+        table.setModel(proxy)
+        table.hide()
+        self.layout.addWidget(table)
+        return table
+
+    @staticmethod
+    def current_key(table: QTableView):
+        """
+        Get the key of the current row of a table view.
+
+        :param table: a table view created by create_table_view
+        :return: the key of the row under the cursor
+        """
+
+        proxy = table.model()
+        index = proxy.mapToSource(table.currentIndex())
+        return proxy.sourceModel().row_key(index.row())
+
+    def navigate(self, key: tuple):
+        """
+        Show a view and push it on the navigation stack.
+
+        :param key: navigation key of the view
+        """
+
+        self.viewStack.append(key)
+        self.show_view(key)
+
+    def go_back(self):
+        """
+        Pop the current view from the navigation stack and show the previous
+        one, as it was left.
+        """
+
+        if len(self.viewStack) > 1:
+            self.viewStack.pop()
+            self.show_view(self.viewStack[-1])
+
+    def show_view(self, key: tuple):
+        """
+        Show a view, restoring it from the cache if it is still there.
+
+        :param key: navigation key of the view
+        """
 
-    def close_table(self, table):
-        if not table.close():
-            self.layout.removeWidget(table)
-            table.deleteLater()
-            table = None
+        view = self.viewCache.get(key)
+        if view is not None:
+            self.viewCache.move_to_end(key)
+            self.activate_view(view)
+        elif key[0] == CLASS_VIEW:
+            self.create_table_class()
+        elif key[0] == ASSIGNMENTS_VIEW:
+            self.create_table_assignments(key[1])
+        elif key[0] == ASSIGNMENT_DETAILS_VIEW:
+            self.create_table_assignment_details(key[1], key[2])
+        elif key[0] == STUDENT_VIEW:
+            self.create_table_student(key[1], key[2])
+        elif key[0] == NEW_VIEW:
+            self.create_table_new()
+        else:
+            self.create_table_search()
+
+    def cache_view(self, view: NavigationView):
+        """
+        Add a newly built view to the cache, evicting the least recently
+        shown views beyond viewCacheSize, and show it.
+
+        :param view: the view
+        """
+
+        self.evict_view(view.key)
+        self.viewCache[view.key] = view
+        self.activate_view(view)
+        for key in list(self.viewCache):
+            if len(self.viewCache) <= self.viewCacheSize:
+                break
+            self.evict_view(key)
+
+    def evict_view(self, key: tuple):
+        """
+        Remove a view from the cache and delete its table.
+
+        :param key: navigation key of the view
+        """
+
+        view = self.viewCache.pop(key, None)
+        if view is None:
+            return
+        view.table.model().sourceModel().stop_populating()
+        if view.table is self.current_table:
+            self.current_table = None
+        self.layout.removeWidget(view.table)
+        view.table.deleteLater()
+
+    def activate_view(self, view: NavigationView):
+        """
+        Make a view the visible one and set up the window for it.
 
-    def close_all_tables(self):
-        self.close_table(self.tableClass)
-        self.close_table(self.tableAssignment)
-        self.close_table(self.tableAssignmentDetails)
-        self.close_table(self.tableStudent)
+        :param view: the view
+        """
+
+        kind = view.key[0]
+        model = view.table.model().sourceModel()
+        if self.current_table is not None and \
+                self.current_table is not view.table:
+            self.current_table.model().sourceModel().stop_populating()
+            self.current_table.hide()
+        self.current_table = view.table
+        view.table.show()
+        self.population_progress(len(model.rows), len(model.keys), model)
+        model.populate()
+
+        if kind == CLASS_VIEW:
+            self.tableClass = view.table
+        elif kind == ASSIGNMENTS_VIEW:
+            self.class_name = view.key[1]
+            self.tableAssignment = view.table
+        elif kind == ASSIGNMENT_DETAILS_VIEW:
+            self.class_name, self.assignment = view.key[1:]
+            self.tableAssignmentDetails = view.table
+        elif kind == STUDENT_VIEW:
+            self.class_name, self.username = view.key[1:]
+            self.tableStudent = view.table
+        elif kind == NEW_VIEW:
+            self.tableNew = view.table
+        else:
+            self.tableSearch = view.table
+
+        self.backAction.setVisible(kind != CLASS_VIEW)
+        self.fetchSubmissionButton.setVisible(kind == STUDENT_VIEW)
+        self.fetchAllButton.setVisible(kind == ASSIGNMENT_DETAILS_VIEW)
+        self.analyticsButton.setVisible(kind == ASSIGNMENTS_VIEW and
+                                        ClassMatrix is not None)
+        self.fetchSubmissionButton.move(view.width - 130, 0)
+        self.fetchAllButton.move(view.width - 130, 0)
+        self.analyticsButton.move(view.width - 130, 0)
+        self.setWindowTitle(view.title)
+        self.width = view.width
+        self.height = view.height
+        with PROFILER.phase(type(model).__name__ + '.geometry'):
+            self.setGeometry(self.left, self.top, self.width, self.height)
+        self.show_profile(model)
+
+    def population_progress(self, done: int, total: int, model=None):
+        """
+        Show how many rows of the visible table are computed, hiding the
+        progress bar once all are.
+
+        :param done: number of rows computed
+        :param total: number of rows of the table
+        :param model: the table's model, defaults to the sender
+        """
+
+        if model is None:
+            model = self.sender()
+        if self.current_table is None or \
+                model is not self.current_table.model().sourceModel():
+            return
+        self.progressBar.setRange(0, total)
+        self.progressBar.setValue(done)
+        self.progressBar.setVisible(done < total)
+        if done == total:
+            self.show_profile(model)
+
+    def show_profile(self, model: InfoTableModel):
+        """
+        Show the latest build phases of a table and the slowest JsonInfo
+        methods in the profile readout, if profiling is enabled.
+
+        :param model: model of the visible table
+        """
+
+        if PROFILER.enabled:
+            self.profileLabel.setText(
+                PROFILER.summary(type(model).__name__ + '.'))
 
     def create_table_class(self):
-        self.close_all_tables()
-        self.backAction.setVisible(False)
-        self.fetchSubmissionButton.setVisible(False)
-        self.tableClass = QTableWidget()
-        self.layout.addWidget(self.tableClass)
-        self.tableClass.show()
-        self.setWindowTitle('Classes')
-        self.tableClass.setRowCount(JsonInfo(info).class_count())
-        self.tableClass.setColumnCount(2)
-        self.tableClass.setHorizontalHeaderItem(0, QTableWidgetItem("Name"))
-        self.tableClass.\
-            setHorizontalHeaderItem(1, QTableWidgetItem("Students"))
-        row = 0
-
-        for a_class in JsonInfo(info).class_list():
-            self.tableClass.setItem(row, 0, QTableWidgetItem(a_class))
-            self.tableClass.setItem(row, 1, QTableWidgetItem(
-                str(JsonInfo(info).student_count(a_class))))
-            row += 1
+        with PROFILER.phase('ClassTableModel.data'):
+            model = ClassTableModel(self.json_info)
+        self.tableClass = self.create_table_view(model)
+        title = 'Classes'
+        row = len(self.tableClass.model().sourceModel().keys)
 
         self.tableClass.move(0, 0)
         self.tableClass.doubleClicked.connect(self.double_click_class)
         self.tableClass.setSortingEnabled(True)
         self.tableClass.setWordWrap(True)
-        self.height = self.tableClass.rowHeight(0) * row + 80
-        self.width = \
-            self.tableClass.columnWidth(0) + \
-            self.tableClass.columnWidth(1) + 50
-        self.setGeometry(self.left, self.top, self.width, self.height)
+        with PROFILER.phase('ClassTableModel.sizing'):
+            height = self.tableClass.verticalHeader().defaultSectionSize() * row + 80
+            width = sum(self.tableClass.columnWidth(column)
+                        for column in range(len(model.headers))) + 50
+        self.cache_view(NavigationView((CLASS_VIEW,), self.tableClass, title,
+                                       width, height))
         self.show()
 
     def create_table_assignments(self, class_name):
-        self.close_all_tables()
-        self.backAction.setVisible(True)
-        self.fetchSubmissionButton.setVisible(False)
-        self.tableAssignment = QTableWidget()
-        self.layout.addWidget(self.tableAssignment)
-        self.tableAssignment.show()
-        self.setWindowTitle('Assignments for {}'.format(class_name))
-        self.tableAssignment.setRowCount(JsonInfo(info).
-                                         assignment_count(class_name))
-        self.tableAssignment.setColumnCount(2)
-        self.tableAssignment.\
-            setHorizontalHeaderItem(0, QTableWidgetItem('Assignment name'))
-        self.tableAssignment.\
-            setHorizontalHeaderItem(1, QTableWidgetItem('Submitted'))
-        row = 0
-
-        for assignment in JsonInfo(info).assignment_list(class_name):
-            self.tableAssignment.setItem(row, 0, QTableWidgetItem(assignment))
-            self.tableAssignment.setItem(row, 1, QTableWidgetItem(
-                str(JsonInfo(info).
-                    student_submitted_count(class_name, assignment))))
-            row += 1
+        with PROFILER.phase('AssignmentTableModel.data'):
+            self.json_info.load_class(class_name)
+            model = AssignmentTableModel(self.json_info, class_name)
+        self.tableAssignment = self.create_table_view(model)
+        title = 'Assignments for {}'.format(class_name)
+        row = len(self.tableAssignment.model().sourceModel().keys)
 
         self.tableAssignment.setColumnWidth(0, 200)
         self.tableAssignment.setColumnWidth(1, 100)
@@ -407,45 +1559,24 @@ class CreateTable(QWidget):
         self.tableAssignment.setSortingEnabled(True)
         self.tableAssignment.doubleClicked.\
             connect(self.double_click_assignment)
-        self.backAction.triggered.connect(self.show_table_class)
         self.tableAssignment.setWordWrap(True)
-        self.height = self.tableAssignment.rowHeight(0) * row + 110
-        self.width = \
-            self.tableAssignment.columnWidth(0) + \
-            self.tableAssignment.columnWidth(1) + 60
-        self.setGeometry(self.left, self.top, self.width, self.height)
+        with PROFILER.phase('AssignmentTableModel.sizing'):
+            height = self.tableAssignment.verticalHeader().defaultSectionSize() * row + 110
+            width = \
+                self.tableAssignment.columnWidth(0) + \
+                self.tableAssignment.columnWidth(1) + 60
+        self.cache_view(NavigationView((ASSIGNMENTS_VIEW, class_name),
+                                       self.tableAssignment, title, width,
+                                       height))
 
     def create_table_assignment_details(self, class_name, assignment):
-        self.close_all_tables()
-        self.backAction.setVisible(True)
-        self.fetchSubmissionButton.setVisible(False)
-        self.tableAssignmentDetails = QTableWidget()
-        self.layout.addWidget(self.tableAssignmentDetails)
-        self.tableAssignmentDetails.show()
-        self.setWindowTitle('Students for {}'.format(assignment))
-        self.tableAssignmentDetails.setRowCount(JsonInfo(info).
-                                                student_count(class_name))
-        self.tableAssignmentDetails.setColumnCount(3)
-        self.tableAssignmentDetails.\
-            setHorizontalHeaderItem(0, QTableWidgetItem('Name'))
-        self.tableAssignmentDetails.setHorizontalHeaderItem(
-            1, QTableWidgetItem('Last submission time'))
-        self.tableAssignmentDetails.setHorizontalHeaderItem(
-            2, QTableWidgetItem('Submission Count'))
-        row = 0
-
-        for student in JsonInfo(info).student_list(class_name):
-            self.tableAssignmentDetails.setItem(
-                row, 0, QTableWidgetItem('{0}, {1}'.format(
-                    JsonInfo(info).last_name(class_name, student),
-                    JsonInfo(info).first_name(class_name, student))))
-            self.tableAssignmentDetails.setItem(
-                row, 1, QTableWidgetItem(str(
-                    JsonInfo(info).time_converted(class_name, assignment, student))))
-            self.tableAssignmentDetails.setItem(
-                row, 2, QTableWidgetItem(str(JsonInfo(info).submission_count(
-                    class_name, assignment, student))))
-            row += 1
+        with PROFILER.phase('AssignmentDetailsTableModel.data'):
+            self.json_info.load_class(class_name)
+            model = AssignmentDetailsTableModel(self.json_info, class_name,
+                                                assignment)
+        self.tableAssignmentDetails = self.create_table_view(model)
+        title = 'Students for {}'.format(assignment)
+        row = len(self.tableAssignmentDetails.model().sourceModel().keys)
 
         self.tableAssignmentDetails.setColumnWidth(0, 200)
         self.tableAssignmentDetails.setColumnWidth(1, 200)
@@ -453,78 +1584,367 @@ class CreateTable(QWidget):
         self.tableAssignmentDetails.move(0, 0)
         self.tableAssignmentDetails.setSortingEnabled(True)
         self.tableAssignmentDetails.doubleClicked.connect(self.double_click_student)
-        self.backAction.triggered.connect(self.show_table_assignment)
         self.tableAssignmentDetails.setWordWrap(True)
-        self.height = self.tableAssignmentDetails.rowHeight(0) * row + 110
-        self.width = \
-            self.tableAssignmentDetails.columnWidth(0) + \
-            self.tableAssignmentDetails.columnWidth(1) + \
-            self.tableAssignmentDetails.columnWidth(2) + 60
-        self.setGeometry(self.left, self.top, self.width, self.height)
+        with PROFILER.phase('AssignmentDetailsTableModel.sizing'):
+            height = self.tableAssignmentDetails.verticalHeader().defaultSectionSize() * row + 110
+            width = \
+                self.tableAssignmentDetails.columnWidth(0) + \
+                self.tableAssignmentDetails.columnWidth(1) + \
+                self.tableAssignmentDetails.columnWidth(2) + 60
+        self.cache_view(NavigationView(
+            (ASSIGNMENT_DETAILS_VIEW, class_name, assignment),
+            self.tableAssignmentDetails, title, width, height))
 
     def create_table_student(self, class_name, username):
-        self.close_all_tables()
-        self.backAction.setVisible(True)
-        self.fetchSubmissionButton.setVisible(True)
-        self.tableStudent = QTableWidget()
-        self.layout.addWidget(self.tableStudent)
-        self.tableStudent.show()
-        self.setWindowTitle('{0}, {1}'.format(
-            JsonInfo(info).last_name(class_name, username),
-            JsonInfo(info).first_name(class_name, username)))
-        self.tableStudent.setRowCount(len(JsonInfo(info).assignments_by_student_list(class_name, username)))
-        self.tableStudent.setColumnCount(3)
-        self.tableStudent.setHorizontalHeaderItem(0, QTableWidgetItem('Assignment'))
-        self.tableStudent.setHorizontalHeaderItem(1, QTableWidgetItem('Last submission time'))
-        self.tableStudent.setHorizontalHeaderItem(2, QTableWidgetItem('Submission count'))
-        row = 0
-
-        for assignment in JsonInfo(info).assignments_by_student_list(class_name, username):
-            self.tableStudent.setItem(row, 0, QTableWidgetItem(assignment))
-            self.tableStudent.setItem(row, 1, QTableWidgetItem(JsonInfo(info).time_converted(class_name, assignment, username)))
-            self.tableStudent.setItem(row, 2, QTableWidgetItem(str(JsonInfo(info).submission_count(class_name, assignment, username))))
-            row += 1
+        with PROFILER.phase('StudentTableModel.data'):
+            self.json_info.load_class(class_name)
+            model = StudentTableModel(self.json_info, class_name, username)
+        self.tableStudent = self.create_table_view(model)
+        title = '{0}, {1}'.format(
+            self.json_info.last_name(class_name, username),
+            self.json_info.first_name(class_name, username))
+        row = len(self.tableStudent.model().sourceModel().keys)
 
         self.tableStudent.setColumnWidth(0, 200)
         self.tableStudent.setColumnWidth(1, 200)
         self.tableStudent.setColumnWidth(2, 150)
         self.tableStudent.move(0, 0)
         self.tableStudent.setSortingEnabled(True)
-        self.backAction.triggered.connect(self.show_table_assignment_details)
+        self.tableStudent.doubleClicked.connect(self.double_click_submission)
         self.tableStudent.setWordWrap(True)
-        self.height = self.tableStudent.rowHeight(0) * row + 110
-        self.width = self.tableStudent.columnWidth(0) + self.tableStudent.columnWidth(1) + self.tableStudent.columnWidth(2) + 60
-        self.fetchSubmissionButton.move(self.width - 130, 0)
-        self.fetchSubmissionButton.clicked.connect(self.fetch_student_submission)
-        self.setGeometry(self.left, self.top, self.width, self.height)
+        with PROFILER.phase('StudentTableModel.sizing'):
+            height = self.tableStudent.verticalHeader().defaultSectionSize() * row + 110
+            width = self.tableStudent.columnWidth(0) + self.tableStudent.columnWidth(1) + self.tableStudent.columnWidth(2) + 60
+        self.cache_view(NavigationView((STUDENT_VIEW, class_name, username),
+                                       self.tableStudent, title, width,
+                                       height))
+
+    def create_table_search(self):
+        with PROFILER.phase('SearchTableModel.data'):
+            model = SearchTableModel(self.json_info, self.searchResults)
+        self.tableSearch = self.create_table_view(model)
+        title = 'Search'
+
+        self.tableSearch.setColumnWidth(0, 100)
+        self.tableSearch.setColumnWidth(1, 250)
+        self.tableSearch.setColumnWidth(2, 100)
+        self.tableSearch.move(0, 0)
+        self.tableSearch.setSortingEnabled(True)
+        self.tableSearch.doubleClicked.connect(self.double_click_search_result)
+        self.tableSearch.setWordWrap(True)
+        height = 400
+        width = \
+            self.tableSearch.columnWidth(0) + \
+            self.tableSearch.columnWidth(1) + \
+            self.tableSearch.columnWidth(2) + 60
+        self.cache_view(NavigationView((SEARCH_VIEW,), self.tableSearch,
+                                       title, width, height))
+
+    def create_table_new(self):
+        with PROFILER.phase('NewSubmissionsTableModel.data'):
+            model = NewSubmissionsTableModel(
+                self.json_info, self.new_submissions())
+        self.tableNew = self.create_table_view(model)
+        if self.lastVisit.time:
+            title = 'New since {}'.format(
+                TIME_FORMATS.format(self.lastVisit.time))
+        else:
+            title = 'All submissions'
+
+        self.tableNew.setColumnWidth(0, 100)
+        self.tableNew.setColumnWidth(1, 100)
+        self.tableNew.setColumnWidth(2, 200)
+        self.tableNew.setColumnWidth(3, 200)
+        self.tableNew.setColumnWidth(4, 150)
+        self.tableNew.move(0, 0)
+        self.tableNew.setSortingEnabled(True)
+        self.tableNew.doubleClicked.connect(self.double_click_new_submission)
+        height = 400
+        width = sum(self.tableNew.columnWidth(column)
+                    for column in range(model.columnCount())) + 60
+        self.cache_view(NavigationView((NEW_VIEW,), self.tableNew, title,
+                                       width, height))
+
+    def new_submissions(self) -> list:
+        """
+        Get the submissions made since the last visit, newest first.
+
+        :return: list of (time, class, assignment, username) tuples, empty
+        until the submission index is built
+        """
+
+        if self.submissionIndex is None:
+            return []
+        return self.submissionIndex.since(self.lastVisit.time)[::-1]
+
+    def show_new_submissions(self):
+        """
+        Show the submissions made since the last visit, building the
+        submission time index first if needed.
+        """
+
+        if self.submissionIndex is None:
+            self.newSubmissionsWanted = True
+            self.build_submission_index()
+        elif self.viewStack[-1][0] != NEW_VIEW:
+            self.navigate((NEW_VIEW,))
+
+    def build_submission_index(self):
+        """
+        Start building the submission time index of the current info. It
+        loads every class, so it is only built once New is clicked, and
+        again after a reload while the New view is cached. The New button
+        is disabled until it is built.
+        """
+
+        if self.submissionIndexBuilder is not None:
+            return
+        self.newButton.setEnabled(False)
+        self.submissionIndexBuilder = SubmissionIndexBuilder(self.json_info,
+                                                             self)
+        self.submissionIndexBuilder.built.connect(self.submission_index_built)
+        self.submissionIndexBuilder.start()
+
+    def submission_index_built(self, json_info: JsonInfo,
+                               index: SubmissionTimeIndex):
+        self.submissionIndexBuilder.wait()
+        self.submissionIndexBuilder.deleteLater()
+        self.submissionIndexBuilder = None
+        self.newButton.setEnabled(True)
+        if json_info is not self.json_info:
+            # reloaded while building, build again only if still needed
+            if self.newSubmissionsWanted or (NEW_VIEW,) in self.viewCache:
+                self.build_submission_index()
+            return
+        self.submissionIndex = index
+        entries = self.new_submissions()
+        self.newButton.setText('New ({})'.format(len(entries)))
+        view = self.viewCache.get((NEW_VIEW,))
+        if view is not None:
+            view.table.model().sourceModel().set_entries(entries)
+        if self.newSubmissionsWanted:
+            self.newSubmissionsWanted = False
+            self.show_new_submissions()
+
+    def search(self):
+        """
+        Show the students and assignments matching the search box, building
+        the search index first if needed. Clearing the search box leaves the
+        search results.
+        """
+
+        text = self.searchBox.text()
+        if not SEARCH_SEPARATORS.sub('', text):
+            if self.viewStack[-1][0] == SEARCH_VIEW:
+                self.go_back()
+            return
+        if self.searchIndex is None:
+            self.build_search_index()
+            return
+
+        self.searchResults = self.searchIndex.search(text)
+        view = self.viewCache.get((SEARCH_VIEW,))
+        if view is not None:
+            view.table.model().sourceModel().set_results(self.searchResults)
+        if self.viewStack[-1][0] != SEARCH_VIEW:
+            self.navigate((SEARCH_VIEW,))
+
+    def build_search_index(self):
+        """
+        Start building the search index of the current info, showing a busy
+        progress bar until it is built.
+        """
+
+        if self.searchIndexBuilder is not None:
+            return
+        self.progressBar.setRange(0, 0)
+        self.progressBar.setVisible(True)
+        self.searchIndexBuilder = SearchIndexBuilder(self.json_info, self)
+        self.searchIndexBuilder.built.connect(self.search_index_built)
+        self.searchIndexBuilder.start()
+
+    def search_index_built(self, json_info: JsonInfo, index: SearchIndex):
+        self.searchIndexBuilder.wait()
+        self.searchIndexBuilder.deleteLater()
+        self.searchIndexBuilder = None
+        self.progressBar.setVisible(False)
+        if json_info is self.json_info:
+            self.searchIndex = index
+        self.search()
 
     def double_click_class(self):
-        self.class_name = self.tableClass.currentItem().text()
-        self.create_table_assignments(self.class_name)
+        self.navigate((ASSIGNMENTS_VIEW, self.current_key(self.tableClass)))
 
     def double_click_assignment(self):
-        self.assignment = self.tableAssignment.currentItem().text()
-        self.create_table_assignment_details(self.class_name, self.assignment)
+        self.navigate((ASSIGNMENT_DETAILS_VIEW, self.class_name,
+                       self.current_key(self.tableAssignment)))
 
     def double_click_student(self):
-        self.username = self.tableAssignmentDetails.currentItem().text()
-        self.username = JsonInfo(info).get_username_from_name(self.class_name, self.username)
-        self.create_table_student(self.class_name, self.username)
+        self.navigate((STUDENT_VIEW, self.class_name,
+                       self.current_key(self.tableAssignmentDetails)))
+
+    def double_click_submission(self):
+        assignment = self.current_key(self.tableStudent)
+        browser = RepoBrowser(
+            self.json_info.assignment_by_student_path(
+                self.class_name, assignment, self.username),
+            self.json_info.assignment_by_student_hash(
+                self.class_name, assignment, self.username),
+            self.blobCache)
+        self.browserDialog = RepoBrowserDialog(
+            browser, '{0}/{1}/{2}'.format(self.class_name, assignment,
+                                          self.username), self)
+        self.browserDialog.show()
+
+    def double_click_search_result(self):
+        self.navigate(self.current_key(self.tableSearch))
+
+    def double_click_new_submission(self):
+        _, class_name, _, username = self.current_key(self.tableNew)
+        self.navigate((STUDENT_VIEW, class_name, username))
+
+    def reload_info(self, json_info: JsonInfo, changes: InfoChanges):
+        """
+        Switch to a reloaded info, updating only the changed rows of the
+        cached views. Views of removed classes, assignments or students are
+        dropped, along with the views above them on the navigation stack.
 
-    def show_table_class(self):
-        self.create_table_class()
+        :param json_info: JsonInfo of the reloaded info
+        :param changes: changes found by diff_info
+        """
 
-    def show_table_assignment(self):
-        self.create_table_assignments(self.class_name)
+        self.json_info = json_info
+        self.searchIndex = None
+        self.submissionIndex = None
+        self.classMatrices = {}
+        if (NEW_VIEW,) in self.viewCache:
+            self.build_submission_index()
+        else:
+            self.newButton.setText('New')
+        if self.searchBox.text():
+            self.search()
+        for key, view in list(self.viewCache.items()):
+            if view_exists(key, json_info):
+                view.table.model().sourceModel().refresh(json_info, changes)
+            else:
+                self.evict_view(key)
+
+        for depth, key in enumerate(self.viewStack):
+            if not view_exists(key, json_info):
+                del self.viewStack[depth:]
+                break
+        if self.current_table is None:
+            self.show_view(self.viewStack[-1])
+        else:
+            self.current_table.model().sourceModel().populate()
+
+    def show_analytics(self):
+        """
+        Show the analytics of the open class, building its ClassMatrix in
+        the background the first time.
+        """
 
-    def show_table_assignment_details(self):
-        self.create_table_assignment_details(self.class_name, self.assignment)
+        matrix = self.classMatrices.get(self.class_name)
+        if matrix is None:
+            if self.class_name not in self.classMatrixBuilders:
+                builder = ClassMatrixBuilder(self.json_info, self.class_name,
+                                             self)
+                builder.built.connect(self.class_matrix_built)
+                self.classMatrixBuilders[self.class_name] = builder
+                builder.start()
+            return
+        self.analyticsDialog = AnalyticsDialog(
+            self.class_name, matrix, self.deadlines.get(self.class_name, {}),
+            self)
+        self.analyticsDialog.show()
+
+    def class_matrix_built(self, json_info: JsonInfo, class_name: str,
+                           matrix):
+        builder = self.classMatrixBuilders.pop(class_name)
+        builder.wait()
+        builder.deleteLater()
+        if json_info is not self.json_info:
+            return
+        self.classMatrices[class_name] = matrix
+        if self.class_name == class_name:
+            self.show_analytics()
 
     def fetch_student_submission(self):
-        self.close()
+        self.fetchDialog = FetchDialog(student_fetches(
+            self.json_info, self.workspace, self.class_name, self.username),
+            self, self.fetchWorkers, workspace_manifest(self.workspace),
+            self.fetchRetries)
+        self.fetchDialog.show()
+
+    def fetch_all_submissions(self):
+        self.fetchDialog = FetchDialog(assignment_fetches(
+            self.json_info, self.workspace, self.class_name, self.assignment),
+            self, self.fetchWorkers, workspace_manifest(self.workspace),
+            self.fetchRetries)
+        self.fetchDialog.show()
 
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    ex = CreateTable()
+    parser = argparse.ArgumentParser(
+        description='Browse the classes of one or more git-keeper servers.')
+    parser.add_argument('info', nargs='*', default=['info.json'],
+                        help='info files of the servers, or directories of '
+                             'them, info.json by default')
+    parser.add_argument('--profile', action='store_true',
+                        help='record the time spent in queries and views')
+    parser.add_argument('--sync', metavar='SOURCE',
+                        help='start from the newest synced version of the '
+                             'info and sync it with SOURCE in the '
+                             'background, a directory the info is '
+                             'published to or a command printing a '
+                             'published file, with {} where its path goes')
+    parser.add_argument('--sync-store', default=DEFAULT_STORE,
+                        help='directory of the synced versions')
+    args, qt_args = parser.parse_known_args()
+    PROFILER.enable_from_environment()
+    if args.profile:
+        PROFILER.enable(PROFILER.trace_path or DEFAULT_TRACE)
+    for info_class in (JsonInfo, IndexedJsonInfo, CompactJsonInfo,
+                       LazyJsonInfo, SnapshotJsonInfo, MergedJsonInfo):
+        PROFILER.instrument(info_class)
+    store = None
+    if args.sync:
+        store = SyncStore(args.sync_store)
+        source = make_source(args.sync)
+        if not os.path.exists(store.info_path):
+            try:
+                print(store.sync(source), file=sys.stderr)
+            except (SyncError, OSError) as e:
+                parser.exit(1, 'cannot sync with {0}: {1}\n'.format(
+                    args.sync, e))
+        args.info = [store.info_path]
+    info_paths = find_info_files(args.info)
+    if len(info_paths) == 1:
+        cache = InfoSnapshotCache(info_paths[0])
+        json_info = cache.load()
+        print(cache.report(), file=sys.stderr)
+    else:
+        # parsed before the QApplication exists, in parallel processes
+        start = perf_counter()
+        json_info = load_info_files(info_paths)
+        print('{0} info files loaded in {1:.3f} s'.format(
+            len(info_paths), perf_counter() - start), file=sys.stderr)
+    app = QApplication(sys.argv[:1] + qt_args)
+    app.aboutToQuit.connect(PROFILER.dump)
+    ex = CreateTable(json_info)
+    app.aboutToQuit.connect(ex.lastVisit.save)
+    app.aboutToQuit.connect(ex.blobCache.close)
+    if ClassMatrix is not None:
+        ex.deadlines = load_deadlines('deadlines.json')
+    watcher = InfoWatcher(info_paths, json_info)
+    watcher.reloaded.connect(ex.reload_info)
+    if store is not None:
+        # the newest version is shown while the delta is applied
+        sync_thread = SyncThread(store, source, ex)
+        sync_thread.synced.connect(
+            lambda result: print(result, file=sys.stderr))
+        sync_thread.failed.connect(
+            lambda error: print('cannot sync with {0}: {1}'.format(
+                args.sync, error), file=sys.stderr))
+        sync_thread.start()
     sys.exit(app.exec_())
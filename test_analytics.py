@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from analytics import load_deadlines
+
+
+def test_load_deadlines(tmp_path):
+    path = str(tmp_path / 'deadlines.json')
+    with open(path, 'w') as deadlines_file:
+        json.dump({'CS100': {'hw1': 1000, 'hw2': 2000.5}}, deadlines_file)
+    assert load_deadlines(path) == {'CS100': {'hw1': 1000, 'hw2': 2000.5}}
+
+
+def test_load_missing_deadlines(tmp_path):
+    assert load_deadlines(str(tmp_path / 'deadlines.json')) == {}
+
+
+@pytest.mark.parametrize('text', ['{"CS100": ', '[1, 2]', '{"CS100": 1}',
+                                  '{"CS100": {"hw1": "monday"}}',
+                                  '{"CS100": {"hw1": true}}'])
+def test_load_unusable_deadlines(tmp_path, text):
+    path = str(tmp_path / 'deadlines.json')
+    with open(path, 'w') as deadlines_file:
+        deadlines_file.write(text)
+    with pytest.warns(UserWarning, match='cannot read deadlines'):
+        assert load_deadlines(path) == {}
+
+
+def test_load_unreadable_deadlines(tmp_path):
+    with pytest.warns(UserWarning, match='cannot read deadlines'):
+        assert load_deadlines(str(tmp_path)) == {}
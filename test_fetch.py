@@ -0,0 +1,142 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import fetch
+from conftest import bare_repo, commit, git
+from fetch import FAILED, FETCHED, SKIPPED, FetchManifest, FetchResult, \
+    FetchSummary, RepoFetch, assignment_fetches, fetch_repos
+from info import CompactJsonInfo
+
+
+def test_fetch_clones_then_skips(tmp_path):
+    bare, head = bare_repo(tmp_path, [1000, 2000])
+    destination = str(tmp_path / 'workspace' / 'CS100' / 'hw1' / 'alice')
+    repo_fetch = RepoFetch('CS100/hw1/alice', bare, destination, head)
+
+    results = fetch_repos([repo_fetch])
+    assert [(result.status, result.head) for result in results] == \
+        [(FETCHED, head)]
+    assert git(['rev-parse', 'HEAD'], destination) == head
+
+    results = fetch_repos([repo_fetch])
+    assert [(result.status, result.head) for result in results] == \
+        [(SKIPPED, head)]
+
+
+def test_fetch_pulls_new_commits(tmp_path):
+    bare, head = bare_repo(tmp_path, [1000])
+    destination = str(tmp_path / 'clone')
+    fetch_repos([RepoFetch('alice', bare, destination, head)])
+
+    new_head = commit(str(tmp_path / 'work'), 'later', 2000)
+    git(['push', '-q', bare, 'master'], str(tmp_path / 'work'))
+    results = fetch_repos([RepoFetch('alice', bare, destination, new_head)])
+    assert [(result.status, result.head) for result in results] == \
+        [(FETCHED, new_head)]
+
+
+def test_fetch_missing_repository_fails(tmp_path):
+    repo_fetch = RepoFetch('missing', str(tmp_path / 'missing.git'),
+                           str(tmp_path / 'clone'))
+
+    results = fetch_repos([repo_fetch])
+    assert [result.status for result in results] == [FAILED]
+    assert results[0].error
+    assert not os.path.exists(str(tmp_path / 'clone'))
+
+
+def test_fetch_skips_with_manifest(tmp_path, monkeypatch):
+    bare, head = bare_repo(tmp_path, [1000, 2000])
+    destination = str(tmp_path / 'workspace' / 'CS100' / 'hw1' / 'alice')
+    repo_fetch = RepoFetch('CS100/hw1/alice', bare, destination, head)
+    manifest_path = str(tmp_path / 'workspace' / 'manifest.json')
+    fetch_repos([repo_fetch], manifest=FetchManifest(manifest_path))
+
+    def fail(repo_fetch):
+        raise AssertionError('a current clone was fetched')
+
+    monkeypatch.setattr(fetch, 'fetch_repo', fail)
+    results = fetch_repos([repo_fetch], manifest=FetchManifest(manifest_path))
+    assert [result.status for result in results] == [SKIPPED]
+
+
+def test_fetch_fails_after_retries(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch, 'sleep', lambda seconds: None)
+    repo_fetch = RepoFetch('missing', str(tmp_path / 'missing.git'),
+                           str(tmp_path / 'clone'))
+
+    results = fetch_repos([repo_fetch], retries=2)
+    assert [(result.status, result.attempts) for result in results] == \
+        [(FAILED, 3)]
+    assert results[0].error
+
+
+def test_fetch_retries_until_success(tmp_path, monkeypatch):
+    bare, head = bare_repo(tmp_path, [1000])
+    repo_fetch = RepoFetch('alice', bare, str(tmp_path / 'clone'), head)
+    monkeypatch.setattr(fetch, 'sleep', lambda seconds: None)
+    fetch_repo = fetch.fetch_repo
+    attempts = []
+
+    def flaky_fetch_repo(repo_fetch):
+        attempts.append(repo_fetch)
+        if len(attempts) == 1:
+            return FetchResult(repo_fetch, FAILED, error='network down')
+        return fetch_repo(repo_fetch)
+
+    monkeypatch.setattr(fetch, 'fetch_repo', flaky_fetch_repo)
+    results = fetch_repos([repo_fetch], retries=2)
+    assert [(result.status, result.attempts) for result in results] == \
+        [(FETCHED, 2)]
+
+
+def test_concurrent_manifest_saves_keep_every_entry(tmp_path):
+    manifest_path = str(tmp_path / 'manifest.json')
+
+    def save(number):
+        manifest = FetchManifest(manifest_path)
+        repo_fetch = RepoFetch('repo{}'.format(number), '', '')
+        manifest.record(FetchResult(repo_fetch, FETCHED,
+                                    '{:040x}'.format(number)))
+        manifest.save()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(save, range(50)))
+
+    with open(manifest_path) as manifest_file:
+        assert len(json.load(manifest_file)) == 50
+    assert os.listdir(str(tmp_path)) == ['manifest.json']
+
+
+def test_manifest_save_error_is_reported(tmp_path):
+    bare, head = bare_repo(tmp_path, [1000])
+    repo_fetch = RepoFetch('alice', bare, str(tmp_path / 'clone'), head)
+    # a directory cannot be replaced by the manifest file
+    manifest = FetchManifest(str(tmp_path / 'manifest'))
+    os.makedirs(os.path.join(manifest.path, 'full'))
+
+    results = fetch_repos([repo_fetch], manifest=manifest)
+    assert [result.status for result in results] == [FETCHED]
+    assert manifest.error
+    assert 'manifest not saved' in str(FetchSummary(results, 1.0, manifest))
+
+
+def test_assignment_fetches_skips_students_without_repositories(tmp_path):
+    repo = {'hash': '0' * 40, 'path': '/home/alice/hw1.git', 'time': 1000,
+            'submission_count': 1}
+    info_dict = {'CS100': {
+        'students': {username: {'first': username, 'last': 'Student',
+                                'home_dir': '/home/' + username}
+                     for username in ('alice', 'bob', 'carol')},
+        'assignments': {'hw1': {'students_repos': {'alice': repo,
+                                                   'bob': None}}},
+    }}
+    json_info = CompactJsonInfo.from_dict(info_dict)
+
+    repo_fetches = assignment_fetches(json_info, str(tmp_path), 'CS100',
+                                      'hw1')
+    assert [(repo_fetch.label, repo_fetch.destination)
+            for repo_fetch in repo_fetches] == \
+        [('CS100/hw1/alice', os.path.join(str(tmp_path), 'CS100', 'hw1',
+                                          'alice'))]
@@ -0,0 +1,233 @@
+import json
+import os
+import pickle
+
+import pytest
+
+from info import SNAPSHOT_HEADER_LENGTH, SNAPSHOT_MAGIC, CompactJsonInfo, \
+    IndexedJsonInfo, InfoSnapshotCache, JsonInfo, LazyJsonInfo, \
+    skip_json_value
+
+
+def student(first: str, last: str, username: str) -> dict:
+    return {'first': first, 'last': last,
+            'email_address': '{}@example.com'.format(username),
+            'home_dir': '/home/{}'.format(username),
+            'last_first_username': '{0}, {1}, {2}'.format(last, first,
+                                                          username)}
+
+
+def repo(username: str, assignment: str, time: int, count: int) -> dict:
+    return {'hash': '{:040x}'.format(time),
+            'path': '/home/{0}/{1}.git'.format(username, assignment),
+            'time': time, 'submission_count': count}
+
+
+def class_info(assignments_first: bool = False) -> dict:
+    students = {'alice': student('Alice', 'Adams', 'alice'),
+                'bob': student('Bob', 'Brown', 'bob')}
+    assignments = {
+        'hw1': {'published': True,
+                'reports_repo': {'hash': 'a' * 40, 'path': '/reports/hw1'},
+                'students_repos': {'alice': repo('alice', 'hw1', 1000, 2),
+                                   'bob': repo('bob', 'hw1', 1100, 0)}},
+        'hw2': {'published': False,
+                'reports_repo': {'hash': 'b' * 40, 'path': '/reports/hw2'},
+                'students_repos': {'alice': repo('alice', 'hw2', 2000, 1),
+                                   'bob': None}},
+    }
+    if assignments_first:
+        return {'assignments': assignments, 'students': students}
+    return {'students': students, 'assignments': assignments}
+
+
+def assert_same_info(json_info: JsonInfo, info_dict: dict):
+    """
+    Check that a JsonInfo answers every query like an IndexedJsonInfo of
+    the info dictionary, and gives the reports repository of each assignment
+    as it is in the dictionary.
+    """
+
+    expected = IndexedJsonInfo(info_dict)
+    assert json_info.class_list() == expected.class_list()
+    for class_name in expected.class_list():
+        json_info.load_class(class_name)
+        for method in ('student_count', 'student_list', 'assignment_count',
+                       'assignment_list'):
+            assert getattr(json_info, method)(class_name) == \
+                getattr(expected, method)(class_name), method
+        for username in expected.student_list(class_name):
+            for method in ('email_address', 'first_name', 'last_name',
+                           'home_dir', 'last_first_username',
+                           'assignments_by_student_list'):
+                assert getattr(json_info, method)(class_name, username) == \
+                    getattr(expected, method)(class_name, username), method
+        for assignment in expected.assignment_list(class_name):
+            assignment_info = info_dict[class_name]['assignments'][
+                assignment]
+            reports_repo = assignment_info.get('reports_repo') or {}
+            assert json_info.is_published(class_name, assignment) == \
+                assignment_info.get('published')
+            assert json_info.assignment_hash(class_name, assignment) == \
+                reports_repo.get('hash')
+            assert json_info.assignment_path(class_name, assignment) == \
+                reports_repo.get('path')
+            for method in ('student_submitted_count',
+                           'students_submitted_list', 'students_repos_list'):
+                assert getattr(json_info, method)(class_name, assignment) == \
+                    getattr(expected, method)(class_name, assignment), method
+            for username in expected.students_repos_list(class_name,
+                                                         assignment):
+                for method in ('submission_count', 'time',
+                               'assignment_by_student_hash',
+                               'assignment_by_student_path'):
+                    assert getattr(json_info, method)(
+                        class_name, assignment, username) == \
+                        getattr(expected, method)(
+                            class_name, assignment, username), method
+
+
+@pytest.mark.parametrize('assignments_first', [False, True])
+def test_lazy_info_with_empty_assignments(assignments_first):
+    new_class = {'assignments': {}, 'students': {}} if assignments_first \
+        else {'students': {}, 'assignments': {}}
+    info_dict = {'CS100': class_info(assignments_first),
+                 'NEW101': new_class,
+                 'CS200': class_info(assignments_first)}
+    assert_same_info(LazyJsonInfo(json.dumps(info_dict)), info_dict)
+
+
+def test_lazy_info_with_flat_assignments():
+    flat_class = {'assignments': {'hw1': {'published': False,
+                                          'students_repos': {}}},
+                  'students': {'alice': student('Alice', 'Adams', 'alice')}}
+    info_dict = {'CS100': flat_class, 'CS200': class_info()}
+    assert_same_info(LazyJsonInfo(json.dumps(info_dict)), info_dict)
+
+
+def test_lazy_info_with_escaped_quotes_and_backslashes():
+    info_dict = {'CS "100"': class_info(), 'CS\\200': class_info(True)}
+    escaped = info_dict['CS "100"']
+    escaped['students']['alice']['first'] = 'Al"ice\\'
+    escaped['students']['alice']['home_dir'] = 'C:\\home\\alice\\'
+    escaped['assignments']['hw1']['students_repos']['alice']['path'] = \
+        'C:\\home\\alice\\"hw1"}\\'
+    escaped['assignments']['hw "3" {'] = {
+        'published': True, 'reports_repo': {'hash': 'c' * 40, 'path': '\\'},
+        'students_repos': {}}
+    assert_same_info(LazyJsonInfo(json.dumps(info_dict)), info_dict)
+    assert_same_info(LazyJsonInfo(json.dumps(info_dict, indent=2)),
+                     info_dict)
+
+
+def test_skip_json_value_stops_at_the_value():
+    text = '{"a": {}, "b": {"c": {"d": [1, {}]}}, "e": {}}'
+    assert skip_json_value(text, text.index('{', 1)) == text.index(',')
+    start = text.index('{"c"')
+    assert text[skip_json_value(text, start):] == ', "e": {}}'
+    assert skip_json_value(text, 0) == len(text)
+
+
+def test_compact_info_keeps_odd_values(tmp_path):
+    info_dict = {'CS100': class_info()}
+    alice = info_dict['CS100']['students']['alice']
+    alice['first'] = alice['last'] = None
+    repos = info_dict['CS100']['assignments']['hw1']['students_repos']
+    repos['alice']['time'] = 1000.5
+    repos['alice']['submission_count'] = 2 ** 70
+    repos['bob']['time'] = None
+    repos['bob']['submission_count'] = 1.0
+    info_path = str(tmp_path / 'info.json')
+    with open(info_path, 'w') as info_file:
+        json.dump(info_dict, info_file)
+
+    assert_same_info(CompactJsonInfo.from_dict(info_dict), info_dict)
+    assert_same_info(LazyJsonInfo(json.dumps(info_dict)), info_dict)
+    cache = InfoSnapshotCache(info_path)
+    cache.load()
+    cache.writer.join()
+    json_info = cache.load()
+    assert cache.hit
+    assert_same_info(json_info, info_dict)
+    assert type(json_info.time('CS100', 'hw1', 'alice')) is float
+
+
+def snapshot_cache(tmp_path) -> tuple:
+    """
+    Write an info file and its snapshot.
+
+    :return: InfoSnapshotCache of the info file, and the info dictionary
+    """
+
+    info_dict = {'CS100': class_info(), 'CS200': class_info(True)}
+    info_path = str(tmp_path / 'info.json')
+    with open(info_path, 'w') as info_file:
+        json.dump(info_dict, info_file)
+    cache = InfoSnapshotCache(info_path)
+    cache.load()
+    cache.writer.join()
+    return cache, info_dict
+
+
+def test_snapshot_hit(tmp_path):
+    cache, info_dict = snapshot_cache(tmp_path)
+    json_info = cache.load()
+    assert cache.hit
+    assert_same_info(json_info, info_dict)
+
+
+@pytest.mark.parametrize('length', [len(SNAPSHOT_MAGIC) + 3, 40, -1])
+def test_truncated_snapshot_is_a_miss(tmp_path, length):
+    cache, info_dict = snapshot_cache(tmp_path)
+    with open(cache.snapshot_path, 'rb') as snapshot_file:
+        data = snapshot_file.read()
+    with open(cache.snapshot_path, 'wb') as snapshot_file:
+        snapshot_file.write(data[:length])
+
+    json_info = cache.load()
+    assert not cache.hit
+    assert_same_info(json_info, info_dict)
+
+
+@pytest.mark.parametrize('header', [{}, {'source': None}, [1, 2],
+                                    {'source': (1, 2, 'x'), 'classes': {},
+                                     'spans': {'CS100': None}}])
+def test_garbled_snapshot_header_is_a_miss(tmp_path, header):
+    cache, info_dict = snapshot_cache(tmp_path)
+    header = pickle.dumps(header)
+    with open(cache.snapshot_path, 'wb') as snapshot_file:
+        snapshot_file.write(SNAPSHOT_MAGIC)
+        snapshot_file.write(SNAPSHOT_HEADER_LENGTH.pack(len(header)))
+        snapshot_file.write(header)
+
+    json_info = cache.load()
+    assert not cache.hit
+    assert_same_info(json_info, info_dict)
+
+
+def test_snapshot_rewritten_after_touch(tmp_path):
+    cache, info_dict = snapshot_cache(tmp_path)
+    stat = os.stat(cache.info_path)
+    os.utime(cache.info_path, ns=(stat.st_atime_ns,
+                                  stat.st_mtime_ns + 10 ** 9))
+
+    json_info = cache.load()
+    assert cache.hit
+    cache.writer.join()
+    assert_same_info(json_info, info_dict)
+
+    opened = []
+    real_open = open
+
+    def tracking_open(path, *args, **kwargs):
+        opened.append(path)
+        return real_open(path, *args, **kwargs)
+
+    cache = InfoSnapshotCache(cache.info_path)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr('builtins.open', tracking_open)
+        json_info = cache.load()
+    assert cache.hit
+    # the info file is not hashed again
+    assert cache.info_path not in opened
+    assert_same_info(json_info, info_dict)
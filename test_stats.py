@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+import stats
+from conftest import bare_repo, commit, git
+from fetch import FetchError
+from stats import StatsCache, commit_stats, read_head, regenerate_stats, \
+    repo_stats
+
+
+def test_read_head_loose_ref(tmp_path):
+    bare, head = bare_repo(tmp_path, [1000, 2000])
+    assert os.path.exists(os.path.join(bare, 'refs', 'heads', 'master'))
+    assert read_head(bare) == head
+
+
+def test_read_head_packed_ref(tmp_path):
+    bare, head = bare_repo(tmp_path, [1000, 2000])
+    git(['pack-refs', '--all'], bare)
+    assert not os.path.exists(os.path.join(bare, 'refs', 'heads', 'master'))
+    assert read_head(bare) == head
+
+
+def test_read_head_without_commits(tmp_path):
+    bare = str(tmp_path / 'empty.git')
+    git(['init', '-q', '--bare', bare], str(tmp_path))
+    assert read_head(bare) is None
+
+
+def test_read_head_missing_repository(tmp_path):
+    with pytest.raises(FetchError):
+        read_head(str(tmp_path / 'missing.git'))
+
+
+def test_commit_stats_linear(tmp_path):
+    bare, head = bare_repo(tmp_path, [1000, 2000, 3000])
+    result = commit_stats(bare, head)
+    assert (result.head, result.time, result.submission_count) == \
+        (head, 3000, 2)
+
+
+def test_commit_stats_merge(tmp_path):
+    work = str(tmp_path / 'work')
+    git(['init', '-q', '--initial-branch=master', work], str(tmp_path))
+    commit(work, 'base', 1000)
+    git(['checkout', '-q', '-b', 'side'], work)
+    commit(work, 'side1', 2000)
+    commit(work, 'side2', 2500)
+    git(['checkout', '-q', 'master'], work)
+    commit(work, 'main', 3000)
+    git(['merge', '-q', '--no-ff', '-m', 'merge', 'side'], work, 4000)
+    head = git(['rev-parse', 'HEAD'], work)
+
+    result = commit_stats(work, head)
+    # base, side1, side2, main and the merge, the first one is not counted
+    assert (result.time, result.submission_count) == (4000, 4)
+
+
+def test_commit_stats_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(stats, 'BATCH_SIZE', 2)
+    bare, head = bare_repo(tmp_path, [1000 + number for number in range(7)])
+    assert commit_stats(bare, head).submission_count == 6
+
+
+def test_stats_cache_hit(tmp_path, monkeypatch):
+    bare, head = bare_repo(tmp_path, [1000, 2000])
+    cache_path = str(tmp_path / 'cache.json')
+    cache = StatsCache(cache_path)
+    assert repo_stats(bare, cache).submission_count == 1
+    cache.save()
+
+    def fail(repo_path, head):
+        raise AssertionError('a cached head was read with git')
+
+    monkeypatch.setattr(stats, 'commit_stats', fail)
+    cached = repo_stats(bare, StatsCache(cache_path))
+    assert (cached.head, cached.time, cached.submission_count) == \
+        (head, 2000, 1)
+
+
+def test_regenerate_stats(tmp_path):
+    bare, head = bare_repo(tmp_path, [1000, 2000, 3000])
+    info_dict = {'CS100': {'assignments': {'hw1': {'students_repos': {
+        'alice': {'path': bare, 'hash': head, 'time': 3000,
+                  'submission_count': 0},
+        'bob': {'path': str(tmp_path / 'missing.git'), 'hash': None,
+                'time': 0, 'submission_count': 0},
+        'carol': None,
+    }}}}}
+    errors = []
+
+    changes = regenerate_stats(info_dict, 2, StatsCache(),
+                               lambda path, error: errors.append(path))
+
+    assert [(change.username, change.field, change.old, change.new)
+            for change in changes] == [('alice', 'submission_count', 0, 2)]
+    repos = info_dict['CS100']['assignments']['hw1']['students_repos']
+    assert repos['alice']['submission_count'] == 2
+    assert errors == [str(tmp_path / 'missing.git')]